@@ -9,6 +9,8 @@ load_dotenv()
 
 from app.db.database import Base
 from app.db.models import *
+from app.db.search import SEARCH_TABLE
+from app.db.spatial import SPATIAL_TABLE
 
 config = context.config
 
@@ -23,6 +25,17 @@ def get_url():
     return os.getenv("DATABASE_URI")
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    """Keeps autogenerate away from the search and spatial index tables, which have no model."""
+    if (
+        type_ == "table"
+        and compare_to is None
+        and name.startswith((SEARCH_TABLE, SPATIAL_TABLE))
+    ):
+        return False
+    return True
+
+
 # Update the 'run_migrations_offline' function
 def run_migrations_offline() -> None:
     url = get_url()
@@ -31,6 +44,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -49,7 +63,11 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
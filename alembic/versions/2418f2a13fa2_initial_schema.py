@@ -0,0 +1,99 @@
+"""initial schema
+
+Revision ID: 2418f2a13fa2
+Revises:
+Create Date: 2024-02-12 10:00:00.000000
+
+Databases created before migrations existed (such as compass_db.db) already have
+these tables; mark them with `alembic stamp 2418f2a13fa2` before upgrading.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "2418f2a13fa2"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "schools",
+        sa.Column("unitid", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=True),
+        sa.Column("url", sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint("unitid"),
+    )
+    op.create_table(
+        "location",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("school_unitid", sa.Integer(), nullable=True),
+        sa.Column("city", sa.String(), nullable=False),
+        sa.Column("zipcode", sa.String(), nullable=False),
+        sa.Column("state", sa.String(), nullable=False),
+        sa.Column("region", sa.String(), nullable=True),
+        sa.Column("locale", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(["school_unitid"], ["schools.unitid"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "finance",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("school_unitid", sa.Integer(), nullable=True),
+        sa.Column("year", sa.Date(), nullable=True),
+        sa.Column("cost_attendance", sa.Float(), nullable=True),
+        sa.Column("avg_net_price", sa.Float(), nullable=True),
+        sa.Column("in_state_tuition", sa.Float(), nullable=True),
+        sa.Column("out_state_tuition", sa.Float(), nullable=True),
+        sa.Column("tuition_per_fte", sa.Float(), nullable=True),
+        sa.Column("instructional_expenditure_per_fte", sa.Float(), nullable=True),
+        sa.Column("avg_faculty_salary", sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(["school_unitid"], ["schools.unitid"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "control",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("school_unitid", sa.Integer(), nullable=True),
+        sa.Column("under_investigation", sa.Boolean(), nullable=True),
+        sa.Column("predominant_deg", sa.String(), nullable=True),
+        sa.Column("highest_deg", sa.String(), nullable=True),
+        sa.Column("control", sa.String(), nullable=True),
+        sa.Column("hbcu", sa.Boolean(), nullable=True),
+        sa.Column("religious_affiliation", sa.String(), nullable=True),
+        sa.Column("carnegie_undergrad", sa.String(), nullable=True),
+        sa.Column("carnegie_size", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(["school_unitid"], ["schools.unitid"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "admission",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("school_unitid", sa.Integer(), nullable=True),
+        sa.Column("year", sa.Date(), nullable=True),
+        sa.Column("admission_rate", sa.Float(), nullable=True),
+        sa.Column("number_of_students", sa.Integer(), nullable=True),
+        sa.Column("sat_math_median", sa.Float(), nullable=True),
+        sa.Column("sat_reading_median", sa.Float(), nullable=True),
+        sa.Column("sat_writing_median", sa.Float(), nullable=True),
+        sa.Column("act_math_median", sa.Float(), nullable=True),
+        sa.Column("act_english_median", sa.Float(), nullable=True),
+        sa.Column("act_writing_median", sa.Float(), nullable=True),
+        sa.Column("act_cumulative_median", sa.Float(), nullable=True),
+        sa.Column("avg_sat_score_admitted", sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(["school_unitid"], ["schools.unitid"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("admission")
+    op.drop_table("control")
+    op.drop_table("finance")
+    op.drop_table("location")
+    op.drop_table("schools")
@@ -0,0 +1,49 @@
+"""unique keys the ETL upserts on
+
+Revision ID: 5c0d7e4b91a3
+Revises: 82c94956e09a
+Create Date: 2024-02-19 09:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5c0d7e4b91a3"
+down_revision: Union[str, None] = "82c94956e09a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tables holding one row per school.
+PER_SCHOOL_TABLES = ["location", "control"]
+# Tables holding one row per school and year.
+PER_YEAR_TABLES = ["finance", "admission"]
+
+
+def upgrade() -> None:
+    for table in PER_SCHOOL_TABLES:
+        op.drop_index(f"ix_{table}_school_unitid", table_name=table)
+        op.create_index(
+            f"ix_{table}_school_unitid", table, ["school_unitid"], unique=True
+        )
+    # The composite index also serves lookups by school_unitid alone.
+    for table in PER_YEAR_TABLES:
+        op.drop_index(f"ix_{table}_school_unitid", table_name=table)
+        op.create_index(
+            f"ix_{table}_school_unitid_year",
+            table,
+            ["school_unitid", "year"],
+            unique=True,
+        )
+
+
+def downgrade() -> None:
+    for table in PER_YEAR_TABLES:
+        op.drop_index(f"ix_{table}_school_unitid_year", table_name=table)
+        op.create_index(f"ix_{table}_school_unitid", table, ["school_unitid"])
+    for table in PER_SCHOOL_TABLES:
+        op.drop_index(f"ix_{table}_school_unitid", table_name=table)
+        op.create_index(f"ix_{table}_school_unitid", table, ["school_unitid"])
@@ -0,0 +1,41 @@
+"""location filter and foreign key indexes
+
+Revision ID: 82c94956e09a
+Revises: af1832c75683
+Create Date: 2024-02-12 10:10:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "82c94956e09a"
+down_revision: Union[str, None] = "af1832c75683"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FILTER_COLUMNS = ["state", "region", "locale", "zipcode"]
+FK_TABLES = ["location", "finance", "control", "admission"]
+
+
+def upgrade() -> None:
+    for table in FK_TABLES:
+        op.create_index(f"ix_{table}_school_unitid", table, ["school_unitid"])
+    # Each filter index carries school_unitid so that filtering to school ids is
+    # answered from the index alone.
+    for column in FILTER_COLUMNS:
+        op.create_index(
+            f"ix_location_{column}_school_unitid",
+            "location",
+            [column, "school_unitid"],
+        )
+
+
+def downgrade() -> None:
+    for column in FILTER_COLUMNS:
+        op.drop_index(f"ix_location_{column}_school_unitid", table_name="location")
+    for table in FK_TABLES:
+        op.drop_index(f"ix_{table}_school_unitid", table_name=table)
@@ -0,0 +1,49 @@
+"""content hashes and change log for incremental ETL loads
+
+Revision ID: 9e2f4a6c8d10
+Revises: 5c0d7e4b91a3
+Create Date: 2024-02-26 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9e2f4a6c8d10"
+down_revision: Union[str, None] = "5c0d7e4b91a3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "content_hashes",
+        sa.Column("school_unitid", sa.Integer(), nullable=False),
+        sa.Column("scope", sa.String(), nullable=False),
+        sa.Column("hash", sa.String(length=64), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["school_unitid"],
+            ["schools.unitid"],
+        ),
+        sa.PrimaryKeyConstraint("school_unitid", "scope"),
+    )
+    op.create_table(
+        "change_log",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("school_unitid", sa.Integer(), nullable=False),
+        sa.Column("scope", sa.String(), nullable=False),
+        sa.Column("change", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_change_log_version", "change_log", ["version"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_change_log_version", table_name="change_log")
+    op.drop_table("change_log")
+    op.drop_table("content_hashes")
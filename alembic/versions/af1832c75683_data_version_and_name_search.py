@@ -0,0 +1,88 @@
+"""data version stamp and school name search index
+
+Revision ID: af1832c75683
+Revises: 2418f2a13fa2
+Create Date: 2024-02-12 10:05:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# The DDL is written out here, not imported from app.db.search, so that later changes
+# to the application cannot alter what this revision does.
+SQLITE_UPGRADE = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS schools_fts USING fts5(
+        name,
+        content='schools',
+        content_rowid='unitid',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS schools_fts_ai AFTER INSERT ON schools BEGIN
+        INSERT INTO schools_fts(rowid, name) VALUES (new.unitid, new.name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS schools_fts_ad AFTER DELETE ON schools BEGIN
+        INSERT INTO schools_fts(schools_fts, rowid, name)
+        VALUES ('delete', old.unitid, old.name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS schools_fts_au AFTER UPDATE OF name ON schools BEGIN
+        INSERT INTO schools_fts(schools_fts, rowid, name)
+        VALUES ('delete', old.unitid, old.name);
+        INSERT INTO schools_fts(rowid, name) VALUES (new.unitid, new.name);
+    END
+    """,
+    "INSERT INTO schools_fts(schools_fts) VALUES ('rebuild')",
+]
+
+POSTGRES_UPGRADE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_schools_name_trgm ON schools USING gin (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_schools_name_tsv ON schools "
+    "USING gin (to_tsvector('simple', coalesce(name, '')))",
+]
+
+# revision identifiers, used by Alembic.
+revision: str = "af1832c75683"
+down_revision: Union[str, None] = "2418f2a13fa2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "data_version",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("loaded_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for statement in SQLITE_UPGRADE:
+            op.execute(statement)
+    elif dialect == "postgresql":
+        for statement in POSTGRES_UPGRADE:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for suffix in ("ai", "ad", "au"):
+            op.execute(f"DROP TRIGGER IF EXISTS schools_fts_{suffix}")
+        op.execute("DROP TABLE IF EXISTS schools_fts")
+    elif dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_schools_name_tsv")
+        op.execute("DROP INDEX IF EXISTS ix_schools_name_trgm")
+    op.drop_table("data_version")
@@ -0,0 +1,76 @@
+"""location coordinates and spatial index
+
+Revision ID: c3a1f7d2e5b8
+Revises: 9e2f4a6c8d10
+Create Date: 2024-03-04 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# The DDL is written out here, not imported from app.db.spatial, so that later changes
+# to the application cannot alter what this revision does. Each location is a point,
+# stored as a zero-size box keyed on `location.id`.
+SQLITE_UPGRADE = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS location_rtree USING rtree(
+        id, min_lat, max_lat, min_lon, max_lon
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS location_rtree_ai AFTER INSERT ON location
+    WHEN new.latitude IS NOT NULL AND new.longitude IS NOT NULL BEGIN
+        INSERT INTO location_rtree VALUES (
+            new.id, new.latitude, new.latitude, new.longitude, new.longitude
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS location_rtree_ad AFTER DELETE ON location BEGIN
+        DELETE FROM location_rtree WHERE id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS location_rtree_au
+    AFTER UPDATE OF latitude, longitude ON location BEGIN
+        DELETE FROM location_rtree WHERE id = old.id;
+        INSERT INTO location_rtree
+        SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude
+        WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL;
+    END
+    """,
+    "INSERT INTO location_rtree SELECT id, latitude, latitude, longitude, longitude "
+    "FROM location WHERE latitude IS NOT NULL AND longitude IS NOT NULL",
+]
+
+# revision identifiers, used by Alembic.
+revision: str = "c3a1f7d2e5b8"
+down_revision: Union[str, None] = "9e2f4a6c8d10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("location", sa.Column("latitude", sa.Float(), nullable=True))
+    op.add_column("location", sa.Column("longitude", sa.Float(), nullable=True))
+    op.create_index(
+        "ix_location_latitude_longitude", "location", ["latitude", "longitude"]
+    )
+    if op.get_bind().dialect.name == "sqlite":
+        for statement in SQLITE_UPGRADE:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        for suffix in ("ai", "ad", "au"):
+            op.execute(f"DROP TRIGGER IF EXISTS location_rtree_{suffix}")
+        op.execute("DROP TABLE IF EXISTS location_rtree")
+    op.drop_index("ix_location_latitude_longitude", table_name="location")
+    with op.batch_alter_table("location") as batch_op:
+        batch_op.drop_column("longitude")
+        batch_op.drop_column("latitude")
@@ -0,0 +1,37 @@
+"""indexes for the multi-criteria school search
+
+Revision ID: d84b2c6e0f17
+Revises: c3a1f7d2e5b8
+Create Date: 2024-03-11 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d84b2c6e0f17"
+down_revision: Union[str, None] = "c3a1f7d2e5b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Per-year columns that are range-filtered and sorted on within a year.
+RANGE_INDEXES = {"finance": "avg_net_price", "admission": "admission_rate"}
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_control_control_school_unitid", "control", ["control", "school_unitid"]
+    )
+    for table, column in RANGE_INDEXES.items():
+        op.create_index(
+            f"ix_{table}_year_{column}", table, ["year", column, "school_unitid"]
+        )
+
+
+def downgrade() -> None:
+    for table, column in RANGE_INDEXES.items():
+        op.drop_index(f"ix_{table}_year_{column}", table_name=table)
+    op.drop_index("ix_control_control_school_unitid", table_name="control")
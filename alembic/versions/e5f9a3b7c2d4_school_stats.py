@@ -0,0 +1,43 @@
+"""precomputed school statistics
+
+Revision ID: e5f9a3b7c2d4
+Revises: d84b2c6e0f17
+Create Date: 2024-03-18 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e5f9a3b7c2d4"
+down_revision: Union[str, None] = "d84b2c6e0f17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "school_stats",
+        sa.Column("dimension", sa.String(), nullable=False),
+        sa.Column("metric", sa.String(), nullable=False),
+        sa.Column("year", sa.Date(), nullable=False),
+        sa.Column("value", sa.String(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("mean", sa.Float(), nullable=True),
+        sa.Column("min", sa.Float(), nullable=True),
+        sa.Column("p10", sa.Float(), nullable=True),
+        sa.Column("p25", sa.Float(), nullable=True),
+        sa.Column("median", sa.Float(), nullable=True),
+        sa.Column("p75", sa.Float(), nullable=True),
+        sa.Column("p90", sa.Float(), nullable=True),
+        sa.Column("max", sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint("dimension", "metric", "year", "value"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("school_stats")
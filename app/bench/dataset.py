@@ -0,0 +1,132 @@
+import random
+import re
+from datetime import date
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from app.db.models import Base, Finance, Location, School
+from app.db.search import create_search_index
+from app.db.spatial import create_spatial_index
+from app.db.versioning import bump_data_version
+from app.etl.transforms import DEFAULT_YEARS, LOCALES, REGIONS
+
+# State codes per region, taken from the region names ("Plains (IA, KS, ...)").
+STATES = {
+    region: re.search(r"\((.*)\)", name).group(1).split(", ")
+    for region, name in REGIONS.items()
+    if "(" in name
+}
+
+NAME_PREFIXES = [
+    "North",
+    "South",
+    "East",
+    "West",
+    "Central",
+    "Saint",
+    "Lake",
+    "Mount",
+    "Pacific",
+    "Atlantic",
+]
+NAME_STEMS = [
+    "Valley",
+    "River",
+    "Ridge",
+    "Harbor",
+    "Prairie",
+    "Summit",
+    "Forest",
+    "Coast",
+    "Canyon",
+    "Meadow",
+]
+NAME_KINDS = [
+    "University",
+    "College",
+    "Community College",
+    "Institute of Technology",
+    "Technical College",
+    "School of Nursing",
+]
+
+# Roughly the contiguous United States.
+LATITUDES = (25.0, 49.0)
+LONGITUDES = (-124.0, -67.0)
+
+FIRST_UNITID = 100000
+
+
+def school_rows(unitid: int, rng: random.Random, years: list[int]) -> dict:
+    """Builds the rows of one synthetic school, keyed by table name like the ETL."""
+    region = rng.choice(list(STATES))
+    name = " ".join(
+        (rng.choice(NAME_PREFIXES), rng.choice(NAME_STEMS), rng.choice(NAME_KINDS))
+    )
+    price = rng.uniform(5_000, 40_000)
+    return {
+        "schools": [
+            {
+                "unitid": unitid,
+                "name": f"{name} {unitid}",
+                "url": f"www.school{unitid}.edu",
+            }
+        ],
+        "location": [
+            {
+                "school_unitid": unitid,
+                "city": f"{rng.choice(NAME_STEMS)}ville",
+                "zipcode": f"{rng.randrange(501, 99950):05d}",
+                "state": rng.choice(STATES[region]),
+                "region": REGIONS[region],
+                "locale": rng.choice(list(LOCALES.values())),
+                "latitude": round(rng.uniform(*LATITUDES), 6),
+                "longitude": round(rng.uniform(*LONGITUDES), 6),
+            }
+        ],
+        "finance": [
+            {
+                "school_unitid": unitid,
+                "year": date(year, 1, 1),
+                "cost_attendance": round(price * 1.4),
+                "avg_net_price": round(price * (1 + 0.03 * offset)),
+                "in_state_tuition": round(price * 0.8),
+                "out_state_tuition": round(price * 1.6),
+                "tuition_per_fte": round(rng.uniform(2_000, 30_000)),
+                "instructional_expenditure_per_fte": round(rng.uniform(3_000, 40_000)),
+                "avg_faculty_salary": round(rng.uniform(4_000, 15_000)),
+            }
+            for offset, year in enumerate(years)
+        ],
+    }
+
+
+def generate(
+    path, schools: int, seed: int = 0, years=DEFAULT_YEARS, batch_size: int = 10_000
+) -> None:
+    """
+    Writes a SQLite database at ``path`` with ``schools`` synthetic schools, each with a
+    location and a finance row per year, plus the name and spatial indexes the API uses.
+
+    The same ``seed`` always produces the same data, so runs against datasets of the
+    same size are comparable. Rows are inserted in batches of ``batch_size`` schools,
+    which keeps memory flat up to millions of schools.
+    """
+    rng = random.Random(seed)
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    tables = {"schools": School, "location": Location, "finance": Finance}
+    last = FIRST_UNITID + schools
+    with engine.begin() as connection:
+        for start in range(FIRST_UNITID, last, batch_size):
+            batch = {table: [] for table in tables}
+            for unitid in range(start, min(start + batch_size, last)):
+                for table, rows in school_rows(unitid, rng, years).items():
+                    batch[table].extend(rows)
+            for table, model in tables.items():
+                connection.execute(insert(model), batch[table])
+        create_search_index(connection)
+        create_spatial_index(connection)
+    with Session(engine) as session:
+        bump_data_version(session)
+        session.commit()
+    engine.dispose()
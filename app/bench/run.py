@@ -0,0 +1,131 @@
+"""
+Benchmarks the /v1/schools location endpoints against a synthetic dataset.
+
+Usage::
+
+    python -m app.bench --schools 100000 --concurrency 16 --compare
+"""
+
+import argparse
+import logging
+from pathlib import Path
+from .dataset import generate
+from .runner import (
+    DEFAULT_TOLERANCE,
+    SCENARIOS,
+    baseline_key,
+    compare,
+    load_baselines,
+    run_benchmark,
+    save_baseline,
+)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.bench", description=__doc__.strip().splitlines()[0]
+    )
+    parser.add_argument("--schools", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--data-dir",
+        default="bench_data",
+        help="Where generated datasets are kept and reused (default: bench_data).",
+    )
+    parser.add_argument(
+        "--scenario",
+        dest="scenarios",
+        action="append",
+        choices=list(SCENARIOS),
+        help="Endpoint to benchmark; repeatable (default: all).",
+    )
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument(
+        "--warm-caches",
+        action="store_true",
+        help="Keep the response, serialized school and count caches between requests, "
+        "measuring cache hits rather than queries and serialization.",
+    )
+    parser.add_argument(
+        "--baselines",
+        help="File the baselines are kept in (default: baselines.json in --data-dir). "
+        "Latencies only compare on the machine that recorded them.",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store the results as the baseline for this size and concurrency.",
+    )
+    parser.add_argument(
+        "--compare",
+        action="store_true",
+        help="Exit with status 1 if any metric regressed against the stored baseline.",
+    )
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    return parser.parse_args(argv)
+
+
+def dataset_path(args) -> Path:
+    """Returns the dataset for ``args``, generating it the first time."""
+    directory = Path(args.data_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"schools_{args.schools}_seed{args.seed}.db"
+    if not path.exists():
+        logging.info(f"Generating {args.schools} schools into {path}.")
+        partial = path.with_suffix(".tmp")
+        partial.unlink(missing_ok=True)
+        generate(partial, args.schools, seed=args.seed)
+        partial.replace(path)
+    return path
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    # One log line per benchmark request would drown out the report.
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    results = run_benchmark(
+        dataset_path(args),
+        scenarios=args.scenarios or list(SCENARIOS),
+        requests=args.requests,
+        concurrency=args.concurrency,
+        warmup=args.warmup,
+        seed=args.seed,
+        warm_caches=args.warm_caches,
+    )
+
+    print(
+        f"{'scenario':<10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+        f"{'req/s':>10}{'alloc KiB':>12}{'errors':>8}"
+    )
+    for name, result in results.items():
+        print(
+            f"{name:<10}{result.p50_ms:>10.2f}{result.p95_ms:>10.2f}"
+            f"{result.p99_ms:>10.2f}{result.throughput_rps:>10.1f}"
+            f"{result.peak_alloc_kib:>12.1f}{result.errors:>8}"
+        )
+
+    baselines = args.baselines or Path(args.data_dir) / "baselines.json"
+    key = baseline_key(args.schools, args.concurrency)
+    status = 0
+    if any(result.errors for result in results.values()):
+        logging.error("Some requests did not succeed.")
+        status = 1
+    if args.compare:
+        baseline = load_baselines(baselines).get(key)
+        if baseline is None:
+            logging.warning(f"No baseline stored for {key}.")
+        else:
+            regressions = compare(results, baseline, args.tolerance)
+            for regression in regressions:
+                logging.error(f"Regression: {regression}")
+            if regressions:
+                status = 1
+    if args.save_baseline:
+        save_baseline(baselines, key, results)
+        logging.info(f"Saved baseline {key} to {baselines}.")
+    return status
@@ -0,0 +1,261 @@
+import asyncio
+import json
+import random
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+import httpx
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.config import settings
+from app.db.database import async_database_uri, connect_args
+from app.dependencies import pagination
+from app.dependencies.dependencies import get_db, limiter
+from app.etl.summaries import percentile
+from app.main import app
+from app.schemas import serialization
+from .dataset import LATITUDES, LONGITUDES, NAME_PREFIXES, NAME_STEMS, STATES
+
+# Each router in app/routers/locations.py, with a generator of realistic parameters.
+SCENARIOS = {
+    "name": (
+        "/v1/schools/",
+        lambda rng: {
+            "school_name": f"{rng.choice(NAME_PREFIXES)} {rng.choice(NAME_STEMS)}"
+        },
+    ),
+    "state": (
+        "/v1/schools/state/",
+        lambda rng: {"state_code": rng.choice(rng.choice(list(STATES.values())))},
+    ),
+    "region": (
+        "/v1/schools/region/",
+        lambda rng: {
+            "region": rng.choice(["Southeast", "Far West", "Plains", "Mid East"])
+        },
+    ),
+    "locale": (
+        "/v1/schools/locale/",
+        lambda rng: {"locale": rng.choice(["City", "Suburb", "Town", "Rural"])},
+    ),
+    "zipcode": (
+        "/v1/schools/zipcode/",
+        lambda rng: {"zipcode": f"{rng.randrange(5, 999):03d}"},
+    ),
+    "nearby": (
+        "/v1/schools/nearby/",
+        lambda rng: {
+            "lat": round(rng.uniform(*LATITUDES), 4),
+            "lon": round(rng.uniform(*LONGITUDES), 4),
+            "radius_km": rng.choice([25, 50, 100]),
+        },
+    ),
+}
+
+# Relative change beyond which a metric counts as a regression.
+DEFAULT_TOLERANCE = 0.2
+
+
+@dataclass
+class ScenarioResult:
+    """Latency, throughput and allocation figures for one scenario."""
+
+    requests: int
+    errors: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    throughput_rps: float
+    peak_alloc_kib: float
+
+
+def scenario_requests(name: str, count: int, seed: int = 0) -> list[tuple]:
+    """Returns ``count`` (path, params) pairs for a scenario, the same for each seed."""
+    path, params = SCENARIOS[name]
+    rng = random.Random(f"{name}:{seed}")
+    return [(path, {**params(rng), "limit": 20}) for _ in range(count)]
+
+
+def clear_caches() -> None:
+    """
+    Empties the in-process caches of serialized schools and counts, which would
+    otherwise let repeated requests skip their queries and serialization.
+    """
+    serialization._fragments.clear()
+    pagination._count_cache.clear()
+
+
+async def _drive(client, requests, concurrency: int, cold: bool = True):
+    """
+    Sends ``requests`` from ``concurrency`` concurrent callers, with the in-process
+    caches cleared before each one if ``cold``.
+
+    Returns:
+        tuple: The latency of each request in seconds, the number of non-200
+        responses and the wall time of the whole run.
+    """
+    latencies = []
+    errors = 0
+    pending = iter(requests)
+
+    async def caller():
+        nonlocal errors
+        for path, params in pending:
+            if cold:
+                clear_caches()
+            start = time.perf_counter()
+            response = await client.get(path, params=params)
+            latencies.append(time.perf_counter() - start)
+            errors += response.status_code != 200
+
+    start = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+async def _peak_allocations(client, requests, cold: bool = True) -> float:
+    """Mean peak of memory allocated while serving each request, in KiB."""
+    peaks = []
+    tracemalloc.start()
+    try:
+        for path, params in requests:
+            if cold:
+                clear_caches()
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            await client.get(path, params=params)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+    finally:
+        tracemalloc.stop()
+    return sum(peaks) / len(peaks) / 1024
+
+
+async def _run(database: str, scenarios, requests, concurrency, warmup, seed, cold):
+    serving_engine = create_async_engine(
+        async_database_uri(f"sqlite:///{database}"),
+        connect_args=connect_args(f"sqlite:///{database}"),
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+    )
+    Session = async_sessionmaker(bind=serving_engine, expire_on_commit=False)
+
+    async def bench_db():
+        async with Session() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = bench_db
+    transport = httpx.ASGITransport(app=app)
+    results = {}
+    try:
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            for name in scenarios:
+                batch = scenario_requests(name, warmup + requests, seed)
+                await _drive(client, batch[:warmup], concurrency)
+                latencies, errors, elapsed = await _drive(
+                    client, batch[warmup:], concurrency, cold
+                )
+                latencies = sorted(seconds * 1000 for seconds in latencies)
+                results[name] = ScenarioResult(
+                    requests=len(latencies),
+                    errors=errors,
+                    p50_ms=round(percentile(latencies, 0.5), 3),
+                    p95_ms=round(percentile(latencies, 0.95), 3),
+                    p99_ms=round(percentile(latencies, 0.99), 3),
+                    throughput_rps=round(len(latencies) / elapsed, 1),
+                    peak_alloc_kib=round(
+                        await _peak_allocations(client, batch[warmup:][:20], cold),
+                        1,
+                    ),
+                )
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        await serving_engine.dispose()
+    return results
+
+
+def run_benchmark(
+    database,
+    scenarios=tuple(SCENARIOS),
+    requests: int = 200,
+    concurrency: int = 8,
+    warmup: int = 20,
+    seed: int = 0,
+    warm_caches: bool = False,
+) -> dict[str, ScenarioResult]:
+    """
+    Drives each scenario's endpoint in-process against the SQLite file ``database`` and
+    measures it.
+
+    Every scenario first sends ``warmup`` unmeasured requests, then ``requests``
+    measured ones from ``concurrency`` concurrent callers. Allocations are measured
+    afterwards on a sequential sample, as tracing slows down the timed run. Rate
+    limiting is off. Unless ``warm_caches`` is set, so is the response cache, and the
+    caches of serialized schools and counts are cleared before every measured
+    request, so that the numbers reflect the query and serialization path rather
+    than cache hits.
+    """
+    enabled, cache_enabled = limiter.enabled, settings.response_cache_enabled
+    limiter.enabled = False
+    settings.response_cache_enabled = warm_caches
+    try:
+        return asyncio.run(
+            _run(
+                str(database),
+                scenarios,
+                requests,
+                concurrency,
+                warmup,
+                seed,
+                cold=not warm_caches,
+            )
+        )
+    finally:
+        limiter.enabled = enabled
+        settings.response_cache_enabled = cache_enabled
+
+
+def baseline_key(schools: int, concurrency: int) -> str:
+    return f"{schools}-schools-c{concurrency}"
+
+
+def load_baselines(path) -> dict:
+    path = Path(path)
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def save_baseline(path, key: str, results: dict[str, ScenarioResult]) -> None:
+    """Records ``results`` under ``key``, keeping the baselines of other configurations."""
+    baselines = load_baselines(path)
+    baselines[key] = {name: asdict(result) for name, result in results.items()}
+    Path(path).write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+
+
+def compare(
+    results: dict[str, ScenarioResult],
+    baseline: dict,
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> list[str]:
+    """
+    Lists the metrics that are worse than ``baseline`` by more than ``tolerance``:
+    higher p95/p99 latency or allocations, or lower throughput.
+    """
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        for metric in ("p95_ms", "p99_ms", "peak_alloc_kib"):
+            if getattr(result, metric) > before[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{name} {metric}: {before[metric]} -> {getattr(result, metric)}"
+                )
+        if result.throughput_rps < before["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{name} throughput_rps: {before['throughput_rps']} -> {result.throughput_rps}"
+            )
+    return regressions
@@ -0,0 +1,77 @@
+from sqlalchemy import create_engine, func, select
+from app.db.models import Finance, Location, School
+from app.etl.transforms import DEFAULT_YEARS
+from app.schemas import serialization
+from .dataset import generate
+from .runner import SCENARIOS, ScenarioResult, compare, run_benchmark
+
+
+def test_generate_is_deterministic(tmp_path):
+    for name in ("a.db", "b.db"):
+        generate(tmp_path / name, 50, seed=3, batch_size=20)
+
+    rows = []
+    for name in ("a.db", "b.db"):
+        with create_engine(f"sqlite:///{tmp_path / name}").connect() as connection:
+            assert connection.scalar(select(func.count()).select_from(School)) == 50
+            assert connection.scalar(
+                select(func.count()).select_from(Finance)
+            ) == 50 * len(DEFAULT_YEARS)
+            rows.append(connection.execute(select(Location)).all())
+    assert rows[0] == rows[1]
+
+
+def test_run_benchmark_measures_every_scenario(tmp_path):
+    generate(tmp_path / "bench.db", 200)
+
+    results = run_benchmark(tmp_path / "bench.db", requests=10, concurrency=3, warmup=2)
+
+    assert set(results) == set(SCENARIOS)
+    for result in results.values():
+        assert result.requests == 10 and result.errors == 0
+        assert 0 < result.p50_ms <= result.p95_ms <= result.p99_ms
+        assert result.throughput_rps > 0 and result.peak_alloc_kib > 0
+
+
+def test_compare_flags_regressions_beyond_tolerance():
+    baseline = {
+        "state": dict(
+            p95_ms=10.0, p99_ms=20.0, throughput_rps=100.0, peak_alloc_kib=50.0
+        )
+    }
+    result = ScenarioResult(
+        requests=10,
+        errors=0,
+        p50_ms=5.0,
+        p95_ms=11.0,
+        p99_ms=30.0,
+        throughput_rps=70.0,
+        peak_alloc_kib=50.0,
+    )
+
+    regressions = compare({"state": result}, baseline, tolerance=0.2)
+
+    assert [r.split(":")[0] for r in regressions] == [
+        "state p99_ms",
+        "state throughput_rps",
+    ]
+
+
+def test_measured_requests_start_with_empty_caches(tmp_path, monkeypatch):
+    generate(tmp_path / "bench.db", 50)
+    sizes = []
+    original = serialization.school_fragments
+
+    async def record_cache_size(*args, **kwargs):
+        sizes.append(len(serialization._fragments))
+        return await original(*args, **kwargs)
+
+    monkeypatch.setattr("app.routers.locations.school_fragments", record_cache_size)
+    run_benchmark(
+        tmp_path / "bench.db",
+        scenarios=["state"],
+        requests=5,
+        concurrency=1,
+        warmup=0,
+    )
+    assert sizes and set(sizes) == {0}
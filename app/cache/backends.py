@@ -0,0 +1,137 @@
+from threading import Lock
+from app.config import settings
+from .lru import LRUCache
+
+
+class CacheBackend:
+    """
+    Stores pre-serialized response bodies by string key.
+
+    Subclasses implement the coroutines `_get`, `_set` and `_clear`, so that a backend
+    reached over the network never blocks the event loop; hit and miss counting is
+    shared. Counters are per process even when the storage is shared between workers.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+
+    async def get(self, key: str) -> bytes | None:
+        value = await self._get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes) -> None:
+        await self._set(key, value)
+
+    async def clear(self) -> None:
+        await self._clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "hits": self.hits, "misses": self.misses}
+
+    async def _get(self, key: str) -> bytes | None:
+        raise NotImplementedError
+
+    async def _set(self, key: str, value: bytes) -> None:
+        raise NotImplementedError
+
+    async def _clear(self) -> None:
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """Per-process LRU with TTL. Suitable for a single worker."""
+
+    name = "memory"
+
+    def __init__(self, maxsize: int, ttl: float | None = None):
+        super().__init__()
+        self._cache = LRUCache(maxsize=maxsize, ttl=ttl)
+
+    async def _get(self, key):
+        return self._cache.get(key)
+
+    async def _set(self, key, value):
+        self._cache.set(key, value)
+
+    async def _clear(self):
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        stats = self._cache.stats()
+        stats.update(super().stats())
+        return stats
+
+
+class RedisBackend(CacheBackend):
+    """
+    Shared storage on any server speaking the Redis protocol, so that one worker's
+    miss warms every other worker. Entries expire after `ttl` seconds; memory bounds
+    are left to the server's `maxmemory-policy` (e.g. `allkeys-lru`).
+
+    `client` may be any object with the `redis.asyncio.Redis` methods used here, which
+    lets tests substitute a local stand-in for a server.
+    """
+
+    name = "redis"
+
+    def __init__(self, client, ttl: float | None = None, prefix: str = "cache"):
+        super().__init__()
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisBackend":
+        try:
+            from redis import asyncio as redis
+        except ImportError as e:
+            raise RuntimeError(
+                "The redis cache backend requires the `redis` package."
+            ) from e
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    async def _get(self, key):
+        return await self.client.get(self._key(key))
+
+    async def _set(self, key, value):
+        ttl = int(self.ttl) if self.ttl else None
+        await self.client.set(self._key(key), value, ex=ttl)
+
+    async def _clear(self):
+        keys = [key async for key in self.client.scan_iter(match=f"{self.prefix}:*")]
+        if keys:
+            await self.client.delete(*keys)
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats.update({"ttl": self.ttl, "prefix": self.prefix})
+        return stats
+
+
+def create_backend() -> CacheBackend:
+    """Builds the response cache backend selected by `settings.cache_backend`."""
+    if settings.cache_backend == "redis":
+        return RedisBackend.from_url(
+            settings.cache_redis_url,
+            ttl=settings.response_cache_ttl_seconds,
+            prefix=settings.cache_key_prefix,
+        )
+    return MemoryBackend(
+        maxsize=settings.response_cache_size,
+        ttl=settings.response_cache_ttl_seconds,
+    )
@@ -0,0 +1,84 @@
+import functools
+import hashlib
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Response
+from app.config import settings
+from app.db.versioning import data_version_stamp
+from .responses import cache_key
+
+
+def cache_control() -> str:
+    return (
+        f"public, max-age={settings.http_max_age}, "
+        f"s-maxage={settings.http_s_maxage}, "
+        f"stale-while-revalidate={settings.http_stale_while_revalidate}"
+    )
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison, as If-None-Match calls for."""
+    if header.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in header.split(","))
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def _not_modified_since(header: str, loaded_at) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have whole seconds.
+    return loaded_at.replace(microsecond=0) <= since
+
+
+def conditional_response(func):
+    """
+    Adds HTTP validators to a dataset route and answers conditional requests.
+
+    The strong ETag is derived from the same key as `cached_response`: the route, its
+    normalized parameters, the database and the dataset version, so it changes exactly
+    when the body can. `Last-Modified` is the time of the ETL load behind the version.
+    A matching `If-None-Match` (or, without one, `If-Modified-Since`) gets an empty 304
+    before the route runs; the dataset version it is checked against is the one this
+    worker already holds, re-read from the database at most every
+    `data_version_poll_seconds`.
+
+    The route must take the request as ``request`` and its session as ``db`` keyword
+    arguments, and return a `Response`.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        request, db = kwargs["request"], kwargs["db"]
+        version, loaded_at = await data_version_stamp(db)
+        key = await cache_key(func.__name__, db, kwargs)
+        headers = {
+            "ETag": f'"{hashlib.sha256(key.encode()).hexdigest()[:32]}"',
+            "Cache-Control": cache_control(),
+        }
+        if loaded_at is not None:
+            loaded_at = loaded_at.replace(tzinfo=timezone.utc)
+            headers["Last-Modified"] = format_datetime(loaded_at, usegmt=True)
+
+        if_none_match = request.headers.get("if-none-match")
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_none_match is not None:
+            not_modified = _etag_matches(if_none_match, headers["ETag"])
+        else:
+            not_modified = (
+                if_modified_since is not None
+                and loaded_at is not None
+                and _not_modified_since(if_modified_since, loaded_at)
+            )
+        if not_modified:
+            return Response(status_code=304, headers=headers)
+
+        response = await func(*args, **kwargs)
+        response.headers.update(headers)
+        return response
+
+    return wrapper
@@ -0,0 +1,58 @@
+import functools
+import hashlib
+from fastapi import Response
+from app.config import settings
+from app.db.versioning import current_data_version
+from .backends import create_backend
+
+response_cache = create_backend()
+
+
+def _normalize(value):
+    """Reduces a route argument to a hashable value that identifies its effect."""
+    if isinstance(value, str):
+        # Every filter is matched case-insensitively.
+        return value.lower()
+    if hasattr(value, "__dict__"):
+        # Dependency classes such as Pagination; an opaque cursor is case-sensitive.
+        return tuple(sorted(value.__dict__.items()))
+    return value
+
+
+async def cache_key(route: str, db, params: dict) -> str:
+    """
+    Builds the cache key for a route call. Keys are plain strings so that every worker
+    sharing a backend derives the same key for the same request.
+    """
+    normalized = tuple(
+        (name, _normalize(value))
+        for name, value in sorted(params.items())
+        if name not in ("request", "db")
+    )
+    digest = hashlib.sha256(repr((str(db.bind.url), normalized)).encode()).hexdigest()
+    return f"{route}:{await current_data_version(db)}:{digest}"
+
+
+def cached_response(func):
+    """
+    Caches a route's serialized JSON response in `response_cache`.
+
+    The key covers the route, the database, the dataset version and the route's
+    normalized query parameters, so a new ETL load invalidates every entry. Hits are
+    returned as raw bytes without touching the route. The route must be a coroutine
+    returning a JSON `Response` and take its session as the `db` keyword argument.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        if not settings.response_cache_enabled:
+            return await func(*args, **kwargs)
+
+        key = await cache_key(func.__name__, kwargs["db"], kwargs)
+        body = await response_cache.get(key)
+        if body is None:
+            body = (await func(*args, **kwargs)).body
+            await response_cache.set(key, body)
+        return Response(content=body, media_type="application/json")
+
+    return wrapper
@@ -0,0 +1,65 @@
+from typing import Literal
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    """Runtime configuration, read from the environment or a `.env` file."""
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    # Maximum number of (filter, dataset version) totals remembered per process.
+    count_cache_size: int = 1024
+    # Cache of whole responses, keyed on route, filters and dataset version.
+    response_cache_enabled: bool = True
+    response_cache_size: int = 512
+    response_cache_ttl_seconds: float = 300.0
+    # "memory" keeps the cache per worker; "redis" shares it between workers and nodes.
+    cache_backend: Literal["memory", "redis"] = "memory"
+    cache_redis_url: str = "redis://localhost:6379/0"
+    cache_key_prefix: str = "campuscompass"
+    # Cache-Control of dataset responses: browsers revalidate after `http_max_age`,
+    # shared caches such as a CDN after `http_s_maxage`, both with the ETag.
+    http_max_age: int = 60
+    http_s_maxage: int = 3600
+    http_stale_while_revalidate: int = 60
+    # How responses load the relationships they include: "auto" joins one-per-school
+    # relationships into the school query and fetches collections with `IN` queries.
+    loader_strategy: Literal["auto", "selectin", "joined"] = "auto"
+    # Serialized schools reused across pages; the full dataset is ~6.5k schools per shape.
+    fragment_cache_size: int = 20000
+    # Most schools one /v1/schools/batch request may ask for.
+    batch_max_ids: int = 200
+    # SQLite tuning for the API's engine. "default" leaves SQLite's defaults alone;
+    # "production" applies the settings below and, if `sqlite_read_only`, opens the
+    # database file read-only (the ETL keeps writing through its own engine).
+    sqlite_profile: Literal["default", "production"] = "default"
+    sqlite_journal_mode: str = "wal"
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size_kib: int = 64 * 1024
+    sqlite_temp_store: Literal["default", "file", "memory"] = "memory"
+    sqlite_read_only: bool = True
+    # Connections kept open per worker process by the API's engine.
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    # Serve the /v1/schools lookups from an in-memory copy of the dataset, loaded at
+    # startup and reloaded when the dataset version changes, instead of the database.
+    memory_dataset: bool = False
+    # How long a worker trusts the dataset version it last read before re-checking.
+    data_version_poll_seconds: float = 5.0
+    # "memory" counts rate limits per worker; "redis" keeps one sliding window per
+    # client for all workers and nodes, so a limit holds across the deployment.
+    rate_limit_storage: Literal["memory", "redis"] = "memory"
+    rate_limit_redis_url: str = "redis://localhost:6379/0"
+    # Requests allowed per client in each tier; callers without an API key get "default".
+    rate_limit_tiers: dict[str, str] = {"default": "5/minute"}
+    # API keys accepted in the `X-API-Key` header, each mapped to its tier.
+    api_keys: dict[str, str] = {}
+    # Client addresses and API keys that are never rate limited, e.g. internal services.
+    rate_limit_allowlist: list[str] = []
+    # Per-request timing in a `Server-Timing` header and Prometheus metrics at /metrics.
+    request_metrics_enabled: bool = True
+    # Requests running more SQL statements than this are logged, to surface N+1 loads.
+    request_statement_warning: int = 25
+
+
+settings = Settings()
@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+from pathlib import Path
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.engine import make_url
+
+# The revision whose tables databases created before the migrations already contain.
+INITIAL_REVISION = "2418f2a13fa2"
+
+
+def pytest_configure(config):
+    """
+    Points the tests at a copy of the SQLite database in `DATABASE_URI` migrated to the
+    latest revision, so that the bundled `compass_db.db` is used as shipped and never
+    written to.
+    """
+    uri = os.getenv("DATABASE_URI")
+    if not uri or make_url(uri).get_backend_name() != "sqlite":
+        return
+    source = make_url(uri).database
+    if not source or source == ":memory:":
+        return
+    directory = Path(tempfile.mkdtemp(prefix="compass-tests-"))
+    copy = directory / Path(source).name
+    shutil.copy(source, copy)
+    migrated = f"sqlite:///{copy}"
+
+    engine = create_engine(migrated)
+    tables = inspect(engine).get_table_names()
+    engine.dispose()
+    os.environ["DATABASE_URI"] = migrated
+    # Configured without alembic.ini, whose logging setup would take over pytest's.
+    alembic = Config()
+    alembic.set_main_option(
+        "script_location", str(Path(__file__).parent.parent / "alembic")
+    )
+    if "schools" in tables and "alembic_version" not in tables:
+        command.stamp(alembic, INITIAL_REVISION)
+    command.upgrade(alembic, "head")
+    config.migrated_database = directory
+
+
+def pytest_unconfigure(config):
+    directory = getattr(config, "migrated_database", None)
+    if directory is not None:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    """Keeps the 5/minute limits from leaking between tests that share an endpoint."""
+    from .dependencies.dependencies import limiter
+
+    limiter.reset()
+    yield
+    limiter.reset()
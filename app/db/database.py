@@ -1,14 +1,86 @@
 from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from dotenv import load_dotenv
+from app.config import settings
 import os
 
 load_dotenv()
 
 DATABASE_URI = os.getenv("DATABASE_URI")
 
-engine = create_engine(DATABASE_URI, connect_args={"check_same_thread": False})
+# Async drivers used by the API for each database backend.
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def is_sqlite_file(uri: str) -> bool:
+    url = make_url(uri)
+    return url.get_backend_name() == "sqlite" and url.database not in (
+        None,
+        "",
+        ":memory:",
+    )
+
+
+def tuned_sqlite() -> bool:
+    """Whether the API's engine runs with the production SQLite profile."""
+    return settings.sqlite_profile == "production" and is_sqlite_file(DATABASE_URI)
+
+
+def async_database_uri(uri: str, read_only: bool = False) -> str:
+    """
+    Rewrites a database URI to use the async driver for its backend, e.g.
+    `sqlite:///compass_db.db` becomes `sqlite+aiosqlite:///compass_db.db`.
+
+    With `read_only`, a SQLite file is opened through a `mode=ro` URI instead.
+    """
+    url = make_url(uri)
+    backend = url.get_backend_name()
+    if backend in ASYNC_DRIVERS:
+        url = url.set(drivername=ASYNC_DRIVERS[backend])
+    if read_only and is_sqlite_file(uri):
+        url = url.set(
+            database=f"file:{url.database}",
+            query={**url.query, "mode": "ro", "uri": "true"},
+        )
+    return url.render_as_string(hide_password=False)
+
+
+def connect_args(uri: str) -> dict:
+    if make_url(uri).get_backend_name() == "sqlite":
+        return {"check_same_thread": False}
+    return {}
+
+
+def sqlite_serving_pragmas() -> list[str]:
+    """Per-connection pragmas for the production profile, from settings."""
+    pragmas = [
+        f"PRAGMA mmap_size={settings.sqlite_mmap_size}",
+        # Negative values are in KiB rather than pages.
+        f"PRAGMA cache_size=-{settings.sqlite_cache_size_kib}",
+        f"PRAGMA temp_store={settings.sqlite_temp_store}",
+    ]
+    if settings.sqlite_read_only:
+        pragmas.append("PRAGMA query_only=ON")
+    return pragmas
+
+
+# Synchronous engine, used by the ETL and migrations.
+engine = create_engine(DATABASE_URI, connect_args=connect_args(DATABASE_URI))
+
+# Async engine, used by the API so requests don't hold a threadpool thread while waiting
+# on the database. Connections are pooled so each keeps its page cache warm.
+async_engine = create_async_engine(
+    async_database_uri(
+        DATABASE_URI, read_only=tuned_sqlite() and settings.sqlite_read_only
+    ),
+    connect_args=connect_args(DATABASE_URI),
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+)
 
 
 @event.listens_for(Engine, "connect")
@@ -19,6 +91,31 @@ def set_sqlite_pragma(dbapi_connection, connection_record):
         cursor.close()
 
 
+@event.listens_for(async_engine.sync_engine, "connect")
+def set_sqlite_serving_pragmas(dbapi_connection, connection_record):
+    if tuned_sqlite():
+        cursor = dbapi_connection.cursor()
+        for pragma in sqlite_serving_pragmas():
+            cursor.execute(pragma)
+        cursor.close()
+
+
+def prepare_database() -> None:
+    """
+    Applies file-level settings that persist in the database itself and so cannot be
+    set through a read-only connection; called once when the API starts.
+    """
+    if tuned_sqlite():
+        with engine.connect() as connection:
+            connection.exec_driver_sql(
+                f"PRAGMA journal_mode={settings.sqlite_journal_mode}"
+            )
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
@@ -0,0 +1,43 @@
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.cache.lru import LRUCache
+from .versioning import current_data_version
+
+# Distinct values of low-cardinality columns, keyed on (database, dataset version, column).
+_distinct_values = LRUCache(maxsize=64)
+
+
+def prefix_match(column, prefix: str):
+    """
+    Matches values of ``column`` starting with ``prefix`` as a range, which unlike
+    ``LIKE 'x%'`` can use a plain index on every dialect.
+    """
+    if not prefix:
+        return column.is_not(None)
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return and_(column >= prefix, column < upper)
+
+
+async def distinct_values(db: AsyncSession, column) -> list[str]:
+    """Returns the distinct non-null values of an indexed ``column``, cached per dataset version."""
+    key = (str(db.bind.url), await current_data_version(db), str(column))
+    values = _distinct_values.get(key)
+    if values is None:
+        values = list(
+            await db.scalars(select(column).where(column.is_not(None)).distinct())
+        )
+        _distinct_values.set(key, values)
+    return values
+
+
+async def substring_match(db: AsyncSession, column, term: str):
+    """
+    Matches values of a low-cardinality ``column`` containing ``term``, ignoring case.
+
+    The handful of distinct values (e.g. ten regions) is searched in Python and the
+    query filters on the exact matches, so it can use the column's index instead of
+    scanning every row with ``ILIKE '%term%'``.
+    """
+    term = term.lower()
+    values = await distinct_values(db, column)
+    return column.in_([value for value in values if term in value.lower()])
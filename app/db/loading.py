@@ -0,0 +1,59 @@
+from typing import Literal
+from sqlalchemy import PrimaryKeyConstraint, UniqueConstraint
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+
+# "auto" joins relationships with at most one row per parent into the parent query and
+# loads collections with one extra `IN` query each; the others force one strategy.
+LoaderStrategy = Literal["auto", "selectin", "joined"]
+
+
+def at_most_one(relationship) -> bool:
+    """
+    Whether a unique index or constraint on the foreign key allows at most one related
+    row per parent, e.g. `School.locations`, so joining it cannot duplicate parent rows.
+    """
+    prop = relationship.property
+    keys = {column.name for column in prop.remote_side}
+    table = prop.mapper.local_table
+    uniques = [
+        {column.name for column in index.columns}
+        for index in table.indexes
+        if index.unique
+    ]
+    uniques += [
+        {column.name for column in constraint.columns}
+        for constraint in table.constraints
+        if isinstance(constraint, (PrimaryKeyConstraint, UniqueConstraint))
+    ]
+    uniques += [{column.name} for column in table.columns if column.unique]
+    return any(unique and unique <= keys for unique in uniques)
+
+
+def loader_option(relationship, strategy: LoaderStrategy = "auto"):
+    """Returns the eager loader option for ``relationship`` under ``strategy``."""
+    if strategy == "auto":
+        strategy = "joined" if at_most_one(relationship) else "selectin"
+    if strategy == "joined":
+        return joinedload(relationship)
+    return selectinload(relationship)
+
+
+class ResponseShape:
+    """
+    Declares the relationships a response includes for each row and how the row's
+    response model is built from them.
+
+    Relationships not declared are set to raise when accessed, so a build that
+    reaches for one fails loudly in tests instead of issuing a query per row.
+    """
+
+    def __init__(self, build, includes=()):
+        self.build = build
+        self.includes = tuple(includes)
+
+    def options(self, strategy: LoaderStrategy = "auto") -> list:
+        """Loader options for a query of the shape's rows."""
+        return [
+            *(loader_option(relationship, strategy) for relationship in self.includes),
+            raiseload("*"),
+        ]
@@ -0,0 +1,256 @@
+"""
+Read-only, in-memory copy of the dataset that the /v1/schools lookups can be served
+from without touching the database.
+
+The ETL only changes the data between runs, so with `settings.memory_dataset` on the
+API loads every school with its related rows at startup into `__slots__` records and
+prebuilds hash indexes on state, region, locale and zipcode and a latitude-sorted
+array of coordinates. Name searches, which are ranked by the full-text index, are
+left to the database. A background task polls the dataset
+version and, when the ETL has produced a new one, loads it alongside the current copy
+and swaps the two in a single assignment, so a request sees either copy in full.
+"""
+
+import asyncio
+import logging
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from itertools import chain
+from sqlalchemy import create_engine, inspect, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import NullPool
+from app.config import settings
+from .models import Admission, Control, DataVersion, Finance, Location, School
+from .spatial import KM_PER_DEGREE
+from .versioning import DATA_VERSION_ID, pin_data_version
+
+
+class Record:
+    """A row as attributes named like the model's columns, without a per-row dict."""
+
+    __slots__ = ()
+
+    def __init__(self, row):
+        for name, value in zip(self.__slots__, row):
+            setattr(self, name, value)
+
+
+def record_type(model) -> type:
+    """Returns a `Record` class with a slot per column of ``model``'s table."""
+    columns = tuple(column.key for column in model.__table__.columns)
+    return type(f"{model.__name__}Record", (Record,), {"__slots__": columns})
+
+
+class SchoolRecord:
+    """A school with its related records, under the `School` relationship names."""
+
+    __slots__ = (
+        "unitid",
+        "name",
+        "url",
+        "locations",
+        "finances",
+        "admissions",
+        "controls",
+    )
+
+    def __init__(self, unitid, name, url):
+        self.unitid = unitid
+        self.name = name
+        self.url = url
+        self.locations = []
+        self.finances = []
+        self.admissions = []
+        self.controls = []
+
+
+# Related tables, the `SchoolRecord` attribute each is gathered in and its record type.
+RELATED = [
+    (Location, "locations", record_type(Location)),
+    (Finance, "finances", record_type(Finance)),
+    (Admission, "admissions", record_type(Admission)),
+    (Control, "controls", record_type(Control)),
+]
+
+
+def _ids(unitids) -> array:
+    return array("q", sorted(unitids))
+
+
+def _merge(arrays) -> list[int]:
+    arrays = list(arrays)
+    if len(arrays) == 1:
+        return arrays[0]
+    return sorted(chain.from_iterable(arrays))
+
+
+class Dataset:
+    """
+    One immutable snapshot of the dataset and its indexes.
+
+    Lookups return school ids in ascending order, the order the database routes page
+    through them in. Serialized schools are kept per response shape in `fragments`;
+    as the snapshot never changes they stay valid for its lifetime.
+    """
+
+    def __init__(self, schools: dict, url: str, version: int = 0, loaded_at=None):
+        self.schools = schools
+        self.url = url
+        self.stamp = (version, loaded_at)
+        self.fragments = {}
+        self.unitids = _ids(schools)
+
+        by_state = defaultdict(list)
+        by_region = defaultdict(list)
+        by_locale = defaultdict(list)
+        by_zipcode = defaultdict(list)
+        coordinates = []
+        for unitid in self.unitids:
+            school = schools[unitid]
+            for location in school.locations:
+                by_state[location.state].append(unitid)
+                by_zipcode[location.zipcode].append(unitid)
+                if location.region is not None:
+                    by_region[location.region].append(unitid)
+                if location.locale is not None:
+                    by_locale[location.locale].append(unitid)
+                if location.latitude is not None and location.longitude is not None:
+                    coordinates.append((location.latitude, location.longitude, unitid))
+
+        self.by_state = {key: _ids(ids) for key, ids in by_state.items()}
+        self.by_region = {key: _ids(ids) for key, ids in by_region.items()}
+        self.by_locale = {key: _ids(ids) for key, ids in by_locale.items()}
+        self.by_zipcode = {key: _ids(ids) for key, ids in by_zipcode.items()}
+        self.zipcodes = sorted(self.by_zipcode)
+        coordinates.sort()
+        self.latitudes = array("d", [row[0] for row in coordinates])
+        self.longitudes = array("d", [row[1] for row in coordinates])
+        self.located = array("q", [row[2] for row in coordinates])
+
+    def state(self, code: str):
+        """Schools in the state ``code``, ignoring case."""
+        return self.by_state.get(code.upper(), ())
+
+    def _substring(self, index: dict, term: str):
+        term = term.lower()
+        return _merge(ids for value, ids in index.items() if term in value.lower())
+
+    def region(self, term: str):
+        """Schools in every region whose name contains ``term``, ignoring case."""
+        return self._substring(self.by_region, term)
+
+    def locale(self, term: str):
+        """Schools in every locale whose name contains ``term``, ignoring case."""
+        return self._substring(self.by_locale, term)
+
+    def zipcode(self, prefix: str):
+        """Schools whose zipcode starts with ``prefix``."""
+        if not prefix:
+            return _merge(self.by_zipcode.values())
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        keys = self.zipcodes[
+            bisect_left(self.zipcodes, prefix) : bisect_left(self.zipcodes, upper)
+        ]
+        return _merge(self.by_zipcode[key] for key in keys)
+
+    def near(self, lat: float, radius_km: float):
+        """
+        Yields the id and coordinates of the located schools in the latitude band of a
+        circle; callers compute exact distances on them.
+        """
+        dlat = radius_km / KM_PER_DEGREE
+        start = bisect_left(self.latitudes, lat - dlat)
+        end = bisect_right(self.latitudes, lat + dlat)
+        for i in range(start, end):
+            yield self.located[i], self.latitudes[i], self.longitudes[i]
+
+
+def _read_version(connection) -> tuple:
+    if not inspect(connection).has_table(DataVersion.__tablename__):
+        return (0, None)
+    row = connection.execute(
+        select(DataVersion.version, DataVersion.loaded_at).where(
+            DataVersion.id == DATA_VERSION_ID
+        )
+    ).first()
+    return (row.version, row.loaded_at) if row is not None else (0, None)
+
+
+def read_version(bind) -> int:
+    with bind.connect() as connection:
+        return _read_version(connection)[0]
+
+
+def load_dataset(bind, url: str) -> Dataset:
+    """
+    Reads every school and its related rows through ``bind`` (a synchronous engine) in
+    one transaction, and indexes them as the snapshot served for the database ``url``.
+    """
+    with bind.connect() as connection:
+        stamp = _read_version(connection)
+        schools = {
+            row.unitid: SchoolRecord(row.unitid, row.name, row.url)
+            for row in connection.execute(select(School.__table__))
+        }
+        for model, attribute, record in RELATED:
+            table = model.__table__
+            for row in connection.execute(select(table).order_by(table.c.id)):
+                school = schools.get(row.school_unitid)
+                if school is not None:
+                    getattr(school, attribute).append(record(row))
+    for school in schools.values():
+        school.finances.sort(key=lambda row: row.year)
+        school.admissions.sort(key=lambda row: row.year)
+        for _, attribute, _ in RELATED:
+            setattr(school, attribute, tuple(getattr(school, attribute)))
+    return Dataset(schools, url, *stamp)
+
+
+# The snapshot being served. Replaced, never mutated, so reading it needs no lock.
+_active: Dataset | None = None
+
+
+def activate(dataset: Dataset | None) -> None:
+    """Serves ``dataset`` from now on, or stops serving from memory if it is None."""
+    global _active
+    previous, _active = _active, dataset
+    if previous is not None:
+        pin_data_version(previous.url, None)
+    if dataset is not None:
+        pin_data_version(dataset.url, dataset.stamp)
+
+
+def active_dataset(url: str) -> Dataset | None:
+    """Returns the snapshot serving the database ``url``, if there is one."""
+    dataset = _active
+    if dataset is not None and dataset.url == url:
+        return dataset
+    return None
+
+
+async def keep_current(bind, url: str) -> None:
+    """Reloads the snapshot whenever the dataset version in the database changes."""
+    while True:
+        await asyncio.sleep(settings.data_version_poll_seconds)
+        try:
+            version = await asyncio.to_thread(read_version, bind)
+            if _active is None or version != _active.stamp[0]:
+                activate(await asyncio.to_thread(load_dataset, bind, url))
+                logging.info(f"Serving dataset version {version} from memory.")
+        except SQLAlchemyError:
+            logging.exception("Could not refresh the in-memory dataset.")
+
+
+async def serve_from_memory(database_uri: str, url: str) -> asyncio.Task:
+    """
+    Loads the snapshot of ``database_uri`` served in place of the database ``url`` and
+    starts keeping it current; the caller cancels the returned task on shutdown.
+
+    The snapshot is read through its own unpooled engine so that each reload opens the
+    database file afresh, picking up a file that was replaced rather than updated.
+    """
+    bind = create_engine(database_uri, poolclass=NullPool)
+    activate(await asyncio.to_thread(load_dataset, bind, url))
+    logging.info(f"Serving {len(_active.schools)} schools from memory.")
+    return asyncio.create_task(keep_current(bind, url))
@@ -1,4 +1,14 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, Date
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Float,
+    Boolean,
+    ForeignKey,
+    Date,
+    DateTime,
+    Index,
+)
 from sqlalchemy.orm import relationship
 from .database import Base
 
@@ -18,13 +28,27 @@ class School(Base):
 
 class Location(Base):
     __tablename__ = "location"
+    # Filter indexes carry school_unitid so that filtering to school ids is index-only.
+    __table_args__ = (
+        Index("ix_location_state_school_unitid", "state", "school_unitid"),
+        Index("ix_location_region_school_unitid", "region", "school_unitid"),
+        Index("ix_location_locale_school_unitid", "locale", "school_unitid"),
+        Index("ix_location_zipcode_school_unitid", "zipcode", "school_unitid"),
+        # Bounding box scans where the SQLite R*Tree (app.db.spatial) is unavailable.
+        Index("ix_location_latitude_longitude", "latitude", "longitude"),
+    )
     id = Column(Integer, primary_key=True)
-    school_unitid = Column(Integer, ForeignKey("schools.unitid"))
+    # One location per school; the ETL upserts on it.
+    school_unitid = Column(
+        Integer, ForeignKey("schools.unitid"), index=True, unique=True
+    )
     city = Column(String, nullable=False)
     zipcode = Column(String, nullable=False)
     state = Column(String, nullable=False)
     region = Column(String, nullable=True)
     locale = Column(String, nullable=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
 
     # Relationship with School
     school = relationship("School", back_populates="locations")
@@ -32,6 +56,14 @@ class Location(Base):
 
 class Finance(Base):
     __tablename__ = "finance"
+    # One row per school and year; the ETL upserts on it.
+    __table_args__ = (
+        Index("ix_finance_school_unitid_year", "school_unitid", "year", unique=True),
+        # Range filters and sorting on avg_net_price within a year, for /v1/schools/search.
+        Index(
+            "ix_finance_year_avg_net_price", "year", "avg_net_price", "school_unitid"
+        ),
+    )
     id = Column(Integer, primary_key=True)
     school_unitid = Column(Integer, ForeignKey("schools.unitid"))
     year = Column(Date)
@@ -49,8 +81,14 @@ class Finance(Base):
 
 class Control(Base):
     __tablename__ = "control"
+    __table_args__ = (
+        Index("ix_control_control_school_unitid", "control", "school_unitid"),
+    )
     id = Column(Integer, primary_key=True)
-    school_unitid = Column(Integer, ForeignKey("schools.unitid"))
+    # One control record per school; the ETL upserts on it.
+    school_unitid = Column(
+        Integer, ForeignKey("schools.unitid"), index=True, unique=True
+    )
     under_investigation = Column(Boolean)
     predominant_deg = Column(String)
     highest_deg = Column(String)
@@ -66,6 +104,17 @@ class Control(Base):
 
 class Admission(Base):
     __tablename__ = "admission"
+    # One row per school and year; the ETL upserts on it.
+    __table_args__ = (
+        Index("ix_admission_school_unitid_year", "school_unitid", "year", unique=True),
+        # Range filters and sorting on admission_rate within a year, for /v1/schools/search.
+        Index(
+            "ix_admission_year_admission_rate",
+            "year",
+            "admission_rate",
+            "school_unitid",
+        ),
+    )
     id = Column(Integer, primary_key=True)
     school_unitid = Column(Integer, ForeignKey("schools.unitid"))
     year = Column(Date)
@@ -82,3 +131,51 @@ class Admission(Base):
 
     # Relationship with School
     school = relationship("School", back_populates="admissions")
+
+
+class DataVersion(Base):
+    """Single-row stamp bumped by the ETL whenever it loads new data."""
+
+    __tablename__ = "data_version"
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    loaded_at = Column(DateTime)
+
+
+class ContentHash(Base):
+    """Hash of the data the ETL last loaded for a school, per set of tables loaded together."""
+
+    __tablename__ = "content_hashes"
+    school_unitid = Column(Integer, ForeignKey("schools.unitid"), primary_key=True)
+    scope = Column(String, primary_key=True)
+    hash = Column(String(64), nullable=False)
+
+
+class ChangeLog(Base):
+    """Schools inserted or updated by the ETL load that produced a dataset version."""
+
+    __tablename__ = "change_log"
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, index=True)
+    school_unitid = Column(Integer, nullable=False)
+    scope = Column(String, nullable=False)
+    change = Column(String, nullable=False)
+
+
+class SchoolStat(Base):
+    """Distribution of a finance or admission metric over the schools in one group and year."""
+
+    __tablename__ = "school_stats"
+    dimension = Column(String, primary_key=True)
+    metric = Column(String, primary_key=True)
+    year = Column(Date, primary_key=True)
+    value = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False)
+    mean = Column(Float)
+    min = Column(Float)
+    p10 = Column(Float)
+    p25 = Column(Float)
+    median = Column(Float)
+    p75 = Column(Float)
+    p90 = Column(Float)
+    max = Column(Float)
@@ -0,0 +1,165 @@
+import re
+from sqlalchemy import (
+    Float,
+    Integer,
+    column,
+    func,
+    inspect,
+    literal_column,
+    table,
+    text,
+)
+from sqlalchemy.engine import Connection
+from .models import School
+
+SEARCH_TABLE = "schools_fts"
+
+schools_fts = table(SEARCH_TABLE, column("rowid", Integer), column("rank", Float))
+
+SQLITE_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        name,
+        content='schools',
+        content_rowid='unitid',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_ai AFTER INSERT ON schools BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, name) VALUES (new.unitid, new.name);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_ad AFTER DELETE ON schools BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, name)
+        VALUES ('delete', old.unitid, old.name);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_au AFTER UPDATE OF name ON schools BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, name)
+        VALUES ('delete', old.unitid, old.name);
+        INSERT INTO {SEARCH_TABLE}(rowid, name) VALUES (new.unitid, new.name);
+    END
+    """,
+]
+
+POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_schools_name_trgm ON schools USING gin (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_schools_name_tsv ON schools "
+    "USING gin (to_tsvector('simple', coalesce(name, '')))",
+]
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Databases (by url) known to have the SQLite FTS5 table, so the check is only paid once.
+_indexed_engines = set()
+
+
+def tokenize(school_name: str) -> list[str]:
+    """
+    Splits a search string into lower-cased word tokens.
+
+    Punctuation is dropped so that user input can never inject FTS5 or tsquery syntax.
+
+    Examples:
+    >>> tokenize("Univ. of Alabama")
+    ['univ', 'of', 'alabama']
+    """
+    return [token.lower() for token in _TOKEN_PATTERN.findall(school_name or "")]
+
+
+def sqlite_match_expression(tokens: list[str]) -> str:
+    """Builds an FTS5 MATCH expression requiring every token as a prefix."""
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def postgres_tsquery(tokens: list[str]) -> str:
+    """Builds a tsquery string requiring every token as a prefix."""
+    return " & ".join(f"{token}:*" for token in tokens)
+
+
+def create_search_index(connection: Connection) -> None:
+    """
+    Creates the text index over ``schools.name`` if it does not exist yet.
+
+    On SQLite this is an external-content FTS5 table kept in sync by triggers. When the
+    table is created it is filled from ``schools``, so rows loaded before the triggers
+    existed are indexed; an existing index is left to its triggers.
+    On Postgres it is a pair of GIN indexes (trigram and ``tsvector``), which Postgres
+    maintains itself. Other dialects are left untouched and fall back to ``ILIKE``.
+    """
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        created = not inspect(connection).has_table(SEARCH_TABLE)
+        for statement in SQLITE_DDL:
+            connection.execute(text(statement))
+        if created:
+            connection.execute(
+                text(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')")
+            )
+    elif dialect == "postgresql":
+        for statement in POSTGRES_DDL:
+            connection.execute(text(statement))
+
+
+def has_search_index(connection: Connection) -> bool:
+    """
+    Returns whether the dialect-specific name index is usable on ``connection``.
+
+    Synchronous; the API calls it through ``AsyncConnection.run_sync``.
+    """
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        return True
+    if dialect != "sqlite":
+        return False
+
+    key = str(connection.engine.url)
+    if key in _indexed_engines:
+        return True
+    if inspect(connection).has_table(SEARCH_TABLE):
+        _indexed_engines.add(key)
+        return True
+    return False
+
+
+def like_escape(term: str) -> str:
+    """Escapes the ``LIKE`` wildcards in ``term`` with backslashes."""
+    return re.sub(r"([\\%_])", r"\\\1", term)
+
+
+def match_school_name(query, school_name: str, dialect: str, indexed: bool):
+    """
+    Restricts ``query`` (a ``Select`` over ``School``) to schools whose name contains
+    every search token as a word prefix, using the ``dialect`` text index.
+
+    Falls back to a case-insensitive substring match when the search string has no
+    word characters or the database has no text index (``indexed`` is false).
+
+    Returns the filtered query and its sort keys, most relevant first and ending in
+    ``School.unitid`` so that the ordering is total and can be used for keyset paging.
+    """
+    tokens = tokenize(school_name)
+    if not tokens or not indexed:
+        pattern = like_escape(school_name.lower())
+        query = query.where(School.name.ilike(f"%{pattern}%", escape="\\"))
+        return query, [School.unitid]
+
+    if dialect == "sqlite":
+        match = literal_column(SEARCH_TABLE).op("MATCH")(
+            sqlite_match_expression(tokens)
+        )
+        query = query.join(schools_fts, schools_fts.c.rowid == School.unitid).where(
+            match
+        )
+        return query, [schools_fts.c.rank, School.unitid]
+
+    document = func.to_tsvector("simple", func.coalesce(School.name, ""))
+    tsquery = func.to_tsquery("simple", postgres_tsquery(tokens))
+    query = query.where(document.op("@@")(tsquery))
+    # Negated so that every sort key is ascending, which keyset paging relies on.
+    return query, [-func.ts_rank(document, tsquery), School.unitid]
@@ -0,0 +1,166 @@
+import math
+from sqlalchemy import Float, Integer, and_, column, inspect, or_, select, table, text
+from sqlalchemy.engine import Connection
+from .models import Location
+
+SPATIAL_TABLE = "location_rtree"
+
+location_rtree = table(
+    SPATIAL_TABLE,
+    column("id", Integer),
+    column("min_lat", Float),
+    column("max_lat", Float),
+    column("min_lon", Float),
+    column("max_lon", Float),
+)
+
+# Each location is a point, stored as a zero-size box keyed on `location.id`.
+SQLITE_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SPATIAL_TABLE} USING rtree(
+        id, min_lat, max_lat, min_lon, max_lon
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SPATIAL_TABLE}_ai AFTER INSERT ON location
+    WHEN new.latitude IS NOT NULL AND new.longitude IS NOT NULL BEGIN
+        INSERT INTO {SPATIAL_TABLE} VALUES (
+            new.id, new.latitude, new.latitude, new.longitude, new.longitude
+        );
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SPATIAL_TABLE}_ad AFTER DELETE ON location BEGIN
+        DELETE FROM {SPATIAL_TABLE} WHERE id = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SPATIAL_TABLE}_au
+    AFTER UPDATE OF latitude, longitude ON location BEGIN
+        DELETE FROM {SPATIAL_TABLE} WHERE id = old.id;
+        INSERT INTO {SPATIAL_TABLE}
+        SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude
+        WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL;
+    END
+    """,
+]
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+# Databases (by url) known to have the R*Tree, so the check is only paid once.
+_indexed_engines = set()
+
+
+def create_spatial_index(connection: Connection) -> None:
+    """
+    Creates the spatial index over ``location`` coordinates if it does not exist yet.
+
+    On SQLite this is an R*Tree kept in sync by triggers. When the table is created it
+    is filled from ``location``, so rows loaded before the triggers existed are
+    indexed; an existing index is left to its triggers. Other dialects rely on the
+    ``(latitude, longitude)`` B-tree index declared on the model.
+    """
+    if connection.dialect.name != "sqlite":
+        return
+    created = not inspect(connection).has_table(SPATIAL_TABLE)
+    for statement in SQLITE_DDL:
+        connection.execute(text(statement))
+    if not created:
+        return
+    connection.execute(
+        text(
+            f"INSERT INTO {SPATIAL_TABLE} SELECT id, latitude, latitude, longitude, "
+            "longitude FROM location WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+        )
+    )
+
+
+def has_spatial_index(connection: Connection) -> bool:
+    """
+    Returns whether the SQLite R*Tree is usable on ``connection``.
+
+    Synchronous; the API calls it through ``AsyncConnection.run_sync``.
+    """
+    if connection.dialect.name != "sqlite":
+        return False
+    key = str(connection.engine.url)
+    if key in _indexed_engines:
+        return True
+    if inspect(connection).has_table(SPATIAL_TABLE):
+        _indexed_engines.add(key)
+        return True
+    return False
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Returns the great-circle distance between two points, in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = (
+        math.sin(dphi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> tuple:
+    """
+    Returns the latitude range and the longitude ranges of a box containing every
+    point within ``radius_km`` of (``lat``, ``lon``).
+
+    The box is split in two where it crosses the antimeridian, and spans every
+    longitude when it reaches a pole.
+    """
+    dlat = radius_km / KM_PER_DEGREE
+    min_lat, max_lat = max(-90.0, lat - dlat), min(90.0, lat + dlat)
+    if min_lat == -90.0 or max_lat == 90.0:
+        return (min_lat, max_lat), [(-180.0, 180.0)]
+
+    # The widest point of the circle, in degrees of longitude.
+    dlon = math.degrees(
+        math.asin(
+            min(
+                1.0, math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(lat))
+            )
+        )
+    )
+    west, east = lon - dlon, lon + dlon
+    if west < -180.0:
+        return (min_lat, max_lat), [(west + 360.0, 180.0), (-180.0, east)]
+    if east > 180.0:
+        return (min_lat, max_lat), [(west, 180.0), (-180.0, east - 360.0)]
+    return (min_lat, max_lat), [(west, east)]
+
+
+def candidates_query(lat: float, lon: float, radius_km: float, indexed: bool):
+    """
+    Selects the school id and coordinates of every location in the bounding box of the
+    search circle, through the R*Tree when ``indexed`` and otherwise through the
+    ``(latitude, longitude)`` index. Callers compute exact distances on the result.
+    """
+    (min_lat, max_lat), lon_ranges = bounding_box(lat, lon, radius_km)
+    columns = (Location.school_unitid, Location.latitude, Location.longitude)
+    if indexed:
+        box = location_rtree.c
+        return (
+            select(*columns)
+            .select_from(location_rtree)
+            .join(Location, Location.id == box.id)
+            # Overlap tests, which stay correct with the R*Tree's rounded bounds.
+            .where(
+                box.max_lat >= min_lat,
+                box.min_lat <= max_lat,
+                or_(
+                    *(
+                        and_(box.max_lon >= west, box.min_lon <= east)
+                        for west, east in lon_ranges
+                    )
+                ),
+            )
+        )
+    return select(*columns).where(
+        Location.latitude.between(min_lat, max_lat),
+        or_(*(Location.longitude.between(west, east) for west, east in lon_ranges)),
+    )
@@ -0,0 +1,113 @@
+import time
+from datetime import datetime, timezone
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.cache.lru import LRUCache
+from .models import ChangeLog, DataVersion
+
+DATA_VERSION_ID = 1
+
+# Last stamp read per engine url, as ((version, loaded_at), monotonic time it was read).
+_versions = {}
+
+# Stamps of databases served from an in-memory snapshot (app.db.memory), keyed on url.
+# Those report the snapshot's stamp, so validators match the data actually served.
+_pinned = {}
+
+# Schools changed between two versions, keyed on (database, older version, newer version).
+_changes = LRUCache(maxsize=256)
+
+
+def bump_data_version(session: Session) -> int:
+    """
+    Marks the dataset as changed. Called by the ETL in the same transaction as its load,
+    so that counts and caches keyed on the version are invalidated once it commits.
+    """
+    stamp = session.get(DataVersion, DATA_VERSION_ID)
+    if stamp is None:
+        stamp = DataVersion(id=DATA_VERSION_ID, version=0)
+        session.add(stamp)
+    stamp.version += 1
+    stamp.loaded_at = datetime.now(timezone.utc).replace(tzinfo=None)
+    return stamp.version
+
+
+async def _has_table(db: AsyncSession, name: str) -> bool:
+    connection = await db.connection()
+    return await connection.run_sync(
+        lambda sync_connection: inspect(sync_connection).has_table(name)
+    )
+
+
+async def data_version_stamp(db: AsyncSession) -> tuple[int, datetime | None]:
+    """
+    Returns the dataset version and the time (UTC) of the load that produced it,
+    re-reading them at most every `data_version_poll_seconds`. Databases loaded before
+    versioning existed report version 0 and no load time.
+    """
+    key = str(db.bind.url)
+    if key in _pinned:
+        return _pinned[key]
+    now = time.monotonic()
+    cached = _versions.get(key)
+    if cached is not None and now - cached[1] < settings.data_version_poll_seconds:
+        return cached[0]
+
+    stamp = (0, None)
+    if await _has_table(db, DataVersion.__tablename__):
+        row = (
+            await db.execute(
+                select(DataVersion.version, DataVersion.loaded_at).where(
+                    DataVersion.id == DATA_VERSION_ID
+                )
+            )
+        ).first()
+        if row is not None:
+            stamp = (row.version, row.loaded_at)
+    _versions[key] = (stamp, now)
+    return stamp
+
+
+def pin_data_version(url: str, stamp: tuple | None) -> None:
+    """Makes the database ``url`` report ``stamp`` without being queried, or undoes it."""
+    if stamp is None:
+        _pinned.pop(url, None)
+    else:
+        _pinned[url] = stamp
+
+
+async def current_data_version(db: AsyncSession) -> int:
+    """Returns the dataset version; see `data_version_stamp`."""
+    return (await data_version_stamp(db))[0]
+
+
+async def changed_since(db: AsyncSession, since: int, version: int) -> frozenset | None:
+    """
+    Returns the ids of the schools the ETL changed after dataset version ``since`` up
+    to ``version``, from the change log it writes with each load.
+
+    Returns None when the log cannot vouch for that range (no log, or no entries for
+    ``version``), in which case callers must treat every school as changed.
+    """
+    key = (str(db.bind.url), since, version)
+    changes = _changes.get(key)
+    if changes is not None:
+        return changes or None
+    if not await _has_table(db, ChangeLog.__tablename__):
+        return None
+
+    rows = (
+        await db.execute(
+            select(ChangeLog.version, ChangeLog.school_unitid).where(
+                ChangeLog.version > since, ChangeLog.version <= version
+            )
+        )
+    ).all()
+    changes = frozenset(unitid for _, unitid in rows)
+    if version not in {logged for logged, _ in rows}:
+        # An empty set marks the range as not covered by the log.
+        changes = frozenset()
+    _changes.set(key, changes)
+    return changes or None
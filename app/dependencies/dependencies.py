@@ -1,15 +1,11 @@
-from app.db.database import SessionLocal
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from app.db.database import AsyncSessionLocal
+from .ratelimit import create_limiter
 
 
-limiter = Limiter(key_func=get_remote_address)
+limiter = create_limiter()
 
 
-def get_db():
+async def get_db():
     """Context manager to ensure database connection is closed after request lifecycle."""
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
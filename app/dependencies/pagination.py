@@ -0,0 +1,215 @@
+import base64
+import binascii
+import json
+from bisect import bisect_right
+from typing import Literal
+from fastapi import HTTPException, Query
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.cache.lru import LRUCache
+from app.config import settings
+from app.db.versioning import current_data_version
+from app.schemas.schemas import Header
+
+CountMode = Literal["exact", "cached", "estimate"]
+
+# Sort keys are integer ids or numeric columns, stored in at most 64 bits.
+MAX_INTEGER = 2**63 - 1
+
+# Totals keyed on (database, dataset version, endpoint, normalized filter). A new
+# dataset version makes older entries unreachable, and the LRU ages them out.
+_count_cache = LRUCache(maxsize=settings.count_cache_size)
+
+
+class Pagination:
+    """Query parameters shared by every paginated endpoint."""
+
+    def __init__(
+        self,
+        skip: int = Query(default=0, ge=0),
+        limit: int = Query(default=100, gt=0, le=1000),
+        cursor: str | None = Query(
+            default=None,
+            description="Opaque cursor taken from `header.next_cursor` of the previous page. Takes precedence over `skip`.",
+        ),
+        include_total: bool = Query(
+            default=True,
+            description="Set to false to skip counting matching records; `header.total` is then null.",
+        ),
+        count_mode: CountMode = Query(
+            default="cached",
+            description="`exact` always counts, `cached` reuses the total computed for the same filter and dataset version, `estimate` avoids counting where possible, returning the query planner's estimate or, where there is none, a lower bound (`total_mode` is then `lower_bound`).",
+        ),
+    ):
+        self.skip = skip
+        self.limit = limit
+        self.cursor = cursor
+        self.include_total = include_total
+        self.count_mode = count_mode
+
+
+def encode_cursor(values) -> str:
+    """Encodes the sort key values of the last row on a page as an opaque token."""
+    payload = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """
+    Decodes a cursor produced by ``encode_cursor``.
+
+    Raises:
+    HTTPException: 400 if the cursor is malformed, holds values other than numbers or
+    was issued for a different ordering.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    for value in values:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise HTTPException(status_code=400, detail="Invalid cursor.")
+        if isinstance(value, int) and abs(value) > MAX_INTEGER:
+            raise HTTPException(status_code=400, detail="Invalid cursor.")
+    return values
+
+
+def explain_statement(query, dialect) -> tuple[str, tuple | dict]:
+    """
+    Compiles ``EXPLAIN (FORMAT JSON)`` for ``query`` and its parameters in the form the
+    ``dialect``'s driver expects: a tuple for positional drivers such as asyncpg, a
+    dict for named ones such as psycopg2.
+    """
+    compiled = query.compile(
+        dialect=dialect, compile_kwargs={"render_postcompile": True}
+    )
+    params = compiled.construct_params()
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+    return f"EXPLAIN (FORMAT JSON) {compiled}", params
+
+
+async def _planner_estimate(db: AsyncSession, query) -> int | None:
+    """Returns the query planner's row estimate, on dialects that expose one cheaply."""
+    if db.bind.dialect.name != "postgresql":
+        return None
+    statement, params = explain_statement(query, db.bind.dialect)
+    connection = await db.connection()
+    result = await connection.exec_driver_sql(statement, params)
+    return int(result.scalar()[0]["Plan"]["Plan Rows"])
+
+
+async def count_total(
+    db: AsyncSession,
+    query,
+    page: Pagination,
+    count_key: tuple,
+    fetched: int,
+    more: bool,
+):
+    """
+    Resolves the total number of rows matching ``query`` according to the page's
+    count options.
+
+    Exact totals are cached under ``count_key`` for the current dataset version, which
+    the ETL bumps on every load. In estimate mode a cached total is still preferred;
+    otherwise the planner's estimate is used or, on dialects without one, a lower bound
+    derived from the page, reported as such.
+
+    Returns:
+    tuple: The total (or None) and the strategy used to produce it.
+    """
+    if not page.include_total:
+        return None, "none"
+
+    cache_key = (str(db.bind.url), await current_data_version(db), *count_key)
+    if page.count_mode != "exact":
+        total = _count_cache.get(cache_key)
+        if total is not None:
+            return total, "cached"
+
+    if page.count_mode == "estimate":
+        total = await _planner_estimate(db, query)
+        if total is not None:
+            return total, "estimate"
+        skipped = page.skip if page.cursor is None else 0
+        return skipped + fetched + (1 if more else 0), "lower_bound"
+
+    total = await db.scalar(
+        select(func.count()).select_from(query.order_by(None).subquery())
+    )
+    _count_cache.set(cache_key, total)
+    return total, "exact"
+
+
+async def paginate(
+    db: AsyncSession, query, page: Pagination, sort_keys: list, count_key: tuple
+):
+    """
+    Fetches one page of ``query`` (a ``Select``) ordered by ``sort_keys``.
+
+    With a cursor the page starts right after the row the cursor was issued for, which
+    the database resolves with an index seek instead of walking and discarding ``skip``
+    rows. ``sort_keys`` must be ascending and unique together (end with a primary key).
+    ``count_key`` identifies the endpoint and filter for the total count cache.
+
+    Returns:
+    tuple: The first column of each row on the page and the response header.
+    """
+    base_query = query
+    query = query.add_columns(*sort_keys).order_by(*sort_keys)
+    if page.cursor is not None:
+        after = decode_cursor(page.cursor, len(sort_keys))
+        query = query.where(tuple_(*sort_keys) > tuple_(*after))
+    else:
+        query = query.offset(page.skip)
+
+    # One extra row tells us whether there is a next page without another query.
+    rows = (await db.execute(query.limit(page.limit + 1))).all()
+    more = len(rows) > page.limit
+    rows = rows[: page.limit]
+    next_cursor = encode_cursor(rows[-1][1:]) if more else None
+
+    total, total_mode = await count_total(
+        db, base_query, page, count_key, len(rows), more
+    )
+    header = Header(
+        total=total,
+        total_mode=total_mode,
+        skip=page.skip,
+        limit=page.limit,
+        next_cursor=next_cursor,
+    )
+    return [row[0] for row in rows], header
+
+
+def paginate_ids(unitids, page: Pagination):
+    """
+    Pages through ``unitids``, an ascending sequence of school ids already in memory
+    (see `app.db.memory`), the way ``paginate`` pages through a query sorted on
+    ``School.unitid``. Totals are always exact, as they cost nothing here.
+
+    Returns:
+    tuple: The ids on the page and the response header.
+    """
+    if page.cursor is not None:
+        after = decode_cursor(page.cursor, 1)[0]
+        if not isinstance(after, int):
+            raise HTTPException(status_code=400, detail="Invalid cursor.")
+        start = bisect_right(unitids, after)
+    else:
+        start = page.skip
+    rows = list(unitids[start : start + page.limit + 1])
+    more = len(rows) > page.limit
+    rows = rows[: page.limit]
+    header = Header(
+        total=len(unitids) if page.include_total else None,
+        total_mode="exact" if page.include_total else "none",
+        skip=page.skip,
+        limit=page.limit,
+        next_cursor=encode_cursor(rows[-1:]) if more else None,
+    )
+    return rows, header
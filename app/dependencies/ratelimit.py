@@ -0,0 +1,226 @@
+import asyncio
+import functools
+import hashlib
+import time
+import uuid
+from limits.storage import MovingWindowSupport, Storage
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+from starlette.requests import Request
+from app.config import settings
+
+API_KEY_HEADER = "X-API-Key"
+DEFAULT_TIER = "default"
+# The limit of the default tier when `settings.rate_limit_tiers` does not name one.
+DEFAULT_LIMIT = "5/minute"
+
+
+class SlidingWindowRedisStorage(Storage, MovingWindowSupport):
+    """
+    Sliding-window rate limit counters shared by every worker through a Redis server,
+    registered with `limits` as ``sliding+redis://``.
+
+    Each hit is a member of a sorted set scored by its timestamp. Expiring old hits,
+    counting the window and adding the new hit only if it fits run server-side in
+    one Lua script, so concurrent requests never see each other's rejected hits and
+    workers can never admit more than the limit between them.
+
+    `client` may be any object with the `redis.Redis` methods used here, which lets
+    tests substitute a local stand-in for a server.
+    """
+
+    STORAGE_SCHEME = ["sliding+redis", "sliding+rediss"]
+
+    # KEYS: the window. ARGV: now, expiry, limit, then one member per hit to add.
+    ACQUIRE_SCRIPT = """
+    local key = KEYS[1]
+    local now = tonumber(ARGV[1])
+    local expiry = tonumber(ARGV[2])
+    local limit = tonumber(ARGV[3])
+    redis.call('ZREMRANGEBYSCORE', key, 0, now - expiry)
+    if redis.call('ZCARD', key) + #ARGV - 3 > limit then
+        return 0
+    end
+    for i = 4, #ARGV do
+        redis.call('ZADD', key, now, ARGV[i])
+    end
+    redis.call('EXPIRE', key, expiry)
+    return 1
+    """
+
+    def __init__(self, uri: str | None = None, client=None, prefix: str = "ratelimit"):
+        super().__init__(uri)
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError(
+                    "The redis rate limit storage requires the `redis` package."
+                ) from e
+            client = redis.Redis.from_url(uri.replace("sliding+", "", 1))
+        self.client = client
+        self.prefix = prefix
+        self._acquire = client.register_script(self.ACQUIRE_SCRIPT)
+
+    @property
+    def base_exceptions(self):
+        return Exception
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    def acquire_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+        now = time.time()
+        members = [f"{now}:{uuid.uuid4().hex}" for _ in range(amount)]
+        return bool(
+            self._acquire(keys=[self._key(key)], args=[now, expiry, limit, *members])
+        )
+
+    def get_moving_window(self, key: str, limit: int, expiry: int) -> tuple[int, int]:
+        key = self._key(key)
+        now = time.time()
+        pipeline = self.client.pipeline(transaction=True)
+        pipeline.zremrangebyscore(key, 0, now - expiry)
+        pipeline.zrange(key, 0, 0, withscores=True)
+        pipeline.zcard(key)
+        _, oldest, count = pipeline.execute()
+        return int(oldest[0][1] if oldest else now), count
+
+    # Fixed-window counters, for completeness of the `limits` storage interface.
+
+    def incr(
+        self, key: str, expiry: int, elastic_expiry: bool = False, amount: int = 1
+    ) -> int:
+        key = self._key(key)
+        value = self.client.incrby(key, amount)
+        if elastic_expiry or value == amount:
+            self.client.expire(key, expiry)
+        return value
+
+    def get(self, key: str) -> int:
+        return int(self.client.get(self._key(key)) or 0)
+
+    def get_expiry(self, key: str) -> int:
+        return int(time.time() + max(self.client.ttl(self._key(key)), 0))
+
+    def check(self) -> bool:
+        try:
+            return bool(self.client.ping())
+        except Exception:
+            return False
+
+    def reset(self) -> int:
+        keys = list(self.client.scan_iter(match=f"{self.prefix}:*"))
+        if keys:
+            self.client.delete(*keys)
+        return len(keys)
+
+    def clear(self, key: str) -> None:
+        self.client.delete(self._key(key))
+
+
+class TieredLimiter(Limiter):
+    """
+    Rate limits each client by sliding window at the limit of its tier.
+
+    Callers presenting a known API key in `X-API-Key` are counted per key at their
+    key's tier; everyone else is counted per address at the "default" tier. Callers
+    whose address or API key is allowlisted skip the limiter before any counter is
+    read: the check is a membership test on a frozenset built at startup, so it
+    takes no lock and makes no round trip to shared storage.
+
+    Routes opt in with ``@limiter.limit(limiter.tier_limit)``. On shared storage the
+    check of a coroutine route runs in a worker thread, so that waiting on the server
+    never blocks the event loop.
+    """
+
+    def __init__(
+        self,
+        tiers: dict[str, str],
+        api_keys: dict[str, str] | None = None,
+        allowlist=(),
+        **kwargs,
+    ):
+        self.tiers = {DEFAULT_TIER: DEFAULT_LIMIT, **tiers}
+        self.api_keys = dict(api_keys or {})
+        self.allowlist = frozenset(allowlist)
+        super().__init__(key_func=self.client_key, strategy="moving-window", **kwargs)
+
+    def client_key(self, request: Request) -> str:
+        """
+        Identifies the caller as ``"<tier>:<identity>"``, where the identity is a digest
+        of the API key (so keys are never written to shared storage) or the address.
+        """
+        api_key = request.headers.get(API_KEY_HEADER)
+        tier = self.api_keys.get(api_key) if api_key else None
+        if tier is None:
+            return f"{DEFAULT_TIER}:{get_remote_address(request)}"
+        digest = hashlib.sha256(api_key.encode()).hexdigest()[:16]
+        return f"{tier}:{digest}"
+
+    def tier_limit(self, key: str) -> str:
+        """Returns the limit string of the tier encoded in a `client_key`."""
+        tier = key.split(":", 1)[0]
+        return self.tiers.get(tier, self.tiers[DEFAULT_TIER])
+
+    def is_allowlisted(self, request: Request) -> bool:
+        if not self.allowlist:
+            return False
+        return (
+            get_remote_address(request) in self.allowlist
+            or request.headers.get(API_KEY_HEADER) in self.allowlist
+        )
+
+    def limit(self, *args, **kwargs):
+        decorate = super().limit(*args, **kwargs)
+
+        def decorator(func):
+            wrapped = decorate(func)
+            if not asyncio.iscoroutinefunction(func):
+                return wrapped
+
+            @functools.wraps(wrapped)
+            async def check_off_loop(*args, **kwargs):
+                request = kwargs.get("request")
+                if (
+                    self.enabled
+                    and self._auto_check
+                    and isinstance(self._storage, SlidingWindowRedisStorage)
+                    and isinstance(request, Request)
+                    and not getattr(request.state, "_rate_limiting_complete", False)
+                ):
+                    await asyncio.to_thread(
+                        self._check_request_limit, request, func, False
+                    )
+                    # Tells the slowapi wrapper the check is done.
+                    request.state._rate_limiting_complete = True
+                return await wrapped(*args, **kwargs)
+
+            return check_off_loop
+
+        return decorator
+
+    def _check_request_limit(self, request, endpoint_func, in_middleware=True):
+        if self.is_allowlisted(request):
+            request.state.view_rate_limit = None
+            return
+        super()._check_request_limit(request, endpoint_func, in_middleware)
+
+
+def create_limiter() -> TieredLimiter:
+    """Builds the API's limiter on the storage selected by `settings.rate_limit_storage`."""
+    if settings.rate_limit_storage == "redis":
+        storage = {
+            "storage_uri": f"sliding+{settings.rate_limit_redis_url}",
+            "storage_options": {"prefix": f"{settings.cache_key_prefix}:ratelimit"},
+        }
+    else:
+        storage = {"storage_uri": "memory://"}
+    return TieredLimiter(
+        tiers=settings.rate_limit_tiers,
+        api_keys=settings.api_keys,
+        allowlist=settings.rate_limit_allowlist,
+        **storage,
+    )
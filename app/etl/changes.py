@@ -0,0 +1,89 @@
+import hashlib
+import json
+from sqlalchemy import insert, select
+from app.db.models import ChangeLog, ContentHash
+from .loader import LoadStats, UpsertLoader
+
+
+def content_hash(content) -> str:
+    """Hashes JSON-serializable ``content`` independently of dictionary key order."""
+    payload = json.dumps(content, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ChangeTracker:
+    """
+    Passes on to ``load`` only the rows whose content changed since the last load.
+
+    Each row is hashed and compared with the hash stored for its school under
+    ``scope``, a name for the set of tables loaded together, so a batch of unchanged
+    schools costs one query on a narrow table and no writes. The hashes of loaded rows
+    are stored in the same transaction as the rows themselves, and the schools that
+    changed are remembered for `write_change_log`.
+
+    Use an instance as the ``load`` stage of `run_pipeline`. ``key`` names the column
+    holding the school id; ``unitid_of`` can be given instead for other row shapes.
+    """
+
+    def __init__(
+        self, session, scope: str, load, key: str = "school_unitid", unitid_of=None
+    ):
+        self.session = session
+        self.scope = scope
+        self.load = load
+        self.unitid_of = unitid_of or (lambda row: row[key])
+        self.hashes = UpsertLoader(session, ContentHash)
+        self.stats = LoadStats()
+        self.changes = {}
+
+    def __call__(self, batch: list) -> None:
+        hashes = {}
+        for row in batch:
+            hashes[self.unitid_of(row)] = (row, content_hash(row))
+        stored = dict(
+            self.session.execute(
+                select(ContentHash.school_unitid, ContentHash.hash).where(
+                    ContentHash.scope == self.scope,
+                    ContentHash.school_unitid.in_(list(hashes)),
+                )
+            ).all()
+        )
+
+        changed = {}
+        for unitid, (row, digest) in hashes.items():
+            if stored.get(unitid) == digest:
+                self.stats.unchanged += 1
+                continue
+            changed[unitid] = (row, digest)
+            if unitid in stored:
+                self.stats.updated += 1
+                self.changes[unitid] = "updated"
+            else:
+                self.stats.inserted += 1
+                self.changes[unitid] = "inserted"
+        if not changed:
+            return
+
+        self.load([row for row, _ in changed.values()])
+        self.hashes(
+            [
+                {"school_unitid": unitid, "scope": self.scope, "hash": digest}
+                for unitid, (_, digest) in changed.items()
+            ]
+        )
+
+    def write_change_log(self, version: int) -> None:
+        """Records the schools this load changed under the dataset ``version``."""
+        if self.changes:
+            self.session.execute(
+                insert(ChangeLog),
+                [
+                    {
+                        "version": version,
+                        "school_unitid": unitid,
+                        "scope": self.scope,
+                        "change": change,
+                    }
+                    for unitid, change in self.changes.items()
+                ],
+            )
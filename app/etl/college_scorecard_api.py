@@ -1,7 +1,12 @@
 import requests
 import time
-import random
+import json
+import math
 import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 import os
 
@@ -13,55 +18,279 @@ load_dotenv()
 
 API_KEY = os.getenv("API_KEY")
 
+BASE_URL = "https://api.data.gov/ed/collegescorecard/v1/schools.json"
+PER_PAGE = 100
 
-def get_college_data(api_key, fields, page_limit=None):
+# api.data.gov allows 1,000 requests per hour per key by default.
+DEFAULT_REQUESTS_PER_SECOND = 1000 / 3600
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class FetchError(Exception):
+    """Raised when pages could not be fetched after retrying."""
+
+    def __init__(self, failed_pages):
+        self.failed_pages = sorted(failed_pages)
+        super().__init__(f"Failed to fetch pages {self.failed_pages}")
+
+
+class RateLimiter:
+    """Spaces out calls to `wait` so that at most `rate` happen per second, across threads."""
+
+    def __init__(self, rate: float | None):
+        self.interval = 1 / rate if rate else 0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        time.sleep(start - now)
+
+
+class Checkpoint:
+    """
+    Stores each fetched page as a JSON file so an interrupted run can resume.
+
+    Pages are only reused by a run requesting the same fields; a checkpoint for a
+    different field list is discarded, and a run that fetches every page clears it so
+    the next run downloads fresh data.
+    """
+
+    def __init__(self, directory, fields):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        manifest = self.directory / "manifest.json"
+        expected = {"fields": list(fields), "per_page": PER_PAGE}
+        if manifest.exists() and json.loads(manifest.read_text()) != expected:
+            logging.info("Checkpoint is for different fields; starting over.")
+            self.clear()
+        manifest.write_text(json.dumps(expected))
+
+    def _path(self, page_num: int) -> Path:
+        return self.directory / f"page_{page_num:05d}.json"
+
+    def load(self, page_num: int):
+        path = self._path(page_num)
+        if path.exists():
+            return json.loads(path.read_text())
+        return None
+
+    def save(self, page_num: int, data) -> None:
+        # Write then rename so a crash never leaves a truncated page behind.
+        tmp = self._path(page_num).with_suffix(".tmp")
+        tmp.write_text(json.dumps(data))
+        tmp.replace(self._path(page_num))
+
+    def clear(self) -> None:
+        for path in self.directory.glob("*.json"):
+            path.unlink()
+
+
+def create_session(pool_size: int) -> requests.Session:
+    """Creates an HTTP session that keeps up to `pool_size` connections alive."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def fetch_page(
+    session,
+    base_url,
+    api_key,
+    fields,
+    page_num,
+    rate_limiter,
+    retries=5,
+    backoff=1.0,
+):
+    """
+    Fetches one page of results, retrying on connection errors, rate limiting and
+    server errors with exponential backoff (or the server's `Retry-After`).
+
+    Returns:
+        dict: The decoded JSON response.
+    """
+    params = {
+        "fields": ",".join(fields),
+        "api_key": api_key,
+        "page": page_num,
+        "per_page": PER_PAGE,
+    }
+    for attempt in range(retries + 1):
+        rate_limiter.wait()
+        delay = backoff * 2**attempt
+        try:
+            response = session.get(base_url, params=params, timeout=30)
+            if response.status_code not in RETRY_STATUSES:
+                response.raise_for_status()
+                return response.json()
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                delay = max(delay, int(retry_after))
+            error = f"HTTP {response.status_code}"
+        except requests.exceptions.HTTPError:
+            raise
+        except (requests.exceptions.RequestException, ValueError) as err:
+            error = err
+        if attempt < retries:
+            logging.warning(
+                f"Page {page_num} failed ({error}); retrying in {delay:.1f}s."
+            )
+            time.sleep(delay)
+    raise FetchError([page_num])
+
+
+def iter_college_pages(
+    api_key,
+    fields,
+    page_limit=None,
+    concurrency=4,
+    requests_per_second=DEFAULT_REQUESTS_PER_SECOND,
+    checkpoint_dir=None,
+    base_url=BASE_URL,
+    retries=5,
+    backoff=1.0,
+):
+    """
+    Fetches pages from the College Scorecard API and yields them as they arrive.
+
+    The first page tells it how many pages there are; the rest are fetched concurrently
+    over a pooled HTTP session, rate limited, and retried with backoff when they fail.
+    At most ``2 * concurrency`` pages are requested ahead of the consumer, so memory use
+    does not grow with the size of the dataset. Pages are yielded in completion order.
+
+    Parameters are the same as for `get_college_data`.
+
+    Yields:
+        tuple: The page number and that page's list of school records.
+
+    Raises:
+        FetchError: Once every other page has been yielded, if some pages still failed
+            after retrying.
+    """
+
+    logging.info("Starting to fetch data from College Scorecard API.")
+    checkpoint = Checkpoint(checkpoint_dir, fields) if checkpoint_dir else None
+    rate_limiter = RateLimiter(requests_per_second)
+    session = create_session(concurrency)
+
+    def load(page_num):
+        data = checkpoint.load(page_num) if checkpoint else None
+        if data is None:
+            data = fetch_page(
+                session,
+                base_url,
+                api_key,
+                fields,
+                page_num,
+                rate_limiter,
+                retries=retries,
+                backoff=backoff,
+            )
+            if checkpoint:
+                checkpoint.save(page_num, data)
+        logging.info(f"Fetched page {page_num} successfully.")
+        return data
+
+    with session:
+        first = load(0)
+        metadata = first.get("metadata", {})
+        total_pages = math.ceil(
+            metadata.get("total", 0) / metadata.get("per_page", PER_PAGE)
+        )
+        if page_limit:
+            total_pages = min(total_pages, page_limit)
+        yield 0, first["results"]
+        del first
+
+        failed = []
+        next_page = 1
+        pending = {}
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            while next_page < total_pages or pending:
+                while next_page < total_pages and len(pending) < 2 * concurrency:
+                    pending[executor.submit(load, next_page)] = next_page
+                    next_page += 1
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    page_num = pending.pop(future)
+                    try:
+                        data = future.result()
+                    except (FetchError, requests.exceptions.RequestException) as err:
+                        logging.error(f"Giving up on page {page_num}: {err}")
+                        failed.append(page_num)
+                        continue
+                    yield page_num, data["results"]
+
+    if failed:
+        raise FetchError(failed)
+    if checkpoint:
+        checkpoint.clear()
+    logging.info("Data fetching process completed.")
+
+
+def get_college_data(
+    api_key,
+    fields,
+    page_limit=None,
+    concurrency=4,
+    requests_per_second=DEFAULT_REQUESTS_PER_SECOND,
+    checkpoint_dir=None,
+    base_url=BASE_URL,
+    retries=5,
+    backoff=1.0,
+):
     """
     Retrieves data from the College Scorecard API.
 
-    This function fetches data for a set of specified fields from the College Scorecard API.
-    It paginates through results and collects data up to a specified page limit.
+    This function fetches data for a set of specified fields from the College Scorecard API
+    and holds all of it in memory; see `iter_college_pages` for a streaming alternative.
 
     Parameters:
         api_key (str): The API key for accessing the College Scorecard API.
         fields (list): A list of strings representing the fields to be retrieved.
         page_limit (int, optional): The maximum number of pages to fetch. If None, fetches all available data.
+        concurrency (int): The number of pages fetched at the same time.
+        requests_per_second (float, optional): The request rate limit across all threads. None disables it.
+        checkpoint_dir (str, optional): A directory to store fetched pages in. A run that fails
+            can be re-run with the same directory and will only fetch the pages it is missing;
+            it is emptied once every page has been fetched.
+        base_url (str): The API endpoint, overridable for testing against a local server.
+        retries (int): The number of retries per page before giving up.
+        backoff (float): The delay before the first retry, in seconds, doubled on each retry.
 
     Returns:
         dict: A dictionary where each key is a field, and the value is a list of data for that field.
+
+    Raises:
+        FetchError: If some pages still failed after retrying. Pages that succeeded are kept
+            in the checkpoint, if any.
     """
+    pages = dict(
+        iter_college_pages(
+            api_key,
+            fields,
+            page_limit=page_limit,
+            concurrency=concurrency,
+            requests_per_second=requests_per_second,
+            checkpoint_dir=checkpoint_dir,
+            base_url=base_url,
+            retries=retries,
+            backoff=backoff,
+        )
+    )
 
-    logging.info("Starting to fetch data from College Scorecard API.")
-    base_url = "https://api.data.gov/ed/collegescorecard/v1/schools.json"
     data_dictionary = {field: [] for field in fields}
-    page_num = 0
-
-    while True:
-        api_request = f"{base_url}?fields={','.join(fields)}&api_key={api_key}&page={page_num}&per_page=100"
-        try:
-            response = requests.get(api_request)
-            response.raise_for_status()
-            data = response.json()
-
-            if not data["results"] or (page_limit and page_num >= page_limit):
-                logging.info("No more results found or page limit reached.")
-                break
-
-            for school in data["results"]:
-                for field in fields:
-                    data_dictionary[field].append(school.get(field, None))
-
-            logging.info(f"Fetched page {page_num} successfully.")
-            page_num += 1
-            time.sleep(random.randint(0, 3))
-        except requests.exceptions.HTTPError as err:
-            logging.error(f"HTTP Error occurred: {err}")
-            break
-        except requests.exceptions.RequestException as err:
-            logging.error(f"Request failed: {err}")
-            break
-        except ValueError as err:
-            logging.error(f"Error parsing JSON response: {err}")
-            break
-
-    logging.info("Data fetching process completed.")
+    for page_num in sorted(pages):
+        for school in pages[page_num]:
+            for field in fields:
+                data_dictionary[field].append(school.get(field, None))
     return data_dictionary
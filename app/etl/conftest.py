@@ -0,0 +1,14 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from app.db.models import Base
+
+
+@pytest.fixture
+def session():
+    """A session on an empty in-memory database with every table created."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
@@ -0,0 +1,164 @@
+import logging
+from sqlalchemy import bindparam, insert, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from app.db.models import (
+    Admission,
+    ContentHash,
+    Control,
+    Finance,
+    Location,
+    School,
+)
+
+# The natural key each table is upserted on, backed by a unique index.
+UPSERT_KEYS = {
+    School: ("unitid",),
+    Location: ("school_unitid",),
+    Control: ("school_unitid",),
+    Finance: ("school_unitid", "year"),
+    Admission: ("school_unitid", "year"),
+    ContentHash: ("school_unitid", "scope"),
+}
+
+# Dialects with an `INSERT ... ON CONFLICT DO UPDATE` construct.
+_UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+class LoadStats:
+    """Counts the rows an `UpsertLoader` inserted, updated and left unchanged."""
+
+    def __init__(self):
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.inserted or self.updated)
+
+    def __str__(self):
+        return (
+            f"{self.inserted} inserted, {self.updated} updated, "
+            f"{self.unchanged} unchanged"
+        )
+
+
+class UpsertLoader:
+    """
+    Loads batches of row dictionaries into ``model``'s table, keyed on its natural key.
+
+    Each batch costs one query to read the stored versions of its rows and, if anything
+    changed, one batched ``INSERT ... ON CONFLICT DO UPDATE`` for the new and changed
+    rows only. Rows identical to what is stored are not written, so re-running a load
+    over unchanged data only reads. Dialects without an upsert construct get a plain
+    insert for new rows and an update for changed ones.
+
+    Use an instance as the ``load`` stage of `run_pipeline`.
+    """
+
+    def __init__(self, session, model):
+        self.session = session
+        self.model = model
+        self.table = model.__table__
+        self.key = UPSERT_KEYS[model]
+        self.stats = LoadStats()
+
+    def _key(self, row: dict) -> tuple:
+        return tuple(row[column] for column in self.key)
+
+    def _stored(self, keys: list[tuple], columns: list[str]) -> dict:
+        key_columns = [self.table.c[column] for column in self.key]
+        condition = (
+            key_columns[0].in_([key[0] for key in keys])
+            if len(key_columns) == 1
+            else tuple_(*key_columns).in_(keys)
+        )
+        rows = self.session.execute(
+            select(*key_columns, *(self.table.c[column] for column in columns)).where(
+                condition
+            )
+        )
+        size = len(key_columns)
+        return {tuple(row[:size]): tuple(row[size:]) for row in rows}
+
+    def _write(self, new: list[dict], changed: list[dict], columns: list[str]) -> None:
+        make_insert = _UPSERT_INSERTS.get(self.session.bind.dialect.name)
+        if make_insert is not None:
+            statement = make_insert(self.table)
+            if columns:
+                statement = statement.on_conflict_do_update(
+                    index_elements=list(self.key),
+                    set_={column: statement.excluded[column] for column in columns},
+                )
+            self.session.execute(statement, new + changed)
+            return
+
+        if new:
+            self.session.execute(insert(self.table), new)
+        if changed:
+            condition = [
+                self.table.c[column] == bindparam(f"key_{column}")
+                for column in self.key
+            ]
+            # Key columns are bound under another name, so that they are not also SET.
+            self.session.execute(
+                update(self.table).where(*condition),
+                [
+                    {
+                        **{f"key_{column}": row[column] for column in self.key},
+                        **{column: row[column] for column in columns},
+                    }
+                    for row in changed
+                ],
+            )
+
+    def __call__(self, batch: list[dict]) -> None:
+        # Later rows win over earlier ones with the same key, as a sequence of
+        # upserts would; ON CONFLICT cannot touch one row twice in a statement.
+        rows = {}
+        for row in batch:
+            if any(row.get(column) is None for column in self.key):
+                logging.warning(f"Skipping {self.table.name} row without a key: {row}")
+                continue
+            rows[self._key(row)] = row
+        if not rows:
+            return
+
+        columns = [
+            column for column in next(iter(rows.values())) if column not in self.key
+        ]
+        stored = self._stored(list(rows), columns)
+        new, changed = [], []
+        for key, row in rows.items():
+            if key not in stored:
+                new.append(row)
+            elif stored[key] != tuple(row[column] for column in columns):
+                changed.append(row)
+        self.stats.inserted += len(new)
+        self.stats.updated += len(changed)
+        self.stats.unchanged += len(rows) - len(new) - len(changed)
+        if new or changed:
+            self._write(new, changed, columns)
+
+
+class FanOutLoader:
+    """
+    Loads batches of per-school row sets, as produced by `transform_record`, into
+    each of ``models``' tables with one `UpsertLoader` per table.
+
+    Tables are loaded in the order of ``models``, so parents must come first.
+    """
+
+    def __init__(self, session, models):
+        self.loaders = {
+            model.__tablename__: UpsertLoader(session, model) for model in models
+        }
+
+    def __call__(self, batch: list[dict]) -> None:
+        for table, loader in self.loaders.items():
+            rows = [row for row_sets in batch for row in row_sets.get(table, ())]
+            if rows:
+                loader(rows)
+
+    def stats(self) -> dict[str, LoadStats]:
+        return {table: loader.stats for table, loader in self.loaders.items()}
@@ -0,0 +1,74 @@
+import logging
+import time
+
+DEFAULT_BATCH_SIZE = 500
+
+
+class StageStats:
+    """Counts the rows a pipeline stage handled and the time it spent on them."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.rows = 0
+        self.seconds = 0.0
+
+    def add(self, rows: int, seconds: float) -> None:
+        self.rows += rows
+        self.seconds += seconds
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.name}: {self.rows} rows in {self.seconds:.2f}s "
+            f"({self.rows_per_second:.0f} rows/s)"
+        )
+
+
+def run_pipeline(pages, transform, load, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Streams records through fetch → transform → load.
+
+    ``pages`` yields ``(page_num, records)`` pairs, as `iter_college_pages` does.
+    ``transform`` maps one record to a row dictionary, or None to skip it, and ``load``
+    receives the rows in batches of ``batch_size``. Only the current page and one
+    batch are held in memory at a time.
+
+    Returns:
+        dict: The `StageStats` of each stage, keyed on "fetch", "transform" and "load".
+    """
+    stats = {name: StageStats(name) for name in ("fetch", "transform", "load")}
+    batch = []
+
+    def flush(rows):
+        start = time.perf_counter()
+        load(rows)
+        stats["load"].add(len(rows), time.perf_counter() - start)
+
+    pages = iter(pages)
+    while True:
+        # Time spent waiting on the fetcher is the fetch stage's share of the run.
+        start = time.perf_counter()
+        page = next(pages, None)
+        if page is None:
+            break
+        page_num, records = page
+        stats["fetch"].add(len(records), time.perf_counter() - start)
+
+        start = time.perf_counter()
+        rows = [row for row in map(transform, records) if row is not None]
+        stats["transform"].add(len(records), time.perf_counter() - start)
+
+        batch.extend(rows)
+        while len(batch) >= batch_size:
+            flush(batch[:batch_size])
+            batch = batch[batch_size:]
+        logging.debug(f"Page {page_num} done; {stats['load']}")
+
+    if batch:
+        flush(batch)
+    for stage in stats.values():
+        logging.info(str(stage))
+    return stats
@@ -0,0 +1,153 @@
+"""
+Loads every table from the College Scorecard API in a single pass over its pages.
+
+Usage::
+
+    python -m app.etl --page-limit 3
+"""
+
+import argparse
+import logging
+import os
+import sys
+from functools import partial
+from dotenv import load_dotenv
+from sqlalchemy.exc import SQLAlchemyError
+from app.db.database import SessionLocal, engine
+from app.db.models import Admission, Base, Control, Finance, Location, School
+from app.db.search import create_search_index
+from app.db.spatial import create_spatial_index
+from app.db.versioning import bump_data_version
+from .changes import ChangeTracker
+from .college_scorecard_api import (
+    DEFAULT_REQUESTS_PER_SECOND,
+    FetchError,
+    iter_college_pages,
+)
+from .loader import FanOutLoader
+from .pipeline import DEFAULT_BATCH_SIZE, run_pipeline
+from .summaries import SummaryRefresher
+from .transforms import DEFAULT_YEARS, all_fields, transform_record
+
+# Parents before children, for the foreign keys.
+MODELS = [School, Location, Control, Finance, Admission]
+
+# Content hashes cover every table, so a school is re-loaded if any of its rows changed.
+SCOPE = "all"
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.etl", description=__doc__.strip().splitlines()[0]
+    )
+    parser.add_argument(
+        "--page-limit",
+        type=int,
+        default=None,
+        help="Stop after this many pages (default: all).",
+    )
+    parser.add_argument(
+        "--years",
+        type=int,
+        nargs="+",
+        default=DEFAULT_YEARS,
+        help="Years to load finance and admission data for.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=int(os.getenv("ETL_BATCH_SIZE", DEFAULT_BATCH_SIZE)),
+    )
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--requests-per-second", type=float, default=DEFAULT_REQUESTS_PER_SECOND
+    )
+    parser.add_argument(
+        "--checkpoint-dir",
+        default=None,
+        help="Keep fetched pages here so a failed run can resume.",
+    )
+    return parser.parse_args(argv)
+
+
+def school_unitid(row_sets: dict) -> int:
+    return row_sets["schools"][0]["unitid"]
+
+
+def run(session, pages, years, batch_size=DEFAULT_BATCH_SIZE) -> bool:
+    """
+    Loads ``pages`` into every table in ``session``'s transaction, and refreshes the
+    statistics of the groups the changed schools are in.
+
+    Returns:
+        bool: Whether anything changed, in which case the dataset version was bumped
+        and the changed schools logged under it. Statistics built for the first time
+        over unchanged schools also bump the version, with nothing logged.
+    """
+    loader = FanOutLoader(session, MODELS)
+    summaries = SummaryRefresher(session)
+
+    def load(batch):
+        summaries.note(school_unitid(row_sets) for row_sets in batch)
+        loader(batch)
+
+    tracker = ChangeTracker(session, SCOPE, load, unitid_of=school_unitid)
+    run_pipeline(
+        pages, partial(transform_record, years=years), tracker, batch_size=batch_size
+    )
+    logging.info(f"Schools: {tracker.stats}")
+    for table, stats in loader.stats().items():
+        logging.info(f"{table}: {stats}")
+    refreshed = summaries.refresh()
+    # Unchanged data keeps the dataset version, and with it every cached response.
+    if tracker.stats.changed:
+        tracker.write_change_log(bump_data_version(session))
+    elif refreshed:
+        bump_data_version(session)
+    return bool(tracker.stats.changed) or refreshed
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    load_dotenv()
+    api_key = os.getenv("API_KEY")
+    if not api_key:
+        logging.error("Missing API key. Check your .env file.")
+        return 1
+
+    Base.metadata.create_all(engine)
+    pages = iter_college_pages(
+        api_key=api_key,
+        fields=all_fields(args.years),
+        page_limit=args.page_limit,
+        concurrency=args.concurrency,
+        requests_per_second=args.requests_per_second,
+        checkpoint_dir=args.checkpoint_dir,
+    )
+    with SessionLocal() as session:
+        try:
+            run(session, pages, args.years, batch_size=args.batch_size)
+            session.commit()
+        except FetchError as e:
+            session.rollback()
+            logging.error("Error fetching data from API: %s", e)
+            return 1
+        except SQLAlchemyError as e:
+            session.rollback()
+            logging.error("Error loading data into the database: %s", e)
+            return 1
+
+    # Builds the name and spatial indexes on first load; afterwards they already exist
+    # and their triggers keep them current, so later runs leave them as they are.
+    with engine.begin() as connection:
+        create_search_index(connection)
+        create_spatial_index(connection)
+    logging.info("Data successfully loaded.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
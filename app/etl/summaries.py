@@ -0,0 +1,156 @@
+import logging
+from collections import defaultdict
+from sqlalchemy import delete, exists, insert, select
+from app.db.models import Admission, Control, Finance, Location, SchoolStat
+
+# The columns schools are grouped by, keyed on the dimension name used in the API.
+DIMENSIONS = {
+    "state": Location.state,
+    "region": Location.region,
+    "locale": Location.locale,
+    "control": Control.control,
+}
+
+# The per-year columns summarized for every group.
+METRICS = {
+    "avg_net_price": Finance.avg_net_price,
+    "cost_attendance": Finance.cost_attendance,
+    "in_state_tuition": Finance.in_state_tuition,
+    "out_state_tuition": Finance.out_state_tuition,
+    "admission_rate": Admission.admission_rate,
+    "avg_sat_score_admitted": Admission.avg_sat_score_admitted,
+}
+
+PERCENTILES = {"p10": 0.1, "p25": 0.25, "median": 0.5, "p75": 0.75, "p90": 0.9}
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Linearly interpolated percentile of sorted ``values``."""
+    position = (len(values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def summarize(values: list[float]) -> dict:
+    """Returns the count, mean, extremes and percentiles of ``values``."""
+    values = sorted(values)
+    summary = {
+        "count": len(values),
+        "mean": sum(values) / len(values),
+        "min": values[0],
+        "max": values[-1],
+    }
+    for column, fraction in PERCENTILES.items():
+        summary[column] = percentile(values, fraction)
+    return summary
+
+
+def compute_stats(session, dimension: str, groups=None) -> list[dict]:
+    """
+    Computes the `SchoolStat` rows of ``dimension`` for every metric and year, for the
+    given ``groups`` (values of the dimension) or for all of them.
+    """
+    group = DIMENSIONS[dimension]
+    collected = defaultdict(list)
+    for table in (Finance, Admission):
+        metrics = {
+            name: column for name, column in METRICS.items() if column.class_ is table
+        }
+        query = (
+            select(group, table.year, *metrics.values())
+            .join(group.class_, group.class_.school_unitid == table.school_unitid)
+            .where(group.is_not(None), table.year.is_not(None))
+        )
+        if groups is not None:
+            query = query.where(group.in_(groups))
+        for value, year, *numbers in session.execute(query):
+            for metric, number in zip(metrics, numbers):
+                if number is not None:
+                    collected[(value, year, metric)].append(number)
+
+    return [
+        {
+            "dimension": dimension,
+            "metric": metric,
+            "year": year,
+            "value": value,
+            **summarize(values),
+        }
+        for (value, year, metric), values in collected.items()
+    ]
+
+
+class SummaryRefresher:
+    """
+    Keeps ``school_stats`` up to date with an ETL load, recomputing only the groups
+    that contain a changed school.
+
+    Call `note` with the ids of changed schools before loading them, so that the groups
+    they are leaving are known, and `refresh` once the load is done.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.unitids = set()
+        self.groups = defaultdict(set)
+
+    def _note_groups(self, unitids) -> None:
+        for dimension, group in DIMENSIONS.items():
+            self.groups[dimension].update(
+                self.session.scalars(
+                    select(group)
+                    .where(group.class_.school_unitid.in_(unitids), group.is_not(None))
+                    .distinct()
+                )
+            )
+
+    def note(self, unitids) -> None:
+        """Records the groups ``unitids`` belong to before they are reloaded."""
+        unitids = list(unitids)
+        self.unitids.update(unitids)
+        self._note_groups(unitids)
+
+    def rebuild(self) -> bool:
+        """Recomputes every group; returns whether any statistics were written."""
+        self.session.execute(delete(SchoolStat))
+        written = False
+        for dimension in DIMENSIONS:
+            rows = compute_stats(self.session, dimension)
+            if rows:
+                self.session.execute(insert(SchoolStat), rows)
+                written = True
+        logging.info("Rebuilt school statistics.")
+        return written
+
+    def refresh(self) -> bool:
+        """
+        Recomputes the groups noted changed schools belonged to before and after, or
+        every group if there are no statistics yet.
+
+        Returns:
+            bool: Whether the statistics were written, in which case responses built
+            from them must not be served from caches keyed on the old dataset version.
+        """
+        if not self.session.scalar(select(exists().select_from(SchoolStat))):
+            return self.rebuild()
+        if not self.unitids:
+            return False
+
+        self._note_groups(list(self.unitids))
+        for dimension, groups in self.groups.items():
+            if not groups:
+                continue
+            self.session.execute(
+                delete(SchoolStat).where(
+                    SchoolStat.dimension == dimension, SchoolStat.value.in_(groups)
+                )
+            )
+            rows = compute_stats(self.session, dimension, groups)
+            if rows:
+                self.session.execute(insert(SchoolStat), rows)
+        logging.info(
+            "Refreshed school statistics for "
+            + ", ".join(f"{len(groups)} {name}" for name, groups in self.groups.items())
+        )
+        return True
@@ -0,0 +1,58 @@
+from sqlalchemy import select
+from app.db.models import ChangeLog, School
+from .changes import ChangeTracker, content_hash
+from .loader import UpsertLoader
+from .pipeline import run_pipeline
+from .test_pipeline import pages
+from .transforms import transform_school
+
+
+def load(session, transform=transform_school, version=1):
+    loaded = []
+
+    def loader(batch):
+        loaded.extend(row["unitid"] for row in batch)
+        UpsertLoader(session, School)(batch)
+
+    tracker = ChangeTracker(session, "schools", loader, key="unitid")
+    run_pipeline(pages(3), transform, tracker, batch_size=7)
+    tracker.write_change_log(version)
+    session.commit()
+    return tracker, loaded
+
+
+def test_content_hash_ignores_key_order():
+    assert content_hash({"a": 1, "b": 2}) == content_hash({"b": 2, "a": 1})
+    assert content_hash({"a": 1}) != content_hash({"a": 2})
+
+
+def test_only_changed_schools_are_loaded(session):
+    tracker, loaded = load(session)
+    assert len(loaded) == 30 and tracker.stats.inserted == 30
+
+    def renamed(record):
+        row = transform_school(record)
+        if row["unitid"] in (4, 17):
+            row["name"] = "Renamed"
+        return row
+
+    tracker, loaded = load(session, renamed, version=2)
+    assert loaded == [4, 17]
+    assert (tracker.stats.updated, tracker.stats.unchanged) == (2, 28)
+    assert session.get(School, 17).name == "Renamed"
+
+    tracker, loaded = load(session, renamed, version=3)
+    assert loaded == [] and not tracker.stats.changed
+
+
+def test_change_log_lists_changed_schools(session):
+    load(session)
+    load(session, lambda record: {**transform_school(record), "url": None}, 2)
+    logged = session.execute(
+        select(ChangeLog.version, ChangeLog.change, ChangeLog.school_unitid)
+    ).all()
+    assert {(version, change) for version, change, _ in logged} == {
+        (1, "inserted"),
+        (2, "updated"),
+    }
+    assert len(logged) == 60
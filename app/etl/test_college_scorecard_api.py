@@ -0,0 +1,120 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pytest
+from .college_scorecard_api import FetchError, get_college_data, iter_college_pages
+
+TOTAL = 250
+
+
+class MockScorecard(BaseHTTPRequestHandler):
+    """
+    Serves TOTAL fake schools named `server.prefix`, 100 per page, failing pages listed
+    in `server.failures`.
+    """
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        page = int(query["page"][0])
+        self.server.requests.append(page)
+        if self.server.failures.get(page, 0) > 0:
+            self.server.failures[page] -= 1
+            self.send_response(503)
+            self.end_headers()
+            return
+        ids = range(page * 100, min(TOTAL, (page + 1) * 100))
+        body = json.dumps(
+            {
+                "metadata": {"page": page, "total": TOTAL, "per_page": 100},
+                "results": [
+                    {"id": i, "school.name": f"{self.server.prefix} {i}"} for i in ids
+                ],
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def scorecard():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockScorecard)
+    server.requests = []
+    server.failures = {}
+    server.prefix = "School"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def fetch(server, **kwargs):
+    return get_college_data(
+        "key",
+        ["id", "school.name"],
+        base_url=f"http://127.0.0.1:{server.server_port}/schools.json",
+        requests_per_second=None,
+        backoff=0,
+        **kwargs,
+    )
+
+
+def test_fetches_all_pages_in_order(scorecard):
+    data = fetch(scorecard, concurrency=3)
+    assert data["id"] == list(range(TOTAL))
+    assert data["school.name"][-1] == f"School {TOTAL - 1}"
+
+
+def test_retries_failed_pages(scorecard):
+    scorecard.failures = {1: 2}
+    data = fetch(scorecard, retries=2)
+    assert data["id"] == list(range(TOTAL))
+    assert scorecard.requests.count(1) == 3
+
+
+def test_resumes_from_checkpoint(scorecard, tmp_path):
+    scorecard.failures = {2: 10}
+    with pytest.raises(FetchError) as error:
+        fetch(scorecard, retries=1, checkpoint_dir=tmp_path)
+    assert error.value.failed_pages == [2]
+
+    scorecard.requests.clear()
+    scorecard.failures = {}
+    data = fetch(scorecard, checkpoint_dir=tmp_path)
+    assert data["id"] == list(range(TOTAL))
+    assert scorecard.requests == [2]
+
+
+def test_completed_run_clears_checkpoint(scorecard, tmp_path):
+    fetch(scorecard, checkpoint_dir=tmp_path)
+    assert not list(tmp_path.glob("page_*.json"))
+
+    scorecard.requests.clear()
+    scorecard.prefix = "Renamed"
+    data = fetch(scorecard, checkpoint_dir=tmp_path)
+    assert sorted(scorecard.requests) == [0, 1, 2]
+    assert data["school.name"][0] == "Renamed 0"
+
+
+def test_streams_pages_with_bounded_lookahead(scorecard, monkeypatch):
+    monkeypatch.setattr("app.etl.test_college_scorecard_api.TOTAL", 2000)
+    pages = iter_college_pages(
+        "key",
+        ["id"],
+        base_url=f"http://127.0.0.1:{scorecard.server_port}/schools.json",
+        requests_per_second=None,
+        concurrency=2,
+    )
+    seen = [next(pages), next(pages)]
+    assert seen[0][0] == 0
+    # The first page plus at most 2 * concurrency pages ahead of the consumer.
+    assert len(scorecard.requests) <= 5
+    seen.extend(pages)
+    assert sorted(page_num for page_num, _ in seen) == list(range(20))
+    assert sum(len(records) for _, records in seen) == 2000
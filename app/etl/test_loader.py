@@ -0,0 +1,66 @@
+from datetime import date
+from sqlalchemy import func, select
+from app.db.models import Finance, Location, School
+from .loader import UpsertLoader
+from .pipeline import run_pipeline
+from .test_pipeline import pages
+from .transforms import transform_location, transform_school
+
+
+def load(session, model, transform, page_count=3, batch_size=7):
+    loader = UpsertLoader(session, model)
+    run_pipeline(pages(page_count), transform, loader, batch_size=batch_size)
+    session.commit()
+    return loader.stats
+
+
+def test_rerun_is_idempotent(session):
+    stats = load(session, School, transform_school)
+    assert (stats.inserted, stats.updated, stats.unchanged) == (30, 0, 0)
+    assert stats.changed
+
+    stats = load(session, School, transform_school)
+    assert (stats.inserted, stats.updated, stats.unchanged) == (0, 0, 30)
+    assert not stats.changed
+    assert session.scalar(select(func.count()).select_from(School)) == 30
+
+
+def test_updates_changed_rows_and_inserts_new_ones(session):
+    load(session, School, transform_school)
+    load(session, Location, transform_location)
+
+    def renamed(record):
+        row = transform_school(record)
+        if row["unitid"] == 3:
+            row["name"] = "Renamed"
+        return row
+
+    stats = load(session, School, renamed, page_count=4)
+    assert (stats.inserted, stats.updated, stats.unchanged) == (10, 1, 29)
+    assert session.get(School, 3).name == "Renamed"
+    assert load(session, Location, transform_location).unchanged == 30
+
+
+def test_composite_key_and_duplicates_in_a_batch(session):
+    load(session, School, transform_school, page_count=1)
+    loader = UpsertLoader(session, Finance)
+    loader(
+        [
+            {"school_unitid": 1, "year": date(2020, 1, 1), "avg_net_price": 1.0},
+            {"school_unitid": 1, "year": date(2021, 1, 1), "avg_net_price": 2.0},
+            {"school_unitid": 1, "year": date(2021, 1, 1), "avg_net_price": 3.0},
+        ]
+    )
+    loader([{"school_unitid": 1, "year": date(2020, 1, 1), "avg_net_price": 4.0}])
+    prices = session.scalars(select(Finance.avg_net_price).order_by(Finance.year))
+    assert list(prices) == [4.0, 3.0]
+    assert (loader.stats.inserted, loader.stats.updated) == (2, 1)
+
+
+def test_falls_back_to_insert_and_update(session, monkeypatch):
+    monkeypatch.setattr("app.etl.loader._UPSERT_INSERTS", {})
+    load(session, School, transform_school)
+    loader = UpsertLoader(session, School)
+    loader([{"unitid": 5, "name": "Changed", "url": "changed.edu"}])
+    assert session.get(School, 5).url == "changed.edu"
+    assert loader.stats.updated == 1
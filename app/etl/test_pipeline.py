@@ -0,0 +1,42 @@
+from .pipeline import run_pipeline
+from .transforms import transform_school
+
+
+def pages(count, per_page=10):
+    for page_num in range(count):
+        yield page_num, [
+            {
+                "id": unitid,
+                "school.name": f"School {unitid}",
+                "school.school_url": f"school{unitid}.edu",
+                "school.city": "Springfield",
+                "school.state": "IL",
+                "school.zip": "62701-1234",
+                "school.region_id": 3,
+                "school.locale": 99,
+            }
+            for unitid in range(page_num * per_page, (page_num + 1) * per_page)
+        ]
+
+
+def test_loads_in_batches():
+    batches = []
+    stats = run_pipeline(pages(5), transform_school, batches.append, batch_size=15)
+    assert [len(batch) for batch in batches] == [15, 15, 15, 5]
+    assert [row["unitid"] for batch in batches for row in batch] == list(range(50))
+    assert {stage: stats[stage].rows for stage in stats} == {
+        "fetch": 50,
+        "transform": 50,
+        "load": 50,
+    }
+    assert "rows/s" in str(stats["load"])
+
+
+def test_skips_rows_the_transform_drops():
+    batches = []
+    run_pipeline(
+        pages(2),
+        lambda record: record if record["id"] % 2 else None,
+        batches.append,
+    )
+    assert [record["id"] for record in batches[0]] == list(range(1, 20, 2))
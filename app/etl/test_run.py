@@ -0,0 +1,74 @@
+from datetime import date
+from sqlalchemy import func, select
+from app.db.models import Admission, ChangeLog, Control, Finance, Location
+from .run import parse_args, run
+from .transforms import all_fields
+
+
+def record(unitid, **overrides):
+    return {
+        "id": unitid,
+        "school.name": f"School {unitid}",
+        "school.school_url": f"school{unitid}.edu",
+        "school.city": "Burlington",
+        "school.state": "VT",
+        "school.zip": "05401",
+        "school.region_id": 1,
+        "school.locale": 13,
+        "school.ownership": 2,
+        "school.degrees_awarded.highest": 4,
+        "school.minority_serving.historically_black": 0,
+        "2021.cost.avg_net_price.overall": 21000.0,
+        "2021.admissions.admission_rate.overall": 0.5,
+        "2022.admissions.admission_rate.overall": 0.45,
+        "2022.student.size": 1200,
+        **overrides,
+    }
+
+
+def count(session, model):
+    return session.scalar(select(func.count()).select_from(model))
+
+
+def test_fields_are_requested_once():
+    fields = all_fields([2021, 2022])
+    assert len(fields) == len(set(fields))
+    assert {"id", "school.zip", "2022.student.size"} <= set(fields)
+
+
+def test_loads_every_table_in_one_pass(session):
+    pages = [(0, [record(1), record(2)]), (1, [record(3, **{"school.zip": None})])]
+    assert run(session, pages, [2021, 2022])
+    session.commit()
+
+    assert count(session, Location) == 2
+    assert count(session, Finance) == 3
+    assert count(session, Admission) == 6
+    control = session.scalars(select(Control).where(Control.school_unitid == 1)).one()
+    assert (control.control, control.highest_deg, control.hbcu) == (
+        "Private nonprofit",
+        "Graduate",
+        False,
+    )
+    admission = session.scalars(
+        select(Admission).where(Admission.year == date(2022, 1, 1)).limit(1)
+    ).one()
+    assert (admission.admission_rate, admission.number_of_students) == (0.45, 1200)
+
+
+def test_rerun_only_writes_changed_schools(session):
+    run(session, [(0, [record(1), record(2)])], [2022])
+    assert not run(session, [(0, [record(1), record(2)])], [2022])
+
+    changed = record(2, **{"2022.student.size": 1300})
+    assert run(session, [(0, [record(1), changed])], [2022])
+    session.commit()
+    logged = session.execute(select(ChangeLog.version, ChangeLog.school_unitid))
+    assert sorted(logged) == [(1, 1), (1, 2), (2, 2)]
+    sizes = session.scalars(select(Admission.number_of_students).order_by(Admission.id))
+    assert list(sizes) == [1200, 1300]
+
+
+def test_cli_arguments():
+    args = parse_args(["--page-limit", "2", "--years", "2020", "2021"])
+    assert (args.page_limit, args.years) == (2, [2020, 2021])
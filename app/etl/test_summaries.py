@@ -0,0 +1,82 @@
+from datetime import date
+import pytest
+from sqlalchemy import select
+from app.db.models import DataVersion, SchoolStat
+from .run import run
+from .summaries import percentile, summarize
+from .test_run import record
+
+
+def stat(session, dimension, value, metric="admission_rate"):
+    return session.scalars(
+        select(SchoolStat).where(
+            SchoolStat.dimension == dimension,
+            SchoolStat.value == value,
+            SchoolStat.metric == metric,
+            SchoolStat.year == date(2022, 1, 1),
+        )
+    ).one_or_none()
+
+
+def test_summarize():
+    assert percentile([1.0, 2.0, 3.0, 4.0], 0.5) == 2.5
+    summary = summarize([0.3, 0.1, 0.2])
+    assert (summary["count"], summary["min"], summary["median"], summary["max"]) == (
+        3,
+        0.1,
+        0.2,
+        0.3,
+    )
+    assert summary["mean"] == pytest.approx(0.2)
+
+
+def test_stats_built_and_refreshed_incrementally(session):
+    schools = [
+        record(1, **{"2022.admissions.admission_rate.overall": 0.2}),
+        record(2, **{"2022.admissions.admission_rate.overall": 0.4}),
+        record(3, **{"school.state": "NH", "school.ownership": 1}),
+    ]
+    run(session, [(0, schools)], [2022])
+    vermont = stat(session, "state", "VT")
+    assert (vermont.count, vermont.median) == (2, pytest.approx(0.3))
+    assert stat(session, "control", "Public").count == 1
+    assert stat(session, "state", "VT", "avg_net_price") is None
+
+    # School 2 moves to NH: both states are recomputed, while public schools, a group
+    # without changes, are left alone.
+    session.execute(
+        SchoolStat.__table__.update()
+        .where(SchoolStat.dimension == "control", SchoolStat.value == "Public")
+        .values(count=99)
+    )
+    schools[1] = record(
+        2, **{"school.state": "NH", "2022.admissions.admission_rate.overall": 0.4}
+    )
+    run(session, [(0, schools)], [2022])
+    assert stat(session, "state", "VT").count == 1
+    new_hampshire = stat(session, "state", "NH")
+    assert (new_hampshire.count, new_hampshire.max) == (2, 0.45)
+    assert (
+        stat(
+            session,
+            "locale",
+            record(1) and "City: Small (population less than 100,000)",
+        ).count
+        == 3
+    )
+
+
+def test_first_stats_over_unchanged_data_bump_the_version(session):
+    schools = [(0, [record(1), record(2)])]
+    run(session, schools, [2022])
+    session.execute(SchoolStat.__table__.delete())
+    version = session.get(DataVersion, 1).version
+
+    # As after the migration adding the table: the schools are unchanged, the
+    # statistics are not there yet.
+    assert run(session, schools, [2022])
+    assert stat(session, "state", "VT").count == 2
+    assert session.get(DataVersion, 1).version == version + 1
+
+    assert not run(session, schools, [2022])
+    assert session.get(DataVersion, 1).version == version + 1
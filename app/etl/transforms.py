@@ -0,0 +1,187 @@
+from datetime import date
+from .utils.data_cleaning import transform_zipcode
+
+REGIONS = {
+    0: "U.S. Service Schools",
+    1: "New England (CT, ME, MA, NH, RI, VT)",
+    2: "Mid East (DE, DC, MD, NJ, NY, PA)",
+    3: "Great Lakes (IL, IN, MI, OH, WI)",
+    4: "Plains (IA, KS, MN, MO, NE, ND, SD)",
+    5: "Southeast (AL, AR, FL, GA, KY, LA, MS, NC, SC, TN, VA, WV)",
+    6: "Southwest (AZ, NM, OK, TX)",
+    7: "Rocky Mountains (CO, ID, MT, UT, WY)",
+    8: "Far West (AK, CA, HI, NV, OR, WA)",
+    9: "Outlying Areas (AS, FM, GU, MH, MP, PR, PW, VI)",
+}
+
+LOCALES = {
+    11: "City: Large (population of 250,000 or more)",
+    12: "City: Midsize (population of at least 100,000 but less than 250,000)",
+    13: "City: Small (population less than 100,000)",
+    21: "Suburb: Large (outside principal city, in urbanized area with population of 250,000 or more)",
+    22: "Suburb: Midsize (outside principal city, in urbanized area with population of at least 100,000 but less than 250,000)",
+    23: "Suburb: Small (outside principal city, in urbanized area with population less than 100,000)",
+    31: "Town: Fringe (in urban cluster up to 10 miles from an urbanized area)",
+    32: "Town: Distant (in urban cluster more than 10 miles and up to 35 miles from an urbanized area)",
+    33: "Town: Remote (in urban cluster more than 35 miles from an urbanized area)",
+    41: "Rural: Fringe (rural territory up to 5 miles from an urbanized area or up to 2.5 miles from an urban cluster)",
+    42: "Rural: Distant (rural territory more than 5 miles but up to 25 miles from an urbanized area or more than 2.5 and up to 10 miles from an urban cluster)",
+    43: "Rural: Remote (rural territory more than 25 miles from an urbanized area and more than 10 miles from an urban cluster)",
+}
+
+OWNERSHIP = {1: "Public", 2: "Private nonprofit", 3: "Private for-profit"}
+
+DEGREES = {
+    0: "Non-degree-granting",
+    1: "Certificate",
+    2: "Associate",
+    3: "Bachelor's",
+    4: "Graduate",
+}
+
+# The years loaded into the per-year `Finance` and `Admission` tables by default.
+DEFAULT_YEARS = [2020, 2021, 2022]
+
+SCHOOL_FIELDS = ["id", "school.name", "school.school_url"]
+
+LOCATION_FIELDS = [
+    "id",
+    "school.city",
+    "school.state",
+    "school.zip",
+    "school.region_id",
+    "school.locale",
+    "location.lat",
+    "location.lon",
+]
+
+CONTROL_FIELDS = {
+    "under_investigation": "school.under_investigation",
+    "predominant_deg": "school.degrees_awarded.predominant",
+    "highest_deg": "school.degrees_awarded.highest",
+    "control": "school.ownership",
+    "hbcu": "school.minority_serving.historically_black",
+    "religious_affiliation": "school.religious_affiliation",
+    "carnegie_undergrad": "school.carnegie_undergrad",
+    "carnegie_size": "school.carnegie_size_setting",
+}
+
+# Per-year columns, keyed on the field name below the year prefix ("2021.cost...").
+FINANCE_FIELDS = {
+    "cost_attendance": "cost.attendance.academic_year",
+    "avg_net_price": "cost.avg_net_price.overall",
+    "in_state_tuition": "cost.tuition.in_state",
+    "out_state_tuition": "cost.tuition.out_of_state",
+    "tuition_per_fte": "school.tuition_revenue_per_fte",
+    "instructional_expenditure_per_fte": "school.instructional_expenditure_per_fte",
+    "avg_faculty_salary": "school.faculty_salary",
+}
+
+ADMISSION_FIELDS = {
+    "admission_rate": "admissions.admission_rate.overall",
+    "number_of_students": "student.size",
+    "sat_math_median": "admissions.sat_scores.midpoint.math",
+    "sat_reading_median": "admissions.sat_scores.midpoint.critical_reading",
+    "sat_writing_median": "admissions.sat_scores.midpoint.writing",
+    "act_math_median": "admissions.act_scores.midpoint.math",
+    "act_english_median": "admissions.act_scores.midpoint.english",
+    "act_writing_median": "admissions.act_scores.midpoint.writing",
+    "act_cumulative_median": "admissions.act_scores.midpoint.cumulative",
+    "avg_sat_score_admitted": "admissions.sat_scores.average.overall",
+}
+
+
+def all_fields(years: list[int]) -> list[str]:
+    """Returns the union of the fields every table is built from, for ``years``."""
+    fields = dict.fromkeys(SCHOOL_FIELDS + LOCATION_FIELDS)
+    fields.update(dict.fromkeys(CONTROL_FIELDS.values()))
+    for year in years:
+        for field in [*FINANCE_FIELDS.values(), *ADMISSION_FIELDS.values()]:
+            fields[f"{year}.{field}"] = None
+    return list(fields)
+
+
+def transform_school(record: dict) -> dict:
+    """Maps a College Scorecard record to a `School` row."""
+    return {
+        "unitid": record.get("id"),
+        "name": record.get("school.name"),
+        "url": record.get("school.school_url"),
+    }
+
+
+def transform_location(record: dict) -> dict:
+    """Maps a College Scorecard record to a `Location` row."""
+    return {
+        "school_unitid": record.get("id"),
+        "city": record.get("school.city"),
+        "state": record.get("school.state"),
+        "zipcode": transform_zipcode(record.get("school.zip")),
+        "region": REGIONS.get(record.get("school.region_id")),
+        "locale": LOCALES.get(record.get("school.locale"), "None"),
+        "latitude": record.get("location.lat"),
+        "longitude": record.get("location.lon"),
+    }
+
+
+def _code(value):
+    return None if value is None else str(value)
+
+
+def transform_control(record: dict) -> dict:
+    """Maps a College Scorecard record to a `Control` row."""
+    row = {column: record.get(field) for column, field in CONTROL_FIELDS.items()}
+    row["school_unitid"] = record.get("id")
+    for column in ("under_investigation", "hbcu"):
+        row[column] = None if row[column] is None else bool(row[column])
+    row["predominant_deg"] = DEGREES.get(row["predominant_deg"])
+    row["highest_deg"] = DEGREES.get(row["highest_deg"])
+    row["control"] = OWNERSHIP.get(row["control"])
+    for column in ("religious_affiliation", "carnegie_undergrad", "carnegie_size"):
+        row[column] = _code(row[column])
+    return row
+
+
+def _per_year(record: dict, fields: dict, years: list[int]) -> list[dict]:
+    """Builds one row per year that has at least one value reported."""
+    rows = []
+    for year in years:
+        row = {
+            column: record.get(f"{year}.{field}") for column, field in fields.items()
+        }
+        if any(value is not None for value in row.values()):
+            rows.append(
+                {"school_unitid": record.get("id"), "year": date(year, 1, 1), **row}
+            )
+    return rows
+
+
+def transform_finances(record: dict, years: list[int]) -> list[dict]:
+    """Maps a College Scorecard record to its `Finance` rows, one per reported year."""
+    return _per_year(record, FINANCE_FIELDS, years)
+
+
+def transform_admissions(record: dict, years: list[int]) -> list[dict]:
+    """Maps a College Scorecard record to its `Admission` rows, one per reported year."""
+    return _per_year(record, ADMISSION_FIELDS, years)
+
+
+def transform_record(record: dict, years: list[int]) -> dict | None:
+    """
+    Maps a College Scorecard record to its rows in every table, keyed on table name.
+
+    Records without an id are dropped, as are locations missing a required field.
+    """
+    if record.get("id") is None:
+        return None
+    has_location = all(
+        record.get(field) is not None
+        for field in ("school.city", "school.state", "school.zip")
+    )
+    return {
+        "schools": [transform_school(record)],
+        "location": [transform_location(record)] if has_location else [],
+        "control": [transform_control(record)],
+        "finance": transform_finances(record, years),
+        "admission": transform_admissions(record, years),
+    }
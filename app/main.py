@@ -1,13 +1,31 @@
+from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi import FastAPI
 
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
-from app.routers import locations
+from app.routers import cache, export, locations, metrics, schools, search, stats
 from app.dependencies.dependencies import limiter
+from app.db import memory
+from app.db.database import DATABASE_URI, async_engine, prepare_database
+from app.config import settings
+from app.metrics import RequestMetricsMiddleware
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    prepare_database()
+    refresher = None
+    if settings.memory_dataset:
+        refresher = await memory.serve_from_memory(DATABASE_URI, str(async_engine.url))
+    yield
+    if refresher is not None:
+        refresher.cancel()
+        memory.activate(None)
+    await async_engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 app.state.limiter = limiter
@@ -22,10 +40,13 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
-    allow_methods=["GET"],
+    allow_methods=["GET", "POST"],
     allow_headers=["*"],
 )
 
+if settings.request_metrics_enabled:
+    app.add_middleware(RequestMetricsMiddleware)
+
 
 @app.get("/")
 async def home():
@@ -33,4 +54,11 @@ async def home():
     return {"health_check": "OK"}
 
 
+app.include_router(schools.router)
+app.include_router(search.router)
+app.include_router(export.router)
 app.include_router(locations.router)
+app.include_router(stats.router)
+app.include_router(cache.router)
+if settings.request_metrics_enabled:
+    app.include_router(metrics.router)
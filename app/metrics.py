@@ -0,0 +1,177 @@
+"""
+Per-request performance instrumentation.
+
+`RequestMetricsMiddleware` times every HTTP request and, through SQLAlchemy cursor
+hooks and `measure_serialization`, how much of it went to the database and to
+serializing the response. The figures are sent back in a `Server-Timing` header and
+recorded in per-route Prometheus histograms served at `/metrics`.
+"""
+
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Histogram,
+    generate_latest,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from app.config import settings
+
+STATEMENT_BUCKETS = (1, 2, 3, 4, 6, 8, 12, 16, 25, 50, 100)
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last of its response.",
+    ["method", "route", "status"],
+)
+DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Time spent executing SQL statements per request.",
+    ["route"],
+)
+DB_STATEMENTS = Histogram(
+    "http_request_db_statements",
+    "SQL statements executed per request.",
+    ["route"],
+    buckets=STATEMENT_BUCKETS,
+)
+SERIALIZATION_SECONDS = Histogram(
+    "http_request_serialization_seconds",
+    "Time spent serializing response bodies per request.",
+    ["route"],
+)
+
+
+class RequestMetrics:
+    """Database and serialization time accumulated by one request."""
+
+    __slots__ = ("db_seconds", "statements", "serialization_seconds")
+
+    def __init__(self):
+        self.db_seconds = 0.0
+        self.statements = 0
+        self.serialization_seconds = 0.0
+
+    def server_timing(self, total_seconds: float) -> str:
+        return (
+            f'db;dur={self.db_seconds * 1000:.2f};desc="{self.statements} statements", '
+            f"serialize;dur={self.serialization_seconds * 1000:.2f}, "
+            f"total;dur={total_seconds * 1000:.2f}"
+        )
+
+
+# The metrics of the request being handled. SQLAlchemy runs the async engine's cursor
+# calls in the context of the awaiting task, so the hooks below see the same object.
+_current: ContextVar[RequestMetrics | None] = ContextVar(
+    "request_metrics", default=None
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_statement(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info["statement_started"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _end_statement(conn, cursor, statement, parameters, context, executemany):
+    metrics = _current.get()
+    started = conn.info.pop("statement_started", None)
+    if metrics is not None and started is not None:
+        metrics.db_seconds += time.perf_counter() - started
+        metrics.statements += 1
+
+
+@contextmanager
+def measure_serialization():
+    """Counts the time spent in the block as serialization of the current response."""
+    metrics = _current.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if metrics is not None:
+            metrics.serialization_seconds += time.perf_counter() - started
+
+
+def route_label(scope) -> str:
+    """The path template of the matched route, which keeps label cardinality bounded."""
+    route = scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+
+class RequestMetricsMiddleware:
+    """
+    Measures each HTTP request and reports it in a `Server-Timing` header and the
+    Prometheus histograms.
+
+    The header is written when the response starts, so for streamed responses it only
+    covers the work done before the first byte; the histograms cover the whole request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append(
+                    "Server-Timing",
+                    metrics.server_timing(time.perf_counter() - started),
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            observe(scope, status, metrics, time.perf_counter() - started)
+
+
+def observe(scope, status: int, metrics: RequestMetrics, total_seconds: float) -> None:
+    route = route_label(scope)
+    REQUEST_SECONDS.labels(scope["method"], route, str(status)).observe(total_seconds)
+    DB_SECONDS.labels(route).observe(metrics.db_seconds)
+    DB_STATEMENTS.labels(route).observe(metrics.statements)
+    SERIALIZATION_SECONDS.labels(route).observe(metrics.serialization_seconds)
+    if metrics.statements > settings.request_statement_warning:
+        logging.warning(
+            f"{scope['method']} {route} ran {metrics.statements} SQL statements."
+        )
+
+
+def registry() -> CollectorRegistry:
+    """
+    The registry to expose. Under a multi-process server with
+    `PROMETHEUS_MULTIPROC_DIR` set, it aggregates the samples of every worker.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    from prometheus_client import multiprocess
+
+    collected = CollectorRegistry()
+    multiprocess.MultiProcessCollector(collected)
+    return collected
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Returns the metrics in the Prometheus text format and its content type."""
+    return generate_latest(registry()), CONTENT_TYPE_LATEST
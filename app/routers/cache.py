@@ -0,0 +1,13 @@
+from fastapi import APIRouter, status
+from app.cache.responses import response_cache
+
+router = APIRouter(prefix="/v1/cache", tags=["cache"])
+
+
+@router.get("/stats", status_code=status.HTTP_200_OK)
+def get_cache_stats() -> dict:
+    """
+    Reports the hit and miss counters, current size and limits of the response cache
+    in this worker process.
+    """
+    return response_cache.stats()
@@ -0,0 +1,227 @@
+import csv
+import io
+import json
+from datetime import date
+from typing import Literal
+from fastapi import APIRouter, status, Depends, Request, Query, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Boolean, Date, Float, Integer, and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.filters import distinct_values
+from app.db.models import Admission, Control, Finance, Location, School
+from app.dependencies.dependencies import limiter, get_db
+from .search import SchoolFilters, build_search_query
+
+router = APIRouter(prefix="/v1/schools", tags=["export"])
+
+ExportFormat = Literal["ndjson", "csv", "parquet"]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Rows fetched from the cursor, and written out, at a time.
+CHUNK_SIZE = 1000
+
+
+def _flattened(model, prefix: str) -> list:
+    """Labels ``model``'s data columns with ``prefix``, leaving out its keys."""
+    return [
+        column.label(f"{prefix}_{column.name}")
+        for column in model.__table__.columns
+        if column.name not in ("id", "school_unitid", "year")
+    ]
+
+
+# One row per school: its location and control record, and its finance and admission
+# records for the exported year.
+COLUMNS = [
+    School.unitid,
+    School.name,
+    School.url,
+    *_flattened(Location, "location"),
+    *_flattened(Control, "control"),
+    *_flattened(Finance, "finance"),
+    *_flattened(Admission, "admission"),
+]
+
+
+def export_query(ids_query, year):
+    """Selects the flattened `COLUMNS` of every school in ``ids_query``, by unitid."""
+    return (
+        select(*COLUMNS)
+        .outerjoin(Location, Location.school_unitid == School.unitid)
+        .outerjoin(Control, Control.school_unitid == School.unitid)
+        .outerjoin(
+            Finance, and_(Finance.school_unitid == School.unitid, Finance.year == year)
+        )
+        .outerjoin(
+            Admission,
+            and_(Admission.school_unitid == School.unitid, Admission.year == year),
+        )
+        .where(School.unitid.in_(ids_query))
+        .order_by(School.unitid)
+    )
+
+
+def arrow_schema():
+    """The Parquet schema of `COLUMNS`, derived from the column types."""
+    import pyarrow as pa
+
+    types = {
+        Integer: pa.int64(),
+        Float: pa.float64(),
+        Boolean: pa.bool_(),
+        Date: pa.date32(),
+    }
+    return pa.schema(
+        [
+            (
+                column.name,
+                next(
+                    (
+                        arrow_type
+                        for sql_type, arrow_type in types.items()
+                        if isinstance(column.type, sql_type)
+                    ),
+                    pa.string(),
+                ),
+            )
+            for column in COLUMNS
+        ]
+    )
+
+
+class _Drain(io.RawIOBase):
+    """A write-only file that hands out what was written since the last `drain`."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+async def _ndjson(partitions, names):
+    async for rows in partitions:
+        yield "".join(
+            json.dumps(dict(zip(names, row)), default=str) + "\n" for row in rows
+        ).encode()
+
+
+async def _csv(partitions, names):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    async for rows in partitions:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def _parquet(partitions, names):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = arrow_schema()
+    sink = _Drain()
+    # Every chunk becomes a row group, flushed to the client as soon as it is written.
+    with pq.ParquetWriter(sink, schema) as writer:
+        async for rows in partitions:
+            writer.write_table(
+                pa.Table.from_pylist([dict(zip(names, row)) for row in rows], schema)
+            )
+            yield sink.drain()
+    yield sink.drain()
+
+
+WRITERS = {"ndjson": _ndjson, "csv": _csv, "parquet": _parquet}
+
+
+@router.get("/export/", status_code=status.HTTP_200_OK)
+@limiter.limit(limiter.tier_limit)
+async def export_schools(
+    request: Request,
+    format: ExportFormat = Query("ndjson", description="`ndjson`, `csv` or `parquet`."),
+    filters: SchoolFilters = Depends(),
+    db: AsyncSession = Depends(get_db),
+) -> StreamingResponse:
+    """
+    Streams every school matching the filters of `/v1/schools/search/` in one response,
+    as newline-delimited JSON, CSV or Parquet.
+    This endpoint is rate-limited to 5 requests per minute per user, or the limit of the caller's API key tier, to ensure fair usage.
+
+    Rows are read from a server-side cursor and written out in chunks of 1,000 as they
+    arrive, so memory use does not depend on the size of the export. Each row holds a
+    school with its location and control record, and its finance and admission records
+    for one year, as columns prefixed `location_`, `control_`, `finance_` and `admission_`.
+
+    Args:
+    - format (str): `ndjson` (default), `csv` or `parquet`.
+    - year (int, optional): The year of the finance and admission columns, and of their filters. Defaults to the latest loaded.
+    - Any other filter of `/v1/schools/search/`. `sort` is ignored; rows are in unitid order.
+
+    Returns:
+    StreamingResponse: The rows as a `schools.<format>` attachment.
+
+    Example Input:
+    GET /v1/schools/export/?format=csv&state=VT
+
+    Note:
+    - Exceeding the rate limit will result in a 429 status code.
+    - Parquet requires `pyarrow`; without it the request fails with a 501 status code.
+    """
+    if format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(
+                status_code=501, detail="Parquet export requires pyarrow."
+            )
+
+    if filters.year is None:
+        years = await distinct_values(db, Finance.year) + await distinct_values(
+            db, Admission.year
+        )
+        filters.year = max(years).year if years else None
+    filters.sort = "unitid"
+    ids_query, _ = await build_search_query(db, filters)
+    year = date(filters.year, 1, 1) if filters.year is not None else None
+    query = export_query(ids_query, year)
+    names = [column.name for column in COLUMNS]
+
+    async def body():
+        # FastAPI closes the request's session before the body is streamed; a closed
+        # AsyncSession can still be used, checking out a connection of its own, so it
+        # is closed again here once the export is done.
+        try:
+            result = await db.stream(query.execution_options(yield_per=CHUNK_SIZE))
+            async for chunk in WRITERS[format](result.partitions(CHUNK_SIZE), names):
+                yield chunk
+        finally:
+            await db.close()
+
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="schools.{format}"'},
+    )
@@ -1,38 +1,84 @@
-from fastapi import APIRouter, status, Depends, Request, Query, HTTPException
-from app.db import models
-from app.schemas.schemas import Header, SchoolSearchResponse, SchoolBase, LocationBase
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, status, Depends, Request, Query, HTTPException, Response
+from app.db import memory, models, search, spatial
+from app.db.filters import prefix_match, substring_match
+from app.schemas.schemas import Header, NearbySchoolResponse, SchoolSearchResponse
+from app.schemas.serialization import (
+    dataset_fragments,
+    render_search_response,
+    school_fragments,
+    with_distance,
+)
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.cache.http import conditional_response
+from app.cache.responses import cached_response
 from app.dependencies.dependencies import limiter, get_db
+from app.dependencies.pagination import (
+    Pagination,
+    decode_cursor,
+    encode_cursor,
+    paginate,
+    paginate_ids,
+)
 
 router = APIRouter(prefix="/v1/schools", tags=["locations"])
 
 
+async def search_by_location(
+    db: AsyncSession, page: Pagination, condition, count_key: tuple
+) -> Response:
+    """Pages through the schools that have a location matching ``condition``."""
+    query = select(models.School.unitid).where(
+        models.School.unitid.in_(select(models.Location.school_unitid).where(condition))
+    )
+    unitids, header = await paginate(db, query, page, [models.School.unitid], count_key)
+    body = render_search_response(
+        header, await school_fragments(db, unitids, shape="location")
+    )
+    return Response(content=body, media_type="application/json")
+
+
+def search_in_memory(
+    dataset: memory.Dataset, page: Pagination, unitids, shape: str = "location"
+) -> Response:
+    """Pages through ``unitids`` found in the in-memory ``dataset``."""
+    unitids, header = paginate_ids(unitids, page)
+    body = render_search_response(header, dataset_fragments(dataset, unitids, shape))
+    return Response(content=body, media_type="application/json")
+
+
 @router.get("/", status_code=status.HTTP_200_OK, response_model=SchoolSearchResponse)
-@limiter.limit("5/minute")
-def get_schools_by_name(
+@limiter.limit(limiter.tier_limit)
+@conditional_response
+@cached_response
+async def get_schools_by_name(
     request: Request,
     school_name: str = Query(
         None, description="The partial or full name of the school to search for."
     ),
-    skip: int = Query(default=0, ge=0),
-    limit: int = Query(default=100, gt=0, le=1000),
-    db: Session = Depends(get_db),
+    page: Pagination = Depends(),
+    db: AsyncSession = Depends(get_db),
 ) -> SchoolSearchResponse:
     """
     Retrieves a list of schools matching the given search criteria with support for pagination.
-    This endpoint is rate-limited to 5 requests per minute per user to ensure fair usage.
+    This endpoint is rate-limited to 5 requests per minute per user, or the limit of the caller's API key tier, to ensure fair usage.
 
-    The search is performed case-insensitively on the full or partial school name provided.
-    Use the `skip` and `limit` query parameters to navigate through the results for large data sets.
+    The search is performed case-insensitively against a full-text index of school names.
+    Every word in `school_name` must match the start of a word in the school's name, and
+    results are ordered by relevance.
+    Use the `skip` and `limit` query parameters, or `cursor` for deep pages, to navigate through the results for large data sets.
 
     Args:
-    - school_name (str, optional): The partial or full name of the school to search for. Defaults to None.
+    - school_name (str, optional): The partial or full name of the school to search for, e.g. "univ alab". Defaults to None.
     - skip (int): The number of records to skip before starting to collect the response set. Defaults to 0.
     - limit (int): The maximum number of records to return. Defaults to 100 but can be adjusted as needed.
+    - cursor (str, optional): The `next_cursor` from the previous page's header. Faster than `skip` for deep pages.
+    - include_total (bool): Whether to count all matching records. Defaults to true.
+    - count_mode (str): `exact`, `cached` or `estimate`; see `header.total_mode` for the strategy used. Defaults to `cached`.
 
     Returns:
     SchoolSearchResponse: A JSON object with two main components:
-    - `header`: Contains metadata such as the total number of matching records, the number of records skipped, and the limit applied.
+    - `header`: Contains metadata such as the total number of matching records, the number of records skipped, the limit applied, and the cursor for the next page.
     - `results`: A list of schools matching the search criteria. Each school includes basic information and a unique identifier.
 
     Example Input:
@@ -43,16 +89,28 @@ def get_schools_by_name(
     - An empty `results` list indicates no schools were found matching the criteria.
     - For best performance, it is recommended to keep the `limit` value reasonable, especially for broad searches.
     """
-    query = db.query(models.School).filter(
-        models.School.name.ilike(f"%{school_name.lower()}%")
-    )
-
-    total = query.count()
-    schools = query.offset(skip).limit(limit).all()
-    results = [SchoolBase.model_validate(school) for school in schools]
+    # Name searches are ranked by the full-text index, so only the unfiltered listing
+    # is served from memory.
+    dataset = memory.active_dataset(str(db.bind.url))
+    if dataset is not None and school_name is None:
+        return search_in_memory(dataset, page, dataset.unitids, shape="summary")
+
+    query = select(models.School.unitid)
+    sort_keys = [models.School.unitid]
+    if school_name is not None:
+        connection = await db.connection()
+        indexed = await connection.run_sync(search.has_search_index)
+        query, sort_keys = search.match_school_name(
+            query, school_name, db.bind.dialect.name, indexed
+        )
 
-    header = Header(total=total, skip=skip, limit=limit)
-    return SchoolSearchResponse(header=header, results=results)
+    unitids, header = await paginate(
+        db, query, page, sort_keys, ("name", school_name and school_name.lower())
+    )
+    body = render_search_response(
+        header, await school_fragments(db, unitids, shape="summary")
+    )
+    return Response(content=body, media_type="application/json")
 
 
 @router.get(
@@ -60,29 +118,33 @@ def get_schools_by_name(
     status_code=status.HTTP_200_OK,
     response_model=SchoolSearchResponse,
 )
-@limiter.limit("5/minute")
-def get_school_by_state(
+@limiter.limit(limiter.tier_limit)
+@conditional_response
+@cached_response
+async def get_school_by_state(
     request: Request,
     state_code: str = Query(None, description="The state to get all schools from."),
-    skip: int = Query(default=0, ge=0),
-    limit: int = Query(default=100, gt=0, le=1000),
-    db: Session = Depends(get_db),
+    page: Pagination = Depends(),
+    db: AsyncSession = Depends(get_db),
 ) -> SchoolSearchResponse:
     """
     Retrieves a list of schools matching the given state with support for pagination.
-    This endpoint is rate-limited to 5 requests per minute per user to ensure fair usage.
+    This endpoint is rate-limited to 5 requests per minute per user, or the limit of the caller's API key tier, to ensure fair usage.
 
-    The search is performed case-insensitively.
-    Use the `skip` and `limit` query parameters to navigate through the results for large data sets.
+    The state code must match exactly, ignoring case (e.g. `CA` or `ca`).
+    Use the `skip` and `limit` query parameters, or `cursor` for deep pages, to navigate through the results for large data sets.
 
     Args:
     - state_code (str, optional): The state code of the school to search for. Defaults to None.
     - skip (int): The number of records to skip before starting to collect the response set. Defaults to 0.
     - limit (int): The maximum number of records to return. Defaults to 100 but can be adjusted as needed.
+    - cursor (str, optional): The `next_cursor` from the previous page's header. Faster than `skip` for deep pages.
+    - include_total (bool): Whether to count all matching records. Defaults to true.
+    - count_mode (str): `exact`, `cached` or `estimate`; see `header.total_mode` for the strategy used. Defaults to `cached`.
 
     Returns:
     SchoolSearchResponse: A JSON object with two main components:
-    - `header`: Contains metadata such as the total number of matching records, the number of records skipped, and the limit applied.
+    - `header`: Contains metadata such as the total number of matching records, the number of records skipped, the limit applied, and the cursor for the next page.
     - `results`: A list of schools matching the search criteria along with location information
 
     Example Input:
@@ -96,56 +158,37 @@ def get_school_by_state(
 
     if state_code is None:
         raise HTTPException(status_code=400, detail="State code is required.")
-    query = (
-        db.query(models.School)
-        .join(models.Location)
-        .filter(models.Location.state.ilike(f"%{state_code.lower()}%"))
-        .options(joinedload(models.School.locations))
+    dataset = memory.active_dataset(str(db.bind.url))
+    if dataset is not None:
+        return search_in_memory(dataset, page, dataset.state(state_code))
+    return await search_by_location(
+        db,
+        page,
+        models.Location.state == state_code.upper(),
+        ("state", state_code.lower()),
     )
 
-    total = query.count()
-    schools = query.offset(skip).limit(limit).all()
-
-    results = []
-    for school in schools:
-        location_data = next(iter(school.locations or []), None)
-        location = None
-        if location_data:
-            location = LocationBase(
-                city=location_data.city,
-                state=location_data.state,
-                zipcode=location_data.zipcode,
-                region=location_data.region,
-                locale=location_data.locale,
-            )
-        school_data = SchoolBase(
-            unitid=school.unitid, name=school.name, url=school.url, location=location
-        )
-        results.append(school_data)
-
-    header = Header(total=total, skip=skip, limit=limit)
-    return SchoolSearchResponse(header=header, results=results)
-
 
 @router.get(
     "/region/",
     status_code=status.HTTP_200_OK,
     response_model=SchoolSearchResponse,
 )
-@limiter.limit("5/minute")
-def get_school_by_region(
+@limiter.limit(limiter.tier_limit)
+@conditional_response
+@cached_response
+async def get_school_by_region(
     request: Request,
     region: str = Query(None, description="The region to get all schools from."),
-    skip: int = Query(default=0, ge=0),
-    limit: int = Query(default=100, gt=0, le=1000),
-    db: Session = Depends(get_db),
+    page: Pagination = Depends(),
+    db: AsyncSession = Depends(get_db),
 ) -> SchoolSearchResponse:
     """
     Retrieves a list of schools matching a given region with support for pagination.
-    This endpoint is rate-limited to 5 requests per minute per user to ensure fair usage.
+    This endpoint is rate-limited to 5 requests per minute per user, or the limit of the caller's API key tier, to ensure fair usage.
 
     The search is performed case-insensitively on the full or partial region provided.
-    Use the `skip` and `limit` query parameters to navigate through the results for large data sets.
+    Use the `skip` and `limit` query parameters, or `cursor` for deep pages, to navigate through the results for large data sets.
 
     Available regions:
     - U.S. Service Schools
@@ -165,10 +208,13 @@ def get_school_by_region(
     - state_name (str, optional): The partial or full name of the state to query. Defaults to None.
     - skip (int): The number of records to skip before starting to collect the response set. Defaults to 0.
     - limit (int): The maximum number of records to return. Defaults to 100 but can be adjusted as needed.
+    - cursor (str, optional): The `next_cursor` from the previous page's header. Faster than `skip` for deep pages.
+    - include_total (bool): Whether to count all matching records. Defaults to true.
+    - count_mode (str): `exact`, `cached` or `estimate`; see `header.total_mode` for the strategy used. Defaults to `cached`.
 
     Returns:
     SchoolSearchResponse: A JSON object with two main components:
-    - `header`: Contains metadata such as the total number of matching records, the number of records skipped, and the limit applied.
+    - `header`: Contains metadata such as the total number of matching records, the number of records skipped, the limit applied, and the cursor for the next page.
     - `results`: A list of schools matching the search criteria along with location information
 
     Example Input:
@@ -181,53 +227,34 @@ def get_school_by_region(
     """
     if region is None:
         raise HTTPException(status_code=400, detail="State code is required.")
-    query = (
-        db.query(models.School)
-        .join(models.Location)
-        .filter(models.Location.region.ilike(f"%{region.lower()}%"))
-        .options(joinedload(models.School.locations))
+    dataset = memory.active_dataset(str(db.bind.url))
+    if dataset is not None:
+        return search_in_memory(dataset, page, dataset.region(region))
+    return await search_by_location(
+        db,
+        page,
+        await substring_match(db, models.Location.region, region),
+        ("region", region.lower()),
     )
 
-    total = query.count()
-    schools = query.offset(skip).limit(limit).all()
-
-    results = []
-    for school in schools:
-        location_data = next(iter(school.locations or []), None)
-        location = None
-        if location_data:
-            location = LocationBase(
-                city=location_data.city,
-                state=location_data.state,
-                zipcode=location_data.zipcode,
-                region=location_data.region,
-                locale=location_data.locale,
-            )
-        school_data = SchoolBase(
-            unitid=school.unitid, name=school.name, url=school.url, location=location
-        )
-        results.append(school_data)
-
-    header = Header(total=total, skip=skip, limit=limit)
-    return SchoolSearchResponse(header=header, results=results)
-
 
 @router.get(
     "/locale/",
     status_code=status.HTTP_200_OK,
     response_model=SchoolSearchResponse,
 )
-@limiter.limit("5/minute")
-def get_school_by_locale(
+@limiter.limit(limiter.tier_limit)
+@conditional_response
+@cached_response
+async def get_school_by_locale(
     request: Request,
     locale: str = Query(None, description="The locale to get all schools from."),
-    skip: int = Query(default=0, ge=0),
-    limit: int = Query(default=100, gt=0, le=1000),
-    db: Session = Depends(get_db),
+    page: Pagination = Depends(),
+    db: AsyncSession = Depends(get_db),
 ) -> SchoolSearchResponse:
     """
     Retrieves a list of schools matching a given locale with support for pagination.
-    This endpoint is rate-limited to 5 requests per minute per user to ensure fair usage.
+    This endpoint is rate-limited to 5 requests per minute per user, or the limit of the caller's API key tier, to ensure fair usage.
 
     The search is performed case-insensitively on the full or partial locale provided.
 
@@ -241,10 +268,13 @@ def get_school_by_locale(
     - state_name (str, optional): The partial or full name of the locale to query. Defaults to None.
     - skip (int): The number of records to skip before starting to collect the response set. Defaults to 0.
     - limit (int): The maximum number of records to return. Defaults to 100 but can be adjusted as needed.
+    - cursor (str, optional): The `next_cursor` from the previous page's header. Faster than `skip` for deep pages.
+    - include_total (bool): Whether to count all matching records. Defaults to true.
+    - count_mode (str): `exact`, `cached` or `estimate`; see `header.total_mode` for the strategy used. Defaults to `cached`.
 
     Returns:
     SchoolSearchResponse: A JSON object with two main components:
-    - `header`: Contains metadata such as the total number of matching records, the number of records skipped, and the limit applied.
+    - `header`: Contains metadata such as the total number of matching records, the number of records skipped, the limit applied, and the cursor for the next page.
     - `results`: A list of schools matching the search criteria along with location information
 
     Example Input:
@@ -258,62 +288,49 @@ def get_school_by_locale(
 
     if locale is None:
         raise HTTPException(status_code=400, detail="State code is required.")
-    query = (
-        db.query(models.School)
-        .join(models.Location)
-        .filter(models.Location.locale.ilike(f"%{locale.lower()}%"))
-        .options(joinedload(models.School.locations))
+    dataset = memory.active_dataset(str(db.bind.url))
+    if dataset is not None:
+        return search_in_memory(dataset, page, dataset.locale(locale))
+    return await search_by_location(
+        db,
+        page,
+        await substring_match(db, models.Location.locale, locale),
+        ("locale", locale.lower()),
     )
 
-    total = query.count()
-    schools = query.offset(skip).limit(limit).all()
-
-    results = []
-    for school in schools:
-        location_data = next(iter(school.locations or []), None)
-        location = None
-        if location_data:
-            location = LocationBase(
-                city=location_data.city,
-                state=location_data.state,
-                zipcode=location_data.zipcode,
-                region=location_data.region,
-                locale=location_data.locale,
-            )
-        school_data = SchoolBase(
-            unitid=school.unitid, name=school.name, url=school.url, location=location
-        )
-        results.append(school_data)
-
-    header = Header(total=total, skip=skip, limit=limit)
-    return SchoolSearchResponse(header=header, results=results)
-
 
 @router.get(
     "/zipcode/",
     status_code=status.HTTP_200_OK,
     response_model=SchoolSearchResponse,
 )
-@limiter.limit("5/minute")
-def get_school_by_zip(
+@limiter.limit(limiter.tier_limit)
+@conditional_response
+@cached_response
+async def get_school_by_zip(
     request: Request,
     zipcode: str = Query(None, description="The zipcode to get all schools from."),
-    skip: int | None = Query(default=0, ge=0),
-    limit: int | None = Query(default=100, gt=0, le=1000),
-    db: Session = Depends(get_db),
+    page: Pagination = Depends(),
+    db: AsyncSession = Depends(get_db),
 ) -> SchoolSearchResponse:
     """
     Retrieves a list of schools matching a given zipcode with support for pagination.
-    This endpoint is rate-limited to 5 requests per minute per user to ensure fair usage.
+    This endpoint is rate-limited to 5 requests per minute per user, or the limit of the caller's API key tier, to ensure fair usage.
+
+    A full 5-digit zipcode matches exactly; a shorter one matches every zipcode starting
+    with it (e.g. `989` for central Washington).
 
     Args:
-    - zipcode (str): The partial or full name of the locale to query. Defaults to None.
+    - zipcode (str): The full zipcode or a zipcode prefix to query. Defaults to None.
     - skip (int): The number of records to skip before starting to collect the response set. Defaults to 0.
     - limit (int): The maximum number of records to return. Defaults to 100 but can be adjusted as needed.
+    - cursor (str, optional): The `next_cursor` from the previous page's header. Faster than `skip` for deep pages.
+    - include_total (bool): Whether to count all matching records. Defaults to true.
+    - count_mode (str): `exact`, `cached` or `estimate`; see `header.total_mode` for the strategy used. Defaults to `cached`.
 
     Returns:
     SchoolSearchResponse: A JSON object with two main components:
-    - `header`: Contains metadata such as the total number of matching records, the number of records skipped, and the limit applied.
+    - `header`: Contains metadata such as the total number of matching records, the number of records skipped, the limit applied, and the cursor for the next page.
     - `results`: A list of schools matching the search criteria along with location information
 
     Example Input:
@@ -327,32 +344,108 @@ def get_school_by_zip(
 
     if zipcode is None:
         raise HTTPException(status_code=400, detail="State code is required.")
-    query = (
-        db.query(models.School)
-        .join(models.Location)
-        .filter(models.Location.zipcode.ilike(f"%{zipcode.lower()}%"))
-        .options(joinedload(models.School.locations))
+    dataset = memory.active_dataset(str(db.bind.url))
+    if dataset is not None:
+        return search_in_memory(dataset, page, dataset.zipcode(zipcode))
+    return await search_by_location(
+        db,
+        page,
+        prefix_match(models.Location.zipcode, zipcode),
+        ("zipcode", zipcode.lower()),
     )
 
-    total = query.count()
-    schools = query.offset(skip).limit(limit).all()
-
-    results = []
-    for school in schools:
-        location_data = next(iter(school.locations or []), None)
-        location = None
-        if location_data:
-            location = LocationBase(
-                city=location_data.city,
-                state=location_data.state,
-                zipcode=location_data.zipcode,
-                region=location_data.region,
-                locale=location_data.locale,
-            )
-        school_data = SchoolBase(
-            unitid=school.unitid, name=school.name, url=school.url, location=location
-        )
-        results.append(school_data)
 
-    header = Header(total=total, skip=skip, limit=limit)
-    return SchoolSearchResponse(header=header, results=results)
+@router.get(
+    "/nearby/",
+    status_code=status.HTTP_200_OK,
+    response_model=NearbySchoolResponse,
+)
+@limiter.limit(limiter.tier_limit)
+@conditional_response
+@cached_response
+async def get_schools_nearby(
+    request: Request,
+    lat: float = Query(..., ge=-90, le=90, description="Latitude of the centre."),
+    lon: float = Query(..., ge=-180, le=180, description="Longitude of the centre."),
+    radius_km: float = Query(
+        25, gt=0, le=500, description="Search radius in kilometres."
+    ),
+    page: Pagination = Depends(),
+    db: AsyncSession = Depends(get_db),
+) -> NearbySchoolResponse:
+    """
+    Retrieves the schools within a radius of a point, nearest first, with support for pagination.
+    This endpoint is rate-limited to 5 requests per minute per user, or the limit of the caller's API key tier, to ensure fair usage.
+
+    Only the locations inside the circle's bounding box are read, through a spatial index,
+    and their exact great-circle distances are computed from there.
+    Use the `skip` and `limit` query parameters, or `cursor` for deep pages, to navigate through the results for large data sets.
+
+    Args:
+    - lat (float): Latitude of the centre, in degrees.
+    - lon (float): Longitude of the centre, in degrees.
+    - radius_km (float): The search radius in kilometres, up to 500. Defaults to 25.
+    - skip (int): The number of records to skip before starting to collect the response set. Defaults to 0.
+    - limit (int): The maximum number of records to return. Defaults to 100 but can be adjusted as needed.
+    - cursor (str, optional): The `next_cursor` from the previous page's header.
+    - include_total (bool): Whether to report the number of schools in the radius. Defaults to true.
+
+    Returns:
+    NearbySchoolResponse: A JSON object with two main components:
+    - `header`: Contains metadata such as the total number of matching records, the number of records skipped, the limit applied, and the cursor for the next page.
+    - `results`: The schools in the radius with location information and their `distance_km`, nearest first.
+
+    Example Input:
+    GET /v1/schools/nearby/?lat=44.48&lon=-73.21&radius_km=50
+
+    Note:
+    - Exceeding the rate limit will result in a 429 status code.
+    - Schools without coordinates are never returned.
+    """
+    dataset = memory.active_dataset(str(db.bind.url))
+    if dataset is not None:
+        candidates = dataset.near(lat, radius_km)
+    else:
+        connection = await db.connection()
+        indexed = await connection.run_sync(spatial.has_spatial_index)
+        candidates = await db.execute(
+            spatial.candidates_query(lat, lon, radius_km, indexed)
+        )
+    # Rounded before sorting so that the cursor holds exactly the values compared.
+    hits = sorted(
+        {
+            (round(spatial.haversine_km(lat, lon, school_lat, school_lon), 3), unitid)
+            for unitid, school_lat, school_lon in candidates
+        }
+    )
+    hits = [hit for hit in hits if hit[0] <= radius_km]
+    total = len(hits)
+
+    if page.cursor is not None:
+        after = tuple(decode_cursor(page.cursor, 2))
+        hits = [hit for hit in hits if hit > after]
+    else:
+        hits = hits[page.skip :]
+    more = len(hits) > page.limit
+    hits = hits[: page.limit]
+
+    header = Header(
+        total=total if page.include_total else None,
+        total_mode="exact" if page.include_total else "none",
+        skip=page.skip,
+        limit=page.limit,
+        next_cursor=encode_cursor(hits[-1]) if more else None,
+    )
+    unitids = [unitid for _, unitid in hits]
+    if dataset is not None:
+        fragments = dataset_fragments(dataset, unitids, shape="location")
+    else:
+        fragments = await school_fragments(db, unitids, shape="location")
+    body = render_search_response(
+        header,
+        [
+            with_distance(fragment, distance)
+            for (distance, _), fragment in zip(hits, fragments)
+        ],
+    )
+    return Response(content=body, media_type="application/json")
@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Response
+from app.metrics import render_metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics() -> Response:
+    """
+    Exposes request latency, database time, SQL statement counts and serialization
+    time per route, in the Prometheus text format.
+    """
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
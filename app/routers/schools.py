@@ -0,0 +1,109 @@
+from fastapi import APIRouter, status, Depends, Request, Query, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.cache.http import conditional_response
+from app.config import settings
+from app.db import memory
+from app.dependencies.dependencies import limiter, get_db
+from app.dependencies.pagination import MAX_INTEGER
+from app.schemas.schemas import SchoolBatchRequest, SchoolBatchResponse
+from app.schemas.serialization import (
+    dataset_fragments,
+    render_batch_response,
+    school_fragments,
+)
+
+router = APIRouter(prefix="/v1/schools", tags=["schools"])
+
+
+def parse_ids(ids: str) -> list[int]:
+    """
+    Parses a comma-separated list of unitids.
+
+    Raises:
+    HTTPException: 400 if an id is not an integer.
+    """
+    try:
+        return [int(unitid) for unitid in ids.split(",") if unitid.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail="ids must be comma-separated integers."
+        )
+
+
+async def load_batch(db: AsyncSession, unitids: list[int]) -> Response:
+    """Returns every school in ``unitids`` with all of its related records."""
+    unitids = list(dict.fromkeys(unitids))
+    if not unitids:
+        raise HTTPException(status_code=400, detail="At least one id is required.")
+    if len(unitids) > settings.batch_max_ids:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.batch_max_ids} ids can be requested at once.",
+        )
+    if any(abs(unitid) > MAX_INTEGER for unitid in unitids):
+        raise HTTPException(status_code=400, detail="ids must fit in 64 bits.")
+
+    dataset = memory.active_dataset(str(db.bind.url))
+    if dataset is not None:
+        fragments = dataset_fragments(dataset, unitids, shape="detail")
+    else:
+        fragments = await school_fragments(db, unitids, shape="detail")
+    missing = [unitid for unitid, fragment in zip(unitids, fragments) if not fragment]
+    body = render_batch_response(
+        [fragment for fragment in fragments if fragment], missing
+    )
+    return Response(content=body, media_type="application/json")
+
+
+@router.get(
+    "/batch", status_code=status.HTTP_200_OK, response_model=SchoolBatchResponse
+)
+@limiter.limit(limiter.tier_limit)
+@conditional_response
+async def get_schools_batch(
+    request: Request,
+    ids: str = Query(..., description="Comma-separated unitids, e.g. `100654,100663`."),
+    db: AsyncSession = Depends(get_db),
+) -> SchoolBatchResponse:
+    """
+    Retrieves several schools by unitid, each with its location, control record,
+    finances and admissions.
+    This endpoint is rate-limited to 5 requests per minute per user, or the limit of the caller's API key tier, to ensure fair usage.
+
+    All schools and their related records are loaded in a constant number of queries,
+    however many ids are requested. Use `POST /v1/schools/batch` for lists too long for
+    a URL.
+
+    Args:
+    - ids (str): Comma-separated unitids, at most `batch_max_ids` (200 by default). Duplicates are ignored.
+
+    Returns:
+    SchoolBatchResponse: A JSON object with two main components:
+    - `results`: The schools found, in the order they were requested.
+    - `missing`: The requested ids that match no school.
+
+    Example Input:
+    GET /v1/schools/batch?ids=100654,100663
+
+    Note:
+    - Exceeding the rate limit will result in a 429 status code.
+    - Asking for no ids, too many, or ids beyond the 64-bit range results in a 400 status code.
+    """
+    return await load_batch(db, parse_ids(ids))
+
+
+@router.post(
+    "/batch", status_code=status.HTTP_200_OK, response_model=SchoolBatchResponse
+)
+@limiter.limit(limiter.tier_limit)
+async def post_schools_batch(
+    request: Request,
+    batch: SchoolBatchRequest,
+    db: AsyncSession = Depends(get_db),
+) -> SchoolBatchResponse:
+    """
+    Retrieves several schools by unitid, like `GET /v1/schools/batch`, with the ids
+    sent as a JSON body: `{"ids": [100654, 100663]}`.
+    This endpoint is rate-limited to 5 requests per minute per user, or the limit of the caller's API key tier, to ensure fair usage.
+    """
+    return await load_batch(db, batch.ids)
@@ -0,0 +1,246 @@
+from datetime import date
+from typing import Literal
+from fastapi import APIRouter, status, Depends, Request, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.cache.http import conditional_response
+from app.cache.responses import cached_response
+from app.db.filters import distinct_values, prefix_match, substring_match
+from app.db.models import Admission, Control, Finance, Location, School
+from app.dependencies.dependencies import limiter, get_db
+from app.dependencies.pagination import Pagination, paginate
+from app.schemas.schemas import SchoolSearchResponse
+from app.schemas.serialization import render_search_response, school_fragments
+
+router = APIRouter(prefix="/v1/schools", tags=["search"])
+
+SortField = Literal["unitid", "admission_rate", "avg_net_price"]
+
+# The column each sort orders by; each leads a (year, column, school_unitid) index.
+SORT_COLUMNS = {
+    "admission_rate": Admission.admission_rate,
+    "avg_net_price": Finance.avg_net_price,
+}
+
+
+class SchoolFilters:
+    """Query parameters of `/v1/schools/search`. Every filter given must match."""
+
+    def __init__(
+        self,
+        state: str | None = Query(
+            None, description="Comma-separated state codes, e.g. `VT,NH`."
+        ),
+        region: str | None = Query(None, description="Part of the region name."),
+        locale: str | None = Query(None, description="Part of the locale name."),
+        zipcode: str | None = Query(None, description="A zipcode or zipcode prefix."),
+        control: str | None = Query(
+            None, description="Part of the ownership, e.g. `public` or `nonprofit`."
+        ),
+        hbcu: bool | None = Query(None),
+        highest_degree: str | None = Query(
+            None, description="Part of the highest degree awarded, e.g. `graduate`."
+        ),
+        min_admission_rate: float | None = Query(None, ge=0, le=1),
+        max_admission_rate: float | None = Query(None, ge=0, le=1),
+        min_sat: float | None = Query(
+            None, description="Lowest average SAT score of admitted students."
+        ),
+        max_sat: float | None = Query(None),
+        min_net_price: float | None = Query(None, ge=0),
+        max_net_price: float | None = Query(None, ge=0),
+        max_cost: float | None = Query(
+            None, ge=0, description="Highest cost of attendance."
+        ),
+        year: int | None = Query(
+            None,
+            ge=1,
+            le=9999,
+            description="The year admission and finance filters apply to. Defaults to the latest loaded.",
+        ),
+        sort: SortField = Query(
+            "unitid",
+            description="`unitid`, or the lowest `admission_rate` or `avg_net_price` first.",
+        ),
+    ):
+        self.state = state
+        self.region = region
+        self.locale = locale
+        self.zipcode = zipcode
+        self.control = control
+        self.hbcu = hbcu
+        self.highest_degree = highest_degree
+        self.min_admission_rate = min_admission_rate
+        self.max_admission_rate = max_admission_rate
+        self.min_sat = min_sat
+        self.max_sat = max_sat
+        self.min_net_price = min_net_price
+        self.max_net_price = max_net_price
+        self.max_cost = max_cost
+        self.year = year
+        self.sort = sort
+
+
+def _between(column, low, high) -> list:
+    conditions = []
+    if low is not None:
+        conditions.append(column >= low)
+    if high is not None:
+        conditions.append(column <= high)
+    return conditions
+
+
+async def _year(db: AsyncSession, filters: SchoolFilters, column):
+    """Returns the year per-year filters on ``column``'s table apply to, as a date."""
+    if filters.year is not None:
+        return date(filters.year, 1, 1)
+    years = await distinct_values(db, column)
+    return max(years) if years else None
+
+
+async def filter_conditions(db: AsyncSession, filters: SchoolFilters) -> dict:
+    """
+    Translates ``filters`` into the conditions each table must meet, keyed on model.
+    Tables without a filter are left out.
+    """
+    location = []
+    if filters.state:
+        location.append(
+            Location.state.in_(
+                [code.strip().upper() for code in filters.state.split(",")]
+            )
+        )
+    if filters.region:
+        location.append(await substring_match(db, Location.region, filters.region))
+    if filters.locale:
+        location.append(await substring_match(db, Location.locale, filters.locale))
+    if filters.zipcode:
+        location.append(prefix_match(Location.zipcode, filters.zipcode))
+
+    control = []
+    if filters.control:
+        control.append(await substring_match(db, Control.control, filters.control))
+    if filters.hbcu is not None:
+        control.append(Control.hbcu.is_(filters.hbcu))
+    if filters.highest_degree:
+        control.append(
+            await substring_match(db, Control.highest_deg, filters.highest_degree)
+        )
+
+    admission = [
+        *_between(
+            Admission.admission_rate,
+            filters.min_admission_rate,
+            filters.max_admission_rate,
+        ),
+        *_between(Admission.avg_sat_score_admitted, filters.min_sat, filters.max_sat),
+    ]
+    finance = [
+        *_between(Finance.avg_net_price, filters.min_net_price, filters.max_net_price),
+        *_between(Finance.cost_attendance, None, filters.max_cost),
+    ]
+
+    conditions = {Location: location, Control: control}
+    sort_column = SORT_COLUMNS.get(filters.sort)
+    for model, model_conditions in ((Admission, admission), (Finance, finance)):
+        sorted_on = sort_column is not None and sort_column.class_ is model
+        if model_conditions or sorted_on:
+            year = await _year(db, filters, model.year)
+            conditions[model] = [model.year == year, *model_conditions]
+    return {model: where for model, where in conditions.items() if where}
+
+
+async def build_search_query(db: AsyncSession, filters: SchoolFilters):
+    """
+    Builds one query for the schools matching every filter.
+
+    The query is driven by the table the results are sorted on: ``schools`` in unitid
+    order, or the admission or finance rows of the selected year in the order of the
+    ``(year, column, school_unitid)`` index, which then also serves the range filter
+    on that column and keyset paging. Every other filtered table becomes a semi-join
+    (``school_unitid IN (...)``) answered from its own covering index.
+
+    Returns:
+    tuple: The query, selecting school ids, and its sort keys.
+    """
+    conditions = await filter_conditions(db, filters)
+    sort_column = SORT_COLUMNS.get(filters.sort)
+    if sort_column is None:
+        query = select(School.unitid)
+        unitid = School.unitid
+        sort_keys = [School.unitid]
+    else:
+        driver = sort_column.class_
+        query = select(driver.school_unitid).where(
+            *conditions.pop(driver), sort_column.is_not(None)
+        )
+        unitid = driver.school_unitid
+        sort_keys = [sort_column, driver.school_unitid]
+
+    for model, where in conditions.items():
+        query = query.where(unitid.in_(select(model.school_unitid).where(*where)))
+    return query, sort_keys
+
+
+@router.get(
+    "/search/", status_code=status.HTTP_200_OK, response_model=SchoolSearchResponse
+)
+@limiter.limit(limiter.tier_limit)
+@conditional_response
+@cached_response
+async def search_schools(
+    request: Request,
+    filters: SchoolFilters = Depends(),
+    page: Pagination = Depends(),
+    db: AsyncSession = Depends(get_db),
+) -> SchoolSearchResponse:
+    """
+    Retrieves the schools matching any combination of location, control, admission and
+    finance filters, with support for pagination.
+    This endpoint is rate-limited to 5 requests per minute per user, or the limit of the caller's API key tier, to ensure fair usage.
+
+    All filters are combined into a single query, so one request replaces intersecting the
+    results of `/state/`, `/region/` and `/locale/` client-side. Admission and finance
+    filters apply to one year, the latest loaded unless `year` is given, and exclude
+    schools with no data for it. Results include each school's location, control record,
+    finances and admissions.
+    Use the `skip` and `limit` query parameters, or `cursor` for deep pages, to navigate through the results for large data sets.
+
+    Args:
+    - state (str, optional): Comma-separated state codes, matched exactly ignoring case.
+    - region, locale (str, optional): Part of the region or locale name, ignoring case.
+    - zipcode (str, optional): A full zipcode or a zipcode prefix.
+    - control (str, optional): Part of the ownership: `public`, `private nonprofit` or `private for-profit`.
+    - hbcu (bool, optional): Only historically black colleges and universities, or only others.
+    - highest_degree (str, optional): Part of the highest degree awarded, e.g. `graduate`.
+    - min_admission_rate, max_admission_rate (float, optional): Admission rate bounds, between 0 and 1.
+    - min_sat, max_sat (float, optional): Bounds on the average SAT score of admitted students.
+    - min_net_price, max_net_price (float, optional): Bounds on the average net price.
+    - max_cost (float, optional): The highest cost of attendance.
+    - year (int, optional): The year admission and finance filters apply to.
+    - sort (str): `unitid` (default), or `admission_rate` or `avg_net_price`, lowest first. Sorting on a column leaves out schools without a value for it.
+    - skip (int): The number of records to skip before starting to collect the response set. Defaults to 0.
+    - limit (int): The maximum number of records to return. Defaults to 100 but can be adjusted as needed.
+    - cursor (str, optional): The `next_cursor` from the previous page's header. Faster than `skip` for deep pages.
+    - include_total (bool): Whether to count all matching records. Defaults to true.
+    - count_mode (str): `exact`, `cached` or `estimate`; see `header.total_mode` for the strategy used. Defaults to `cached`.
+
+    Returns:
+    SchoolSearchResponse: A JSON object with two main components:
+    - `header`: Contains metadata such as the total number of matching records, the number of records skipped, the limit applied, and the cursor for the next page.
+    - `results`: The matching schools with all of their related records.
+
+    Example Input:
+    GET /v1/schools/search/?control=public&region=southeast&locale=suburb&max_admission_rate=0.3&max_net_price=20000
+
+    Note:
+    - Exceeding the rate limit will result in a 429 status code.
+    - An empty `results` list indicates no schools were found matching the criteria.
+    """
+    query, sort_keys = await build_search_query(db, filters)
+    count_key = ("search", tuple(sorted(filters.__dict__.items())))
+    unitids, header = await paginate(db, query, page, sort_keys, count_key)
+    body = render_search_response(
+        header, await school_fragments(db, unitids, shape="detail")
+    )
+    return Response(content=body, media_type="application/json")
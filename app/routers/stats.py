@@ -0,0 +1,92 @@
+from typing import Literal
+from datetime import date
+from fastapi import APIRouter, status, Depends, Request, Query, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.cache.http import conditional_response
+from app.cache.responses import cached_response
+from app.db.models import SchoolStat
+from app.dependencies.dependencies import limiter, get_db
+from app.schemas.schemas import StatBase, StatsResponse
+
+router = APIRouter(prefix="/v1/stats", tags=["stats"])
+
+# Kept in step with app.etl.summaries, which builds the rows.
+Dimension = Literal["state", "region", "locale", "control"]
+Metric = Literal[
+    "avg_net_price",
+    "cost_attendance",
+    "in_state_tuition",
+    "out_state_tuition",
+    "admission_rate",
+    "avg_sat_score_admitted",
+]
+
+
+@router.get(
+    "/{dimension}/", status_code=status.HTTP_200_OK, response_model=StatsResponse
+)
+@limiter.limit(limiter.tier_limit)
+@conditional_response
+@cached_response
+async def get_stats(
+    request: Request,
+    dimension: Dimension,
+    metric: Metric = Query("avg_net_price", description="The metric to summarize."),
+    year: int | None = Query(
+        None,
+        ge=1,
+        le=9999,
+        description="The year to summarize. Defaults to the latest available.",
+    ),
+    value: str | None = Query(
+        None, description="Only this group, e.g. `VT` for `/v1/stats/state/`."
+    ),
+    db: AsyncSession = Depends(get_db),
+) -> StatsResponse:
+    """
+    Retrieves the distribution of a finance or admission metric over the schools in each
+    state, region, locale or type of control.
+    This endpoint is rate-limited to 5 requests per minute per user, or the limit of the caller's API key tier, to ensure fair usage.
+
+    The statistics are computed by the ETL when it loads new data, so requests only read
+    precomputed rows.
+
+    Args:
+    - dimension (str): `state`, `region`, `locale` or `control`.
+    - metric (str): `avg_net_price` (default), `cost_attendance`, `in_state_tuition`, `out_state_tuition`, `admission_rate` or `avg_sat_score_admitted`.
+    - year (int, optional): The year to summarize. Defaults to the latest year with data.
+    - value (str, optional): Restricts the results to one group, ignoring case.
+
+    Returns:
+    StatsResponse: The dimension, metric and year, and for each group (`value`) the number of schools reporting the metric with its mean, minimum, 10th, 25th, 50th (`median`), 75th and 90th percentiles and maximum.
+
+    Example Input:
+    GET /v1/stats/state/?metric=admission_rate&year=2022
+
+    Note:
+    - Exceeding the rate limit will result in a 429 status code.
+    - `year` is null and `results` empty when no statistics have been computed.
+    """
+    scope = (SchoolStat.dimension == dimension, SchoolStat.metric == metric)
+    stats_year = (
+        date(year, 1, 1)
+        if year is not None
+        else await db.scalar(select(func.max(SchoolStat.year)).where(*scope))
+    )
+    query = (
+        select(SchoolStat)
+        .where(*scope, SchoolStat.year == stats_year)
+        .order_by(SchoolStat.value)
+    )
+    if value is not None:
+        # Matched ignoring case, like every other filter and the response cache key.
+        query = query.where(func.lower(SchoolStat.value) == value.lower())
+    rows = await db.scalars(query)
+    body = StatsResponse(
+        dimension=dimension,
+        metric=metric,
+        year=stats_year,
+        results=[StatBase.model_validate(row) for row in rows],
+    ).model_dump_json()
+    return Response(content=body, media_type="application/json")
@@ -1,11 +1,14 @@
 from pydantic import BaseModel, HttpUrl, ConfigDict, validator
 from datetime import date
+from typing import Literal
 
 
 class Header(BaseModel):
-    total: int
+    total: int | None
+    total_mode: Literal["exact", "cached", "estimate", "lower_bound", "none"] = "exact"
     skip: int
     limit: int
+    next_cursor: str | None = None
 
 
 class LocationBase(BaseModel):
@@ -16,15 +19,17 @@ class LocationBase(BaseModel):
     state: str
     region: str | None = None
     locale: str | None = None
+    latitude: float | None = None
+    longitude: float | None = None
 
 
 class FinanceBase(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
     year: date
-    cost_attendance: float
+    cost_attendance: float | None = None
     avg_net_price: float | None = None
-    in_state_tuition: float
+    in_state_tuition: float | None = None
     out_state_tuition: float | None = None
     tuition_per_fte: float | None = None
     instructional_expenditure_per_fte: float | None = None
@@ -35,12 +40,12 @@ class ControlBase(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
     under_investigation: bool | None = None
-    predominant_deg: str
-    highest_deg: str
-    control: str
+    predominant_deg: str | None = None
+    highest_deg: str | None = None
+    control: str | None = None
     hbcu: bool | None = None
     religious_affiliation: str | None = None
-    carnegie_undergrad: str
+    carnegie_undergrad: str | None = None
     carnegie_size: str | None = None
 
 
@@ -48,7 +53,7 @@ class AdmissionBase(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
     year: date
-    admission_rate: float
+    admission_rate: float | None = None
     number_of_students: int | None = None
     sat_math_median: float | None = None
     sat_reading_median: float | None = None
@@ -56,7 +61,7 @@ class AdmissionBase(BaseModel):
     act_math_median: float | None = None
     act_english_median: float | None = None
     act_writing_median: float | None = None
-    act_cumulative_median: float
+    act_cumulative_median: float | None = None
     avg_sat_score_admitted: float | None = None
 
 
@@ -81,3 +86,43 @@ class SchoolBase(BaseModel):
 class SchoolSearchResponse(BaseModel):
     header: Header
     results: list[SchoolBase]
+
+
+class NearbySchool(SchoolBase):
+    distance_km: float
+
+
+class NearbySchoolResponse(BaseModel):
+    header: Header
+    results: list[NearbySchool]
+
+
+class SchoolBatchRequest(BaseModel):
+    ids: list[int]
+
+
+class SchoolBatchResponse(BaseModel):
+    results: list[SchoolBase]
+    missing: list[int]
+
+
+class StatBase(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    value: str
+    count: int
+    mean: float | None = None
+    min: float | None = None
+    p10: float | None = None
+    p25: float | None = None
+    median: float | None = None
+    p75: float | None = None
+    p90: float | None = None
+    max: float | None = None
+
+
+class StatsResponse(BaseModel):
+    dimension: str
+    metric: str
+    year: date | None
+    results: list[StatBase]
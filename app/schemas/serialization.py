@@ -0,0 +1,184 @@
+import json
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.cache.lru import LRUCache
+from app.config import settings
+from app.db import models
+from app.db.loading import ResponseShape
+from app.db.versioning import changed_since, current_data_version
+from app.metrics import measure_serialization
+from .schemas import (
+    AdmissionBase,
+    ControlBase,
+    FinanceBase,
+    Header,
+    LocationBase,
+    SchoolBase,
+)
+
+
+def school_with_location(school: models.School) -> SchoolBase:
+    """Builds the response model for a school together with its first location."""
+    location_data = next(iter(school.locations or []), None)
+    location = None
+    if location_data:
+        location = LocationBase(
+            city=location_data.city,
+            state=location_data.state,
+            zipcode=location_data.zipcode,
+            region=location_data.region,
+            locale=location_data.locale,
+            latitude=location_data.latitude,
+            longitude=location_data.longitude,
+        )
+    return SchoolBase(
+        unitid=school.unitid, name=school.name, url=school.url, location=location
+    )
+
+
+def school_detail(school: models.School) -> SchoolBase:
+    """Builds the response model for a school with all of its related records."""
+    return school_with_location(school).model_copy(
+        update={
+            "finances": [FinanceBase.model_validate(row) for row in school.finances],
+            "admissions": [
+                AdmissionBase.model_validate(row) for row in school.admissions
+            ],
+            "control": (
+                ControlBase.model_validate(school.controls[0])
+                if school.controls
+                else None
+            ),
+        }
+    )
+
+
+# The relationships each response shape includes and how it builds its response model.
+SHAPES = {
+    "summary": ResponseShape(
+        SchoolBase.model_validate,
+        includes=(models.School.finances, models.School.admissions),
+    ),
+    "location": ResponseShape(
+        school_with_location, includes=(models.School.locations,)
+    ),
+    "detail": ResponseShape(
+        school_detail,
+        includes=(
+            models.School.locations,
+            models.School.finances,
+            models.School.admissions,
+            models.School.controls,
+        ),
+    ),
+}
+
+# Serialized `SchoolBase` JSON keyed on (database, shape, unitid), stored together with
+# the dataset version it was rendered at. A new version only invalidates the schools
+# the ETL's change log lists as changed since then.
+_fragments = LRUCache(maxsize=settings.fragment_cache_size)
+
+
+async def school_fragments(
+    db: AsyncSession, unitids: list[int], shape: str
+) -> list[bytes]:
+    """
+    Returns the serialized JSON of each school in ``unitids``, in order, or None for
+    ids that match no school.
+
+    Each school is validated and serialized once and then reused by every page it
+    appears on, until the ETL changes it. Schools not yet cached are loaded together,
+    with the relationships their shape includes, in a number of queries that does not
+    depend on how many there are.
+    """
+    url = str(db.bind.url)
+    version = await current_data_version(db)
+    fragments = {}
+    for unitid in unitids:
+        cached = _fragments.get((url, shape, unitid))
+        fragments[unitid] = None
+        if cached is None:
+            continue
+        rendered_at, fragment = cached
+        if rendered_at != version:
+            changed = await changed_since(db, rendered_at, version)
+            if changed is None or unitid in changed:
+                continue
+            _fragments.set((url, shape, unitid), (version, fragment))
+        fragments[unitid] = fragment
+
+    missing = [unitid for unitid, fragment in fragments.items() if fragment is None]
+    if missing:
+        response_shape = SHAPES[shape]
+        schools = await db.scalars(
+            select(models.School)
+            .where(models.School.unitid.in_(missing))
+            .options(*response_shape.options(settings.loader_strategy))
+        )
+        for school in schools.unique():
+            with measure_serialization():
+                fragment = response_shape.build(school).model_dump_json().encode()
+            _fragments.set((url, shape, school.unitid), (version, fragment))
+            fragments[school.unitid] = fragment
+
+    return [fragments[unitid] for unitid in unitids]
+
+
+def dataset_fragments(dataset, unitids: list[int], shape: str) -> list[bytes]:
+    """
+    Returns the serialized JSON of each school in ``unitids`` from an in-memory
+    snapshot (`app.db.memory.Dataset`), or None for ids it does not have. Produces the
+    same bytes as `school_fragments`, rendering each school once per snapshot.
+    """
+    build = SHAPES[shape].build
+    fragments = []
+    for unitid in unitids:
+        fragment = dataset.fragments.get((shape, unitid))
+        school = dataset.schools.get(unitid) if fragment is None else None
+        if school is not None:
+            with measure_serialization():
+                fragment = build(school).model_dump_json().encode()
+            dataset.fragments[(shape, unitid)] = fragment
+        fragments.append(fragment)
+    return fragments
+
+
+def render_search_response(header: Header, fragments: list[bytes]) -> bytes:
+    """
+    Assembles a `SchoolSearchResponse` body from pre-serialized school fragments,
+    byte-for-byte what `SchoolSearchResponse.model_dump_json()` would produce.
+    """
+    with measure_serialization():
+        return b"".join(
+            (
+                b'{"header":',
+                header.model_dump_json().encode(),
+                b',"results":[',
+                b",".join(fragments),
+                b"]}",
+            )
+        )
+
+
+def render_batch_response(fragments: list[bytes], missing: list[int]) -> bytes:
+    """
+    Assembles a `SchoolBatchResponse` body from pre-serialized school fragments,
+    byte-for-byte what `SchoolBatchResponse.model_dump_json()` would produce.
+    """
+    with measure_serialization():
+        return b"".join(
+            (
+                b'{"results":[',
+                b",".join(fragments),
+                b'],"missing":',
+                json.dumps(missing, separators=(",", ":")).encode(),
+                b"}",
+            )
+        )
+
+
+def with_distance(fragment: bytes, distance_km: float) -> bytes:
+    """Appends a `distance_km` field to a serialized school, making it a `NearbySchool`."""
+    return b"".join(
+        (fragment[:-1], b',"distance_km":', json.dumps(distance_km).encode(), b"}")
+    )
@@ -0,0 +1,97 @@
+import asyncio
+from fastapi.testclient import TestClient
+from .cache import responses
+from .cache.backends import MemoryBackend, RedisBackend
+from .cache.lru import LRUCache
+from .main import app
+
+
+class FakeRedis:
+    """Local stand-in for the subset of the asyncio redis client used by RedisBackend."""
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.expiry[key] = ex
+
+    async def scan_iter(self, match):
+        prefix = match.rstrip("*")
+        for key in [key for key in self.data if key.startswith(prefix)]:
+            yield key
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+def test_lru_cache_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.cache.lru.time.monotonic", lambda: now[0])
+    cache = LRUCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    now[0] += 5
+    assert cache.get("a") == 1
+    now[0] += 6
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_redis_backend_is_shared_between_workers():
+    server = FakeRedis()
+    worker_a = RedisBackend(server, ttl=60, prefix="test")
+    worker_b = RedisBackend(server, ttl=60, prefix="test")
+
+    async def share():
+        assert await worker_a.get("key") is None
+        await worker_a.set("key", b"{}")
+        assert await worker_b.get("key") == b"{}"
+        assert server.expiry["test:key"] == 60
+        await worker_b.clear()
+
+    asyncio.run(share())
+    assert server.data == {}
+
+
+def test_memory_backend_stats():
+    backend = MemoryBackend(maxsize=1)
+
+    async def fill():
+        await backend.set("a", b"1")
+        await backend.set("b", b"2")
+        assert await backend.get("a") is None
+        assert await backend.get("b") == b"2"
+
+    asyncio.run(fill())
+    stats = backend.stats()
+    assert (stats["backend"], stats["hits"], stats["misses"], stats["size"]) == (
+        "memory",
+        1,
+        1,
+        1,
+    )
+
+
+def test_routes_store_serialized_json_in_backend(monkeypatch):
+    server = FakeRedis()
+    monkeypatch.setattr(responses, "response_cache", RedisBackend(server, prefix="t"))
+    client = TestClient(app)
+    first = client.get("/v1/schools/zipcode/?zipcode=98926")
+    [body] = server.data.values()
+    second = client.get("/v1/schools/zipcode/?zipcode=98926")
+    assert first.content == body == second.content
@@ -0,0 +1,36 @@
+import asyncio
+from sqlalchemy import text
+from .config import settings
+from .db import database
+
+
+def test_read_only_sqlite_uri():
+    uri = database.async_database_uri("sqlite:///./compass_db.db", read_only=True)
+    assert uri == "sqlite+aiosqlite:///file:./compass_db.db?mode=ro&uri=true"
+    assert database.async_database_uri("sqlite://", read_only=True) == (
+        "sqlite+aiosqlite://"
+    )
+
+
+def test_production_profile_pragmas(monkeypatch):
+    monkeypatch.setattr(settings, "sqlite_profile", "production")
+    monkeypatch.setattr(settings, "sqlite_cache_size_kib", 2048)
+
+    async def read_pragmas():
+        await database.async_engine.dispose()
+        async with database.async_engine.connect() as connection:
+            values = [
+                (await connection.exec_driver_sql(f"PRAGMA {name}")).scalar()
+                for name in ("cache_size", "temp_store", "query_only")
+            ]
+            try:
+                await connection.execute(text("CREATE TABLE not_allowed (id)"))
+                wrote = True
+            except Exception:
+                wrote = False
+        await database.async_engine.dispose()
+        return values, wrote
+
+    values, wrote = asyncio.run(read_pragmas())
+    assert values == [-2048, 2, 1]
+    assert not wrote
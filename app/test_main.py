@@ -1,9 +1,64 @@
+import asyncio
+import csv
+import io
+import json
+import inspect
+import shutil
+from types import SimpleNamespace
+import pyarrow
+import pyarrow.parquet
+import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, select, text
+from sqlalchemy.dialects.postgresql import asyncpg, psycopg2
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from .main import app
+from .db.database import engine
+from .config import settings
+from .db.loading import at_most_one
+from .db.models import Base, ChangeLog, School
+from .db import spatial
+from .db.search import create_search_index
+from .db.versioning import bump_data_version
+from .schemas.schemas import (
+    NearbySchoolResponse,
+    SchoolBatchResponse,
+    SchoolSearchResponse,
+)
+from .dependencies.dependencies import get_db
+from .dependencies.pagination import encode_cursor, explain_statement
+from .schemas import serialization
+from .routers.search import SchoolFilters, build_search_query
 
 client = TestClient(app)
 
 
+@pytest.fixture
+def indexed_db(tmp_path):
+    """Serves requests from a copy of the database with the name search index built."""
+    path = tmp_path / "compass_db.db"
+    shutil.copy(engine.url.database, path)
+    indexed_engine = create_engine(f"sqlite:///{path}")
+    with indexed_engine.begin() as connection:
+        create_search_index(connection)
+    serving_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{path}", poolclass=NullPool
+    )
+    TestingSession = async_sessionmaker(bind=serving_engine)
+
+    async def override_get_db():
+        async with TestingSession() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield indexed_engine
+    app.dependency_overrides.clear()
+    indexed_engine.dispose()
+
+
 def test_read_health_check():
     response = client.get("/")
     assert response.status_code == 200
@@ -18,6 +73,71 @@ def test_get_schools_by_name():
     assert any("Alabama" in school["name"] for school in data["results"])
 
 
+@pytest.mark.parametrize("school_name", ["%", "_", "\\"])
+def test_get_schools_by_name_escapes_wildcards(school_name):
+    response = client.get("/v1/schools/", params={"school_name": school_name})
+    assert response.status_code == 200
+    assert response.json()["header"]["total"] == 0
+
+
+def test_get_schools_by_name_prefix_tokens(indexed_db):
+    response = client.get("/v1/schools/?school_name=univ alab birm&skip=0&limit=10")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["header"]["total"] >= 1
+    assert data["results"][0]["name"] == "University of Alabama at Birmingham"
+
+
+def test_get_schools_by_name_index_tracks_inserts(indexed_db):
+    with indexed_db.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO schools (unitid, name, url) VALUES (999999, 'Zyzzyva College', NULL)"
+        )
+    response = client.get("/v1/schools/?school_name=zyzz&skip=0&limit=10")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["header"]["total"] == 1
+    assert data["results"][0]["unitid"] == 999999
+
+
+def test_existing_indexes_are_not_rebuilt(indexed_db, tmp_path):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(indexed_db, "before_cursor_execute", record)
+    with indexed_db.begin() as connection:
+        create_search_index(connection)
+        spatial.create_spatial_index(connection)
+    event.remove(indexed_db, "before_cursor_execute", record)
+    assert not [s for s in statements if "rebuild" in s or s.startswith("DELETE")]
+
+    # A database without them has them built from its rows.
+    fresh = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    Base.metadata.create_all(fresh)
+    with fresh.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO schools (unitid, name) VALUES (1, 'Zyzzyva College')"
+        )
+        create_search_index(connection)
+        matches = connection.exec_driver_sql(
+            "SELECT rowid FROM schools_fts WHERE schools_fts MATCH 'zyzz*'"
+        )
+        assert matches.scalars().all() == [1]
+    fresh.dispose()
+
+
+def test_get_schools_by_name_cursor_follows_ranking(indexed_db):
+    first = client.get("/v1/schools/?school_name=univ&limit=3").json()
+    cursor = first["header"]["next_cursor"]
+    assert cursor is not None
+    second = client.get(f"/v1/schools/?school_name=univ&limit=3&cursor={cursor}")
+    skipped = client.get("/v1/schools/?school_name=univ&limit=3&skip=3")
+    assert second.status_code == 200
+    assert second.json()["results"] == skipped.json()["results"]
+
+
 def test_get_school_by_state():
     response = client.get("/v1/schools/state/?state_code=CA&skip=0&limit=10")
     assert response.status_code == 200
@@ -76,3 +196,579 @@ def test_get_school_by_zipcode():
         for school in data["results"]
         if school["location"] is not None
     )
+
+
+def test_cursor_pagination_matches_skip():
+    first = client.get("/v1/schools/state/?state_code=CA&limit=5").json()
+    cursor = first["header"]["next_cursor"]
+    second = client.get(f"/v1/schools/state/?state_code=CA&limit=5&cursor={cursor}")
+    skipped = client.get("/v1/schools/state/?state_code=CA&limit=5&skip=5")
+    assert second.status_code == 200
+    unitids = [school["unitid"] for school in second.json()["results"]]
+    assert unitids == [school["unitid"] for school in skipped.json()["results"]]
+    assert min(unitids) > max(school["unitid"] for school in first["results"])
+
+
+def test_last_page_has_no_cursor():
+    response = client.get("/v1/schools/zipcode/?zipcode=98926&limit=1000")
+    assert response.status_code == 200
+    assert response.json()["header"]["next_cursor"] is None
+
+
+@pytest.mark.parametrize(
+    "values", [None, [], [1, 2], [{"a": 1}], [[1]], ["1"], [None], [True], [2**63]]
+)
+def test_invalid_cursor(values):
+    cursor = "not-a-cursor" if values is None else encode_cursor(values)
+    response = client.get(f"/v1/schools/state/?state_code=VT&cursor={cursor}")
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor."
+
+
+def test_total_is_cached_per_filter():
+    params = "state_code=WA&limit=1"
+    exact = client.get(f"/v1/schools/state/?{params}&count_mode=exact").json()
+    cached = client.get(f"/v1/schools/state/?{params}").json()
+    assert exact["header"]["total_mode"] == "exact"
+    assert cached["header"]["total_mode"] == "cached"
+    assert cached["header"]["total"] == exact["header"]["total"]
+
+
+def test_total_opt_out():
+    response = client.get("/v1/schools/locale/?locale=Rural&include_total=false")
+    assert response.status_code == 200
+    header = response.json()["header"]
+    assert header["total"] is None
+    assert header["total_mode"] == "none"
+
+
+def test_total_estimate_is_lower_bound():
+    response = client.get(
+        "/v1/schools/region/?region=Plains&limit=10&skip=20&count_mode=estimate"
+    )
+    header = response.json()["header"]
+    # SQLite has no planner estimate to offer.
+    assert header["total_mode"] in ("lower_bound", "cached")
+    assert header["total"] >= 31
+
+
+@pytest.mark.parametrize(
+    "dialect, params",
+    [(asyncpg.dialect(), tuple), (psycopg2.dialect(), dict)],
+)
+def test_explain_binds_parameters_for_the_driver(dialect, params):
+    query = select(School.unitid).where(
+        School.name == "x", School.unitid.in_([1, 2, 3])
+    )
+    statement, bound = explain_statement(query, dialect)
+    assert statement.startswith("EXPLAIN (FORMAT JSON) SELECT")
+    assert isinstance(bound, params) and len(bound) == 4
+    if params is tuple:
+        assert "$4" in statement and "%(" not in statement
+    else:
+        assert all(f"%({name})s" in statement for name in bound)
+
+
+def test_cached_total_invalidated_by_data_version(indexed_db, monkeypatch):
+    monkeypatch.setattr(settings, "data_version_poll_seconds", 0)
+    before = client.get("/v1/schools/?school_name=zyzz").json()["header"]
+    Base.metadata.create_all(indexed_db)
+    TestingSession = sessionmaker(bind=indexed_db)
+    with TestingSession() as session:
+        session.execute(
+            text(
+                "INSERT INTO schools (unitid, name) VALUES (999999, 'Zyzzyva College')"
+            )
+        )
+        bump_data_version(session)
+        session.commit()
+    after = client.get("/v1/schools/?school_name=zyzz").json()["header"]
+    assert (before["total"], after["total"]) == (0, 1)
+    assert after["total_mode"] == "exact"
+
+
+def test_data_version_only_invalidates_changed_schools(indexed_db, monkeypatch):
+    monkeypatch.setattr(settings, "data_version_poll_seconds", 0)
+    Base.metadata.create_all(indexed_db)
+    url = "/v1/schools/state/?state_code=VT&limit=2"
+    before = [school["name"] for school in client.get(url).json()["results"]]
+    unitids = [school["unitid"] for school in client.get(url).json()["results"]]
+
+    TestingSession = sessionmaker(bind=indexed_db)
+    with TestingSession() as session:
+        for unitid in unitids:
+            session.execute(
+                text("UPDATE schools SET name = 'Renamed' WHERE unitid = :unitid"),
+                {"unitid": unitid},
+            )
+        # Only the first school is logged as changed, so only it is re-rendered.
+        session.add(
+            ChangeLog(
+                version=bump_data_version(session),
+                school_unitid=unitids[0],
+                scope="schools",
+                change="updated",
+            )
+        )
+        session.commit()
+
+    after = [school["name"] for school in client.get(url).json()["results"]]
+    assert after == ["Renamed", before[1]]
+
+
+def test_repeated_request_served_from_response_cache():
+    before = client.get("/v1/cache/stats").json()
+    first = client.get("/v1/schools/state/?state_code=OR&limit=3")
+    second = client.get("/v1/schools/state/?state_code=or&limit=3")
+    after = client.get("/v1/cache/stats").json()
+    assert first.json() == second.json()
+    assert after["hits"] == before["hits"] + 1
+    assert after["misses"] == before["misses"] + 1
+
+
+def test_serialized_page_matches_response_model():
+    response = client.get("/v1/schools/region/?region=Far West&limit=200")
+    assert response.headers["content-type"] == "application/json"
+    model = SchoolSearchResponse.model_validate_json(response.content)
+    assert model.model_dump_json().encode() == response.content
+    assert len(model.results) == 200
+
+
+def test_get_school_by_state_is_case_insensitive():
+    upper = client.get("/v1/schools/state/?state_code=NV&limit=5").json()
+    lower = client.get("/v1/schools/state/?state_code=nv&limit=5").json()
+    assert upper["results"] == lower["results"]
+    assert all(school["location"]["state"] == "NV" for school in upper["results"])
+
+
+def test_get_school_by_zipcode_prefix():
+    response = client.get("/v1/schools/zipcode/?zipcode=989&limit=100")
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert any(school["location"]["zipcode"] == "98926" for school in results)
+    assert all(school["location"]["zipcode"].startswith("989") for school in results)
+
+
+@pytest.fixture
+def count_queries():
+    """Counts the statements every engine executes while the test runs."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(Engine, "before_cursor_execute", record)
+
+
+def test_batch_returns_schools_in_requested_order(indexed_db):
+    with indexed_db.begin() as connection:
+        unitids = list(
+            connection.scalars(
+                text("SELECT unitid FROM schools ORDER BY unitid LIMIT 3")
+            )
+        )
+        connection.execute(
+            text(
+                "INSERT INTO finance (school_unitid, year, avg_net_price) "
+                "VALUES (:unitid, '2022-01-01', 15000.0)"
+            ),
+            {"unitid": unitids[1]},
+        )
+        connection.execute(
+            text(
+                "INSERT INTO control (school_unitid, control) VALUES (:unitid, 'Public')"
+            ),
+            {"unitid": unitids[1]},
+        )
+
+    ids = [unitids[1], 1, unitids[0], unitids[1]]
+    data = client.get(f"/v1/schools/batch?ids={','.join(map(str, ids))}").json()
+    assert [school["unitid"] for school in data["results"]] == [unitids[1], unitids[0]]
+    assert data["missing"] == [1]
+    school = data["results"][0]
+    assert school["location"]["state"]
+    assert school["control"]["control"] == "Public"
+    assert school["finances"][0]["avg_net_price"] == 15000.0
+    assert school["admissions"] == []
+    assert SchoolBatchResponse(**data).model_dump(mode="json") == data
+
+    posted = client.post("/v1/schools/batch", json={"ids": ids}).json()
+    assert posted == data
+
+
+def test_batch_loads_in_constant_queries(indexed_db, count_queries):
+    with indexed_db.connect() as connection:
+        unitids = list(
+            connection.scalars(
+                text("SELECT unitid FROM schools ORDER BY unitid DESC LIMIT 60")
+            )
+        )
+    client.get(f"/v1/schools/batch?ids={unitids[0]}")
+    count_queries.clear()
+    client.get(f"/v1/schools/batch?ids={unitids[1]}")
+    few = len(count_queries)
+    # The schools joined to their location and control, then one query per collection.
+    assert few >= 3
+    count_queries.clear()
+    client.post("/v1/schools/batch", json={"ids": unitids[2:]})
+    assert len(count_queries) == few
+
+
+def test_batch_rejects_bad_requests():
+    assert client.get("/v1/schools/batch?ids=1,x").status_code == 400
+    assert client.get("/v1/schools/batch?ids=").status_code == 400
+    too_many = list(range(settings.batch_max_ids + 1))
+    assert client.post("/v1/schools/batch", json={"ids": too_many}).status_code == 400
+    assert client.get(f"/v1/schools/batch?ids=1,{2**63}").status_code == 400
+    assert client.post("/v1/schools/batch", json={"ids": [2**63]}).status_code == 400
+
+
+def place_schools(engine, coordinates):
+    """Moves the first schools (by unitid) to ``coordinates``; returns their ids."""
+    with engine.begin() as connection:
+        unitids = list(
+            connection.scalars(
+                text(
+                    "SELECT school_unitid FROM location ORDER BY school_unitid LIMIT :n"
+                ),
+                {"n": len(coordinates)},
+            )
+        )
+        for unitid, (lat, lon) in zip(unitids, coordinates):
+            connection.execute(
+                text(
+                    "UPDATE location SET latitude = :lat, longitude = :lon "
+                    "WHERE school_unitid = :unitid"
+                ),
+                {"lat": lat, "lon": lon, "unitid": unitid},
+            )
+    return unitids
+
+
+@pytest.mark.parametrize("indexed", [True, False])
+def test_nearby_sorted_by_distance(indexed_db, monkeypatch, indexed):
+    if not indexed:
+        monkeypatch.setattr(spatial, "has_spatial_index", lambda connection: False)
+    # Burlington VT, then points ~11 km, ~1 km, ~111 km and ~560 km away.
+    unitids = place_schools(
+        indexed_db,
+        [(44.58, -73.21), (44.49, -73.21), (45.48, -73.21), (49.5, -73.21)],
+    )
+    data = client.get("/v1/schools/nearby/?lat=44.48&lon=-73.21&radius_km=150").json()
+    assert [school["unitid"] for school in data["results"]] == [
+        unitids[1],
+        unitids[0],
+        unitids[2],
+    ]
+    distances = [school["distance_km"] for school in data["results"]]
+    assert distances == sorted(distances) and 1 < distances[0] < 1.2
+    assert data["header"]["total"] == 3
+    assert data["results"][0]["location"]["latitude"] == 44.49
+    assert NearbySchoolResponse(**data).model_dump(mode="json") == data
+
+    first = client.get(
+        "/v1/schools/nearby/?lat=44.48&lon=-73.21&radius_km=150&limit=2"
+    ).json()
+    second = client.get(
+        "/v1/schools/nearby/?lat=44.48&lon=-73.21&radius_km=150&limit=2"
+        f"&cursor={first['header']['next_cursor']}"
+    ).json()
+    assert first["results"] + second["results"] == data["results"]
+    assert second["header"]["next_cursor"] is None
+
+
+@pytest.mark.parametrize("values", [["a", "b"], [None, None], [1.5, "x"]])
+def test_nearby_rejects_non_numeric_cursor(indexed_db, values):
+    place_schools(indexed_db, [(44.58, -73.21), (44.49, -73.21)])
+    response = client.get(
+        "/v1/schools/nearby/?lat=44.48&lon=-73.21&radius_km=150"
+        f"&cursor={encode_cursor(values)}"
+    )
+    assert response.status_code == 400
+
+
+def test_nearby_across_the_antimeridian(indexed_db):
+    unitids = place_schools(indexed_db, [(-17.0, 179.95), (-17.0, -179.95)])
+    data = client.get("/v1/schools/nearby/?lat=-17&lon=179.99&radius_km=50").json()
+    assert {school["unitid"] for school in data["results"]} == set(unitids)
+
+
+@pytest.fixture
+def search_db(indexed_db):
+    """Gives the first six Vermont schools control, admission and finance data."""
+    with indexed_db.begin() as connection:
+        unitids = list(
+            connection.scalars(
+                text(
+                    "SELECT school_unitid FROM location WHERE state = 'VT' "
+                    "ORDER BY school_unitid LIMIT 6"
+                )
+            )
+        )
+        for i, unitid in enumerate(unitids):
+            connection.execute(
+                text(
+                    "INSERT INTO control (school_unitid, control, hbcu) "
+                    "VALUES (:unitid, :control, 0)"
+                ),
+                {
+                    "unitid": unitid,
+                    "control": "Public" if i % 2 else "Private nonprofit",
+                },
+            )
+            for year, rate in (("2021-01-01", 0.9), ("2022-01-01", 0.1 * (6 - i))):
+                connection.execute(
+                    text(
+                        "INSERT INTO admission (school_unitid, year, admission_rate) "
+                        "VALUES (:unitid, :year, :rate)"
+                    ),
+                    {"unitid": unitid, "year": year, "rate": rate},
+                )
+            connection.execute(
+                text(
+                    "INSERT INTO finance (school_unitid, year, avg_net_price) "
+                    "VALUES (:unitid, '2022-01-01', :price)"
+                ),
+                {"unitid": unitid, "price": 10000.0 + 2000 * i},
+            )
+    return unitids
+
+
+def search_ids(query):
+    response = client.get(f"/v1/schools/search/?{query}")
+    assert response.status_code == 200
+    return [school["unitid"] for school in response.json()["results"]]
+
+
+def test_search_combines_filters(search_db):
+    unitids = search_db
+    # Public: 1, 3, 5; rates in 2022: 0.5, 0.3, 0.1; prices 12k, 16k, 20k.
+    assert search_ids("state=vt&control=public&max_admission_rate=0.35") == [
+        unitids[3],
+        unitids[5],
+    ]
+    assert search_ids("control=public&max_admission_rate=0.35&max_net_price=17000") == [
+        unitids[3]
+    ]
+    # The 2021 rates are all 0.9.
+    assert search_ids("control=public&max_admission_rate=0.35&year=2021") == []
+    assert search_ids("state=NH,VT&region=new england&hbcu=false") == unitids
+    for year in (0, 10000):
+        url = f"/v1/schools/search/?year={year}&max_admission_rate=0.3"
+        assert client.get(url).status_code == 422
+
+
+def test_search_sorted_by_range_column(search_db):
+    unitids = search_db
+    assert search_ids("sort=admission_rate&min_admission_rate=0.15") == [
+        unitids[4],
+        unitids[3],
+        unitids[2],
+        unitids[1],
+        unitids[0],
+    ]
+    data = client.get(
+        "/v1/schools/search/?sort=avg_net_price&control=private&limit=2"
+    ).json()
+    assert [school["unitid"] for school in data["results"]] == unitids[0:4:2]
+    assert data["header"]["total"] == 3
+    assert data["results"][0]["finances"][0]["avg_net_price"] == 10000.0
+    after = search_ids(
+        f"sort=avg_net_price&control=private&limit=2&cursor={data['header']['next_cursor']}"
+    )
+    assert after == [unitids[4]]
+
+
+def test_search_sort_uses_index(indexed_db):
+    filters = SimpleNamespace(
+        **{name: None for name in inspect.signature(SchoolFilters).parameters}
+    )
+    filters.__dict__.update(max_admission_rate=0.5, year=2022, sort="admission_rate")
+    query, sort_keys = asyncio.run(build_search_query(None, filters))
+    compiled = query.order_by(*sort_keys).compile(
+        dialect=indexed_db.dialect, compile_kwargs={"literal_binds": True}
+    )
+    with indexed_db.connect() as connection:
+        plan = [
+            row[-1]
+            for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}")
+        ]
+    assert any("ix_admission_year_admission_rate" in step for step in plan)
+    assert not any("ORDER BY" in step for step in plan)
+
+
+def test_stats_served_from_summary_table(indexed_db):
+    with indexed_db.begin() as connection:
+        for year, value, median in (
+            ("2021-01-01", "VT", 0.5),
+            ("2022-01-01", "VT", 0.6),
+            ("2022-01-01", "NH", 0.7),
+        ):
+            connection.execute(
+                text(
+                    "INSERT INTO school_stats (dimension, metric, year, value, count, "
+                    "median) VALUES ('state', 'admission_rate', :year, :value, 3, :median)"
+                ),
+                {"year": year, "value": value, "median": median},
+            )
+
+    data = client.get("/v1/stats/state/?metric=admission_rate").json()
+    assert data["year"] == "2022-01-01"
+    assert [(row["value"], row["median"]) for row in data["results"]] == [
+        ("NH", 0.7),
+        ("VT", 0.6),
+    ]
+    data = client.get("/v1/stats/state/?metric=admission_rate&year=2021&value=vt")
+    assert data.json()["results"][0]["median"] == 0.5
+    assert client.get("/v1/stats/county/").status_code == 422
+    assert client.get("/v1/stats/state/?year=0").status_code == 422
+    assert client.get("/v1/stats/state/?year=10000").status_code == 422
+
+
+def test_export_formats_match(search_db):
+    unitids = search_db
+    url = "/v1/schools/export/?state=VT&control=public"
+    response = client.get(url)
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["unitid"] for row in rows] == unitids[1::2]
+    assert rows[0]["location_state"] == "VT"
+    assert rows[0]["control_control"] == "Public"
+    assert (rows[0]["admission_admission_rate"], rows[0]["finance_avg_net_price"]) == (
+        0.5,
+        12000.0,
+    )
+
+    with_2021 = [
+        json.loads(line) for line in client.get(url + "&year=2021").text.splitlines()
+    ]
+    assert with_2021[0]["admission_admission_rate"] == 0.9
+    assert with_2021[0]["finance_avg_net_price"] is None
+    assert client.get(url + "&year=0").status_code == 422
+
+    csv_rows = list(csv.DictReader(io.StringIO(client.get(url + "&format=csv").text)))
+    assert [int(row["unitid"]) for row in csv_rows] == unitids[1::2]
+
+    parquet = client.get(url + "&format=parquet")
+    table = pyarrow.parquet.read_table(pyarrow.BufferReader(parquet.content))
+    assert table.column("unitid").to_pylist() == unitids[1::2]
+    assert table.column("finance_avg_net_price").to_pylist() == [
+        12000.0,
+        16000.0,
+        20000.0,
+    ]
+
+
+def test_export_streams_in_chunks(monkeypatch):
+    monkeypatch.setattr("app.routers.export.CHUNK_SIZE", 100)
+    with client.stream(
+        "GET", "/v1/schools/export/?state=CA&format=parquet"
+    ) as response:
+        chunks = list(response.iter_bytes())
+    table = pyarrow.parquet.read_table(pyarrow.BufferReader(b"".join(chunks)))
+    assert table.num_rows > 100
+    assert (
+        table.num_rows
+        == client.get("/v1/schools/state/?state_code=CA&limit=1").json()["header"][
+            "total"
+        ]
+    )
+    assert pyarrow.parquet.ParquetFile(
+        pyarrow.BufferReader(b"".join(chunks))
+    ).num_row_groups == -(-table.num_rows // 100)
+
+
+def test_conditional_request_answered_without_database(count_queries):
+    url = "/v1/schools/state/?state_code=NH&limit=5"
+    response = client.get(url)
+    etag = response.headers["etag"]
+    assert etag.startswith('"') and "s-maxage" in response.headers["cache-control"]
+
+    count_queries.clear()
+    revalidated = client.get(url, headers={"If-None-Match": f'W/"x", {etag}'})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+    assert count_queries == []
+
+    assert (
+        client.get(url + "&limit=6", headers={"If-None-Match": etag}).status_code == 200
+    )
+
+
+def test_validators_follow_data_version(indexed_db, monkeypatch):
+    monkeypatch.setattr(settings, "data_version_poll_seconds", 0)
+    Base.metadata.create_all(indexed_db)
+    url = "/v1/schools/region/?region=Plains&limit=5"
+    before = client.get(url).headers
+    with sessionmaker(bind=indexed_db)() as session:
+        bump_data_version(session)
+        session.commit()
+
+    after = client.get(url, headers={"If-None-Match": before["etag"]})
+    assert after.status_code == 200
+    assert after.headers["etag"] != before["etag"]
+    last_modified = after.headers["last-modified"]
+    assert last_modified.endswith("GMT")
+    assert (
+        client.get(url, headers={"If-Modified-Since": last_modified}).status_code == 304
+    )
+    assert (
+        client.get(
+            url, headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"}
+        ).status_code
+        == 200
+    )
+
+
+def test_server_timing_and_metrics(monkeypatch):
+    monkeypatch.setattr(settings, "response_cache_enabled", False)
+    timings = []
+    for limit in (5, 50):
+        response = client.get(f"/v1/schools/state/?state_code=WA&limit={limit}")
+        assert response.status_code == 200
+        timing = dict(
+            entry.split(";", 1)
+            for entry in response.headers["server-timing"].split(", ")
+        )
+        assert set(timing) == {"db", "serialize", "total"}
+        timings.append(int(timing["db"].split('desc="')[1].split()[0]))
+    # A ten times larger page loads its locations in the same number of statements.
+    assert 0 < timings[0] == timings[1]
+
+    metrics = client.get("/metrics").text
+    assert 'http_request_db_statements_count{route="/v1/schools/state/"}' in metrics
+    assert (
+        'http_request_duration_seconds_count{method="GET",route="/v1/schools/state/",status="200"}'
+        in metrics
+    )
+
+
+@pytest.mark.parametrize("strategy", ["auto", "selectin", "joined"])
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/v1/schools/?school_name=college",
+        "/v1/schools/state/?state_code=CA",
+        "/v1/schools/search/?state=CA",
+    ],
+)
+def test_pages_load_in_constant_queries(url, strategy, monkeypatch, count_queries):
+    monkeypatch.setattr(settings, "response_cache_enabled", False)
+    monkeypatch.setattr(settings, "loader_strategy", strategy)
+    client.get(f"{url}&limit=1")
+    counts = []
+    for limit in (5, 50):
+        serialization._fragments.clear()
+        count_queries.clear()
+        response = client.get(f"{url}&limit={limit}&include_total=false")
+        assert len(response.json()["results"]) == limit
+        counts.append(len(count_queries))
+    assert counts[0] == counts[1]
+
+
+def test_single_row_relationships_are_detected():
+    assert at_most_one(School.locations) and at_most_one(School.controls)
+    assert not at_most_one(School.finances) and not at_most_one(School.admissions)
@@ -0,0 +1,130 @@
+import asyncio
+import shutil
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+from .config import settings
+from .db import memory
+from .db.database import async_engine, engine
+from .db.models import Base
+from .db.versioning import bump_data_version
+from .main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def no_response_cache(monkeypatch):
+    monkeypatch.setattr(settings, "response_cache_enabled", False)
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    return memory.load_dataset(engine, str(async_engine.url))
+
+
+@pytest.fixture
+def from_memory(dataset):
+    memory.activate(dataset)
+    yield dataset
+    memory.activate(None)
+
+
+# Counts are exact in memory, so the database is asked for exact counts too.
+URLS = [
+    "/v1/schools/state/?state_code=ca&limit=7&count_mode=exact",
+    "/v1/schools/region/?region=new england&limit=7&skip=3&count_mode=exact",
+    "/v1/schools/locale/?locale=rural&limit=7&include_total=false",
+    "/v1/schools/zipcode/?zipcode=05&limit=7&count_mode=exact",
+    "/v1/schools/nearby/?lat=44.48&lon=-73.21&radius_km=100&limit=7",
+    "/v1/schools/batch?ids=100654,100663,1",
+    "/v1/schools/?limit=7&count_mode=exact",
+]
+
+
+@pytest.mark.parametrize("url", URLS)
+def test_memory_matches_database(url, dataset):
+    expected = client.get(url)
+    memory.activate(dataset)
+    try:
+        actual = client.get(url)
+    finally:
+        memory.activate(None)
+    assert actual.status_code == expected.status_code == 200
+    assert actual.json() == expected.json()
+    assert actual.headers["etag"] == expected.headers["etag"]
+
+
+def test_memory_cursor_pages_through_results(from_memory):
+    seen = []
+    url = "/v1/schools/state/?state_code=VT&limit=4"
+    page = client.get(url).json()
+    while True:
+        seen += [school["unitid"] for school in page["results"]]
+        if page["header"]["next_cursor"] is None:
+            break
+        page = client.get(f"{url}&cursor={page['header']['next_cursor']}").json()
+    assert seen == list(from_memory.state("VT"))
+    assert len(seen) == page["header"]["total"]
+
+
+def test_memory_serves_without_database(from_memory):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        for url in URLS:
+            assert client.get(url).status_code == 200
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
+    assert statements == []
+
+
+@pytest.mark.parametrize("school_name", ["univ alab", "community college", "%"])
+def test_memory_name_search_matches_database(school_name, dataset):
+    url = f"/v1/schools/?school_name={school_name}&limit=3&count_mode=exact"
+    expected = client.get(url).json()
+    cursor = expected["header"]["next_cursor"]
+    if cursor is not None:
+        expected_next = client.get(f"{url}&cursor={cursor}").json()
+    memory.activate(dataset)
+    try:
+        assert client.get(url).json() == expected
+        if cursor is not None:
+            assert client.get(f"{url}&cursor={cursor}").json() == expected_next
+    finally:
+        memory.activate(None)
+
+
+def test_snapshot_swapped_when_version_changes(tmp_path, monkeypatch):
+    path = tmp_path / "snapshot.db"
+    shutil.copy(engine.url.database, path)
+    snapshot = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(snapshot)
+    monkeypatch.setattr(settings, "data_version_poll_seconds", 0.01)
+
+    async def serve_and_reload():
+        refresher = await memory.serve_from_memory(f"sqlite:///{path}", "snapshot")
+        first = memory.active_dataset("snapshot")
+        with sessionmaker(bind=snapshot)() as session:
+            bump_data_version(session)
+            session.commit()
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if memory.active_dataset("snapshot") is not first:
+                break
+        refresher.cancel()
+        return first, memory.active_dataset("snapshot")
+
+    try:
+        first, second = asyncio.run(serve_and_reload())
+    finally:
+        memory.activate(None)
+    assert second is not first
+    assert second.stamp[0] == first.stamp[0] + 1
+    assert len(second.schools) == len(first.schools)
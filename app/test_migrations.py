@@ -0,0 +1,32 @@
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect
+from .db.models import Base
+
+
+def test_migrations_match_models(tmp_path, monkeypatch):
+    uri = f"sqlite:///{tmp_path / 'migrated.db'}"
+    monkeypatch.setenv("DATABASE_URI", uri)
+    config = Config("alembic.ini")
+    command.upgrade(config, "head")
+
+    engine = create_engine(uri)
+    with engine.connect() as connection:
+        context = MigrationContext.configure(
+            connection, opts={"include_object": _ignore_search_tables}
+        )
+        assert compare_metadata(context, Base.metadata) == []
+        indexes = {
+            index["name"] for index in inspect(connection).get_indexes("location")
+        }
+    assert "ix_location_state_school_unitid" in indexes
+
+    command.downgrade(config, "base")
+    assert inspect(engine).get_table_names() == ["alembic_version"]
+    engine.dispose()
+
+
+def _ignore_search_tables(object, name, type_, reflected, compare_to):
+    return not (type_ == "table" and name.startswith(("schools_fts", "location_rtree")))
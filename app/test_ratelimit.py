@@ -0,0 +1,239 @@
+import asyncio
+import threading
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from limits import parse
+from limits.strategies import MovingWindowRateLimiter
+from limits.storage import storage_from_string
+from .dependencies.dependencies import limiter
+from .dependencies.ratelimit import SlidingWindowRedisStorage, TieredLimiter
+from .main import app
+
+client = TestClient(app)
+
+
+def on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class FakeRedis:
+    """
+    Local stand-in for the sorted-set subset of the redis client. Scripts run one at a
+    time, as on a server; `SlidingWindowRedisStorage.ACQUIRE_SCRIPT` is mirrored by
+    `acquire`.
+    """
+
+    def __init__(self):
+        self.zsets = {}
+        self.expiry = {}
+        self.scripts_on_event_loop = []
+        self._lock = threading.Lock()
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def register_script(self, source):
+        assert source == SlidingWindowRedisStorage.ACQUIRE_SCRIPT
+
+        def run(keys, args):
+            with self._lock:
+                self.scripts_on_event_loop.append(on_event_loop())
+                return self.acquire(*keys, *args)
+
+        return run
+
+    def acquire(self, key, now, expiry, limit, *members):
+        self.zremrangebyscore(key, 0, now - expiry)
+        if self.zcard(key) + len(members) > limit:
+            return 0
+        self.zadd(key, {member: now for member in members})
+        self.expire(key, expiry)
+        return 1
+
+    def zremrangebyscore(self, key, low, high):
+        members = self.zsets.get(key, {})
+        for member, score in list(members.items()):
+            if low <= score <= high:
+                del members[member]
+
+    def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    def zcard(self, key):
+        return len(self.zsets.get(key, {}))
+
+    def zrange(self, key, start, end, withscores=False):
+        members = sorted(self.zsets.get(key, {}).items(), key=lambda item: item[1])
+        return members[start : end + 1]
+
+    def zrem(self, key, *members):
+        for member in members:
+            self.zsets.get(key, {}).pop(member, None)
+
+    def expire(self, key, seconds):
+        self.expiry[key] = seconds
+
+    def scan_iter(self, match):
+        prefix = match.rstrip("*")
+        return [key for key in self.zsets if key.startswith(prefix)]
+
+    def delete(self, *keys):
+        for key in keys:
+            self.zsets.pop(key, None)
+
+
+class FakePipeline:
+    """Queues calls and runs them together on `execute`, like MULTI/EXEC."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((getattr(self.redis, name), args, kwargs))
+
+        return queue
+
+    def execute(self):
+        return [method(*args, **kwargs) for method, args, kwargs in self.calls]
+
+
+def test_sliding_window_redis_storage_is_registered():
+    storage = storage_from_string("sliding+redis://localhost", client=FakeRedis())
+    assert isinstance(storage, SlidingWindowRedisStorage)
+
+
+def test_sliding_window_is_shared_between_workers(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.dependencies.ratelimit.time.time", lambda: now[0])
+    redis = FakeRedis()
+    workers = [
+        MovingWindowRateLimiter(SlidingWindowRedisStorage(client=redis))
+        for _ in range(2)
+    ]
+    limit = parse("3/minute")
+
+    results = [workers[i % 2].hit(limit, "client") for i in range(4)]
+    assert results == [True, True, True, False]
+    # The rejected hit does not occupy the window.
+    assert workers[0].get_window_stats(limit, "client").remaining == 0
+    assert redis.zcard(next(iter(redis.zsets))) == 3
+
+    now[0] += 30
+    assert not workers[1].hit(limit, "client")
+    now[0] += 31
+    assert workers[1].hit(limit, "client")
+
+
+def test_interleaved_callers_are_admitted_up_to_the_limit():
+    redis = FakeRedis()
+    workers = [
+        MovingWindowRateLimiter(SlidingWindowRedisStorage(client=redis))
+        for _ in range(2)
+    ]
+    limit = parse("3/minute")
+    assert workers[0].hit(limit, "client") and workers[1].hit(limit, "client")
+
+    # Callers on both workers race for the last hit of the window; a burst over the
+    # limit must neither admit a second one nor leave its hits behind.
+    start = threading.Barrier(8)
+    results = []
+
+    def caller(worker):
+        start.wait()
+        results.append(worker.hit(limit, "client"))
+
+    threads = [
+        threading.Thread(target=caller, args=(workers[i % 2],)) for i in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results.count(True) == 1
+    assert redis.zcard(next(iter(redis.zsets))) == 3
+
+
+def test_shared_storage_is_checked_off_the_event_loop():
+    redis = FakeRedis()
+    tiered = TieredLimiter(
+        tiers={"default": "2/minute"},
+        storage_uri="sliding+redis://localhost",
+        storage_options={"client": redis},
+    )
+    api = FastAPI()
+    api.state.limiter = tiered
+
+    @api.get("/")
+    @tiered.limit(tiered.tier_limit)
+    async def endpoint(request: Request):
+        return {}
+
+    api_client = TestClient(api)
+    assert [api_client.get("/").status_code for _ in range(3)] == [200, 200, 429]
+    assert redis.scripts_on_event_loop == [False, False, False]
+
+
+def test_api_key_selects_its_tier(monkeypatch):
+    monkeypatch.setattr(
+        limiter, "tiers", {"default": "1/minute", "partner": "3/minute"}
+    )
+    monkeypatch.setattr(limiter, "api_keys", {"secret": "partner"})
+    headers = {"X-API-Key": "secret"}
+
+    statuses = [
+        client.get("/v1/schools/state/", params={"state_code": "AL"}, headers=headers)
+        for _ in range(4)
+    ]
+    assert [r.status_code for r in statuses] == [200, 200, 200, 429]
+    # Anonymous callers are counted separately, at the default tier.
+    assert (
+        client.get("/v1/schools/state/", params={"state_code": "AL"}).status_code == 200
+    )
+    assert (
+        client.get("/v1/schools/state/", params={"state_code": "AL"}).status_code == 429
+    )
+    # Unknown keys are treated as anonymous.
+    response = client.get(
+        "/v1/schools/state/", params={"state_code": "AL"}, headers={"X-API-Key": "x"}
+    )
+    assert response.status_code == 429
+
+
+def test_allowlisted_callers_skip_the_limiter(monkeypatch):
+    monkeypatch.setattr(limiter, "tiers", {"default": "1/minute"})
+    monkeypatch.setattr(limiter, "allowlist", frozenset({"internal-key"}))
+    hits = []
+    monkeypatch.setattr(limiter._limiter, "hit", lambda *args, **kw: hits.append(1))
+
+    for _ in range(3):
+        response = client.get(
+            "/v1/schools/state/",
+            params={"state_code": "AL"},
+            headers={"X-API-Key": "internal-key"},
+        )
+        assert response.status_code == 200
+    assert hits == []
+
+
+def test_client_key_never_contains_the_api_key():
+    tiered = TieredLimiter(tiers={"default": "5/minute"}, api_keys={"secret": "gold"})
+
+    class Request:
+        headers = {"X-API-Key": "secret"}
+
+    key = tiered.client_key(Request())
+    assert key.startswith("gold:") and "secret" not in key
+    assert tiered.tier_limit(key) == "5/minute"
+
+
+def test_default_tier_falls_back_when_not_configured():
+    tiered = TieredLimiter(tiers={"gold": "100/minute"})
+    assert tiered.tier_limit("default:127.0.0.1") == "5/minute"
+    assert tiered.tier_limit("unknown:127.0.0.1") == "5/minute"
+    assert tiered.tier_limit("gold:abc") == "100/minute"
@@ -0,0 +1,26 @@
+import pytest
+from .db.spatial import bounding_box, haversine_km
+
+
+def test_haversine_known_distance():
+    # Burlington VT to Montpelier VT is about 56 km.
+    assert haversine_km(44.4759, -73.2121, 44.2601, -72.5754) == pytest.approx(
+        55.7, abs=0.5
+    )
+
+
+def test_bounding_box_contains_circle():
+    (min_lat, max_lat), [(west, east)] = bounding_box(44.48, -73.21, 100)
+    assert haversine_km(44.48, -73.21, max_lat, -73.21) == pytest.approx(100)
+    assert haversine_km(44.48, -73.21, min_lat, -73.21) == pytest.approx(100)
+    assert haversine_km(44.48, -73.21, 44.48, east) >= 100
+    assert haversine_km(44.48, -73.21, 44.48, west) >= 100
+
+
+def test_bounding_box_splits_at_antimeridian():
+    _, ranges = bounding_box(0, 179.9, 50)
+    assert ranges[0][1] == 180.0 and ranges[1][0] == -180.0
+
+
+def test_bounding_box_at_pole_spans_all_longitudes():
+    assert bounding_box(89.9, 0, 50)[1] == [(-180.0, 180.0)]